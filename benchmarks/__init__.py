@@ -0,0 +1,15 @@
+# __init__.py
+
+"""
+Замеры производительности системы управления банковскими счетами.
+Запуск из корня репозитория, например: python -m benchmarks.startup
+"""
+
+import sys
+from pathlib import Path
+
+# Модули приложения импортируют друг друга по короткому имени (from accounts import ...)
+APP_DIR = Path(__file__).resolve().parent.parent / "src" / "bank_accounts"
+
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
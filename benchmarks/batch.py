@@ -0,0 +1,60 @@
+# batch.py
+
+"""
+Пропускная способность пакетного проведения транзакций.
+Запуск: python -m benchmarks.batch
+"""
+
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.generator import generate_data
+from application import Application
+from transactions import TransactionList
+
+# Размеры пакета
+BATCH_SIZES = [10_000, 100_000]
+
+# Количество счетов
+ACCOUNTS_COUNT = 10_000
+
+
+def write_batch(file_name: Path, size: int, seed: int = 7) -> None:
+    """
+    Файл пакета: только депозиты, чтобы пакет не нарушал лимиты
+    """
+    rnd = random.Random(seed)
+    with open(file_name, "w", encoding="UTF-8") as f:
+        for _ in range(size):
+            idx = rnd.randrange(ACCOUNTS_COUNT)
+            account_num = f"S{str(idx // 2 + 1).zfill(5)}" if idx % 2 == 0 else f"C{str(idx // 2 + 1).zfill(5)}"
+            f.write(f"20130101{account_num}D{rnd.randint(1, 100000) / 100:15.2f}\n")
+
+
+def main() -> None:
+    print(f"{'Пакет':>10}{'разбор':>10}{'проведение':>13}{'итого txn/s':>14}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        accounts_file, transactions_file = generate_data(Path(tmp_dir) / "data", ACCOUNTS_COUNT, 0)
+        for size in BATCH_SIZES:
+            batch_file = Path(tmp_dir) / f"batch_{size}.dat"
+            write_batch(batch_file, size)
+            shutil.copy(transactions_file, Path(tmp_dir) / "work.dat")
+            app = Application(accounts_file, Path(tmp_dir) / "work.dat")
+            app.get_all_accounts()
+
+            start = time.perf_counter()
+            with open(batch_file, "r", encoding="UTF-8") as f:
+                batch = TransactionList.load_lines(f)
+            parsed = time.perf_counter()
+            app.apply_batch(batch)
+            done = time.perf_counter()
+            app.close()
+
+            print(f"{size:>10,}{parsed - start:>9.2f}s{done - parsed:>12.3f}s{size / (done - start):>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
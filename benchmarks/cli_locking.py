@@ -0,0 +1,90 @@
+# cli_locking.py
+
+"""
+Одновременные запуски CLI над одними файлами данных: пропускная способность
+и проверка потерянных обновлений под блокировкой файлов.
+Запуск: python -m benchmarks.cli_locking [количество процессов] [команд на процесс]
+"""
+
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks import APP_DIR
+from benchmarks.generator import generate_data
+from application import Application
+
+# Количество одновременно работающих процессов по умолчанию
+PROCESSES = 4
+
+# Количество команд, которые процесс запускает подряд
+COMMANDS_PER_PROCESS = 10
+
+# Размер истории транзакций
+HISTORY_SIZE = 10_000
+
+# Количество счетов
+ACCOUNTS_COUNT = 100
+
+# Счет для депозитов без ограничений
+FREE_ACCOUNT = "S00001"
+
+# Максимальный лимит нового счета: сколько депозитов по 1.00 может пройти
+LIMIT_HEADROOM = 7
+
+
+def run_commands(work_dir: Path, account: str, count: int) -> None:
+    for _ in range(count):
+        subprocess.run([sys.executable, str(APP_DIR / "main.py"), "deposit", account, "--amount", "1.00"],
+                       cwd=work_dir, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def main() -> None:
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else PROCESSES
+    commands = int(sys.argv[2]) if len(sys.argv) > 2 else COMMANDS_PER_PROCESS
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        work_dir = Path(tmp_dir)
+        accounts_file, transactions_file = generate_data(work_dir / "data", ACCOUNTS_COUNT, HISTORY_SIZE)
+
+        app = Application(accounts_file, transactions_file, replay_workers=1)
+        free_start = app.get_account(FREE_ACCOUNT).balance_minor
+        # у нового счета нет истории, лимит не мешает переигровке старых транзакций
+        limited_account = app.add_new_account("Limited", "C", 0).account_number
+        app.set_limits(limited_account, 0, LIMIT_HEADROOM)
+        app.close()
+
+        # половина процессов вносит депозиты на счет без лимита, половина - на счет с лимитом
+        threads = [threading.Thread(target=run_commands,
+                                    args=(work_dir, FREE_ACCOUNT if idx % 2 == 0 else limited_account, commands))
+                   for idx in range(processes)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        free_commands = sum(commands for idx in range(processes) if idx % 2 == 0)
+        limited_commands = processes * commands - free_commands
+        check = Application(accounts_file, transactions_file, replay_workers=1)
+        free_lost = free_commands - (check.get_account(FREE_ACCOUNT).balance_minor - free_start) // 100
+        limited_passed = check.get_account(limited_account).balance_minor // 100
+        journal_lines = len(transactions_file.read_text(encoding="UTF-8").splitlines())
+        check.close()
+
+    total = processes * commands
+    print(f"Процессов: {processes}, команд: {total}")
+    print(f"{'Время':<45}{elapsed:>10.2f} с")
+    print(f"{'Пропускная способность':<45}{total / elapsed:>10.1f} команд/с")
+    print(f"{'Потерянные депозиты на ' + FREE_ACCOUNT:<45}{free_lost:>10}")
+    expected_limited = min(limited_commands, LIMIT_HEADROOM)
+    print(f"{'Проведено на ' + limited_account + ' (ожидается)':<45}{limited_passed:>10} ({expected_limited})")
+    print(f"{'Записей в журнале (ожидается)':<45}{journal_lines:>10} "
+          f"({HISTORY_SIZE + free_commands + expected_limited})")
+
+
+if __name__ == "__main__":
+    main()
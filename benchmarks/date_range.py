@@ -0,0 +1,71 @@
+# date_range.py
+
+"""
+Выборка транзакций за период: индекс дат (бинарный поиск) против перебора списка
+со сравнением дат в виде строк.
+Запуск: python -m benchmarks.date_range [количество записей]
+"""
+
+import datetime
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.generator import generate_data, START_DATE, TRANSACTIONS_PER_DAY
+from transactions import TransactionList
+
+# Размер истории транзакций по умолчанию
+HISTORY_SIZE = 1_000_000
+
+# Количество счетов
+ACCOUNTS_COUNT = 1_000
+
+# Длина периода выборки, дней
+PERIOD_DAYS = 30
+
+# Количество запросов для замера
+QUERIES = 100
+
+
+def scan(transactions: TransactionList, start: datetime.date, end: datetime.date, account: str) -> list:
+    """
+    Перебор всего списка, как без индекса дат
+    """
+    start_text, end_text = start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+    return [txn for txn in transactions
+            if (account is None or txn.account == account) and
+            start_text <= txn.date.strftime("%Y-%m-%d") <= end_text]
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else HISTORY_SIZE
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _, transactions_file = generate_data(Path(tmp_dir), ACCOUNTS_COUNT, size)
+        transactions = TransactionList.load(transactions_file)
+
+    # индекс дат строится при первой выборке
+    start = time.perf_counter()
+    transactions.between(None, None)
+    build_time = time.perf_counter() - start
+
+    days = size // TRANSACTIONS_PER_DAY
+    period_start = START_DATE + datetime.timedelta(days=days // 2)
+    period_end = period_start + datetime.timedelta(days=PERIOD_DAYS - 1)
+    print(f"История: {size:,} транзакций, построение индекса дат: {build_time:.2f} с")
+    print(f"{'Запрос':<30}{'перебор':>12}{'индекс':>12}{'строк':>10}")
+    for name, account in (("все счета", None), ("один счет", "S00001")):
+        begin = time.perf_counter()
+        expected = scan(transactions, period_start, period_end, account)
+        scan_ms = (time.perf_counter() - begin) * 1000
+
+        begin = time.perf_counter()
+        for _ in range(QUERIES):
+            found = transactions.between(period_start, period_end, account)
+        index_ms = (time.perf_counter() - begin) * 1000 / QUERIES
+        assert found == expected
+        print(f"{name + ', ' + str(PERIOD_DAYS) + ' дней':<30}{scan_ms:>10.1f}мс{index_ms:>10.3f}мс{len(found):>10,}")
+
+
+if __name__ == "__main__":
+    main()
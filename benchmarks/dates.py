@@ -0,0 +1,66 @@
+# dates.py
+
+"""
+Разбор и форматирование дат транзакций: загрузка строк истории,
+строки таблицы (to_table_view, table_rows) и выгрузка в формат файла (dump).
+Запуск: python -m benchmarks.dates [количество строк]
+"""
+
+import gc
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from benchmarks.generator import generate_data
+from transactions import TransactionList
+
+# Количество строк по умолчанию
+ROWS = 200_000
+
+# Количество счетов
+ACCOUNTS_COUNT = 10_000
+
+# Количество повторов, берется лучшее время
+REPEAT = 5
+
+
+def best_time(func: Callable[[], object]) -> float:
+    """
+    Лучшее время из REPEAT запусков, сборщик мусора на время замера выключен
+    """
+    timings = []
+    for _ in range(REPEAT):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return min(timings)
+
+
+def report(name: str, seconds: float, rows: int) -> None:
+    print(f"{name:<30}{rows / seconds:>14,.0f} строк/с{seconds * 1e9 / rows:>10.0f} нс/строку")
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _, transactions_file = generate_data(Path(tmp_dir), ACCOUNTS_COUNT, rows)
+        lines = transactions_file.read_text(encoding="UTF-8").splitlines()
+        transactions = TransactionList.load_lines(lines)
+        days = len({txn.date for txn in transactions})
+        print(f"Строк: {rows:,}, различных дат: {days:,}")
+
+        report("Загрузка строк (load_lines)", best_time(lambda: TransactionList.load_lines(lines)), rows)
+        report("Строки таблицы (table_rows)",
+               best_time(lambda: sum(1 for _ in TransactionList.table_rows(transactions))), rows)
+        report("Выгрузка (dump)", best_time(lambda: [txn.dump() for txn in transactions]), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# durability.py
+
+"""
+Пропускная способность проведения транзакций при разных режимах синхронизации журнала:
+fsync после каждой транзакции против группового сброса на диск.
+Запуск: python -m benchmarks.durability [количество транзакций]
+"""
+
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.generator import generate_data
+from application import Application
+from transactions import TransactionList
+
+# Количество транзакций по умолчанию
+TXN_COUNT = 2_000
+
+# Количество счетов
+ACCOUNTS_COUNT = 100
+
+# Режимы: название, sync_every, sync_interval_ms, размер пакета (0 - по одной транзакции)
+MODES = [
+    ("fsync каждой транзакции", 1, 0, 0),
+    ("fsync каждые 10", 10, 0, 0),
+    ("fsync каждые 100", 100, 0, 0),
+    ("fsync раз в 10 мс", 0, 10, 0),
+    ("пакеты по 100", 1, 0, 100),
+]
+
+
+def run_mode(accounts_file: Path, transactions_file: Path, count: int,
+             sync_every: int, sync_interval_ms: int, batch_size: int) -> float:
+    """
+    Транзакций в секунду. Время включает закрытие журнала (последний fsync).
+    """
+    app = Application(accounts_file, transactions_file, sync_every, sync_interval_ms)
+    app.get_all_accounts()
+
+    start = time.perf_counter()
+    if batch_size == 0:
+        for idx in range(count):
+            app.deposit(f"S{str(idx % (ACCOUNTS_COUNT // 2) + 1).zfill(5)}", 1)
+    else:
+        for first in range(0, count, batch_size):
+            lines = [f"20130101S{str(idx % (ACCOUNTS_COUNT // 2) + 1).zfill(5)}D{1:15.2f}"
+                     for idx in range(first, min(first + batch_size, count))]
+            app.apply_batch(TransactionList.load_lines(lines))
+    app.close()
+    return count / (time.perf_counter() - start)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else TXN_COUNT
+    print(f"{'Режим':<26}{'txn/s':>12}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        accounts_file, transactions_file = generate_data(Path(tmp_dir) / "data", ACCOUNTS_COUNT, 0)
+        for name, sync_every, sync_interval_ms, batch_size in MODES:
+            work_file = Path(tmp_dir) / "work.dat"
+            shutil.copy(transactions_file, work_file)
+            rate = run_mode(accounts_file, work_file, count, sync_every, sync_interval_ms, batch_size)
+            print(f"{name:<26}{rate:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
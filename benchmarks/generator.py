@@ -0,0 +1,84 @@
+# generator.py
+
+"""
+Генератор синтетических файлов ACCOUNTS.DAT и TRANSACTIONS.DAT
+Запуск: python -m benchmarks.generator <каталог> <количество счетов> <количество транзакций> [доля счетов S]
+"""
+
+import datetime
+import math
+import random
+import sys
+from pathlib import Path
+
+# Начальная дата истории транзакций
+START_DATE = datetime.date(2012, 7, 13)
+
+# Среднее количество транзакций в день
+TRANSACTIONS_PER_DAY = 500
+
+# Начальный баланс нового счета
+INITIAL_BALANCE = 1000.00
+
+# Доля сберегательных (S) счетов по умолчанию, остальные - текущие (C)
+SAVING_SHARE = 0.5
+
+
+def account_numbers(accounts_count: int, saving_share: float = SAVING_SHARE) -> list[str]:
+    """
+    Номера счетов: счета S и C чередуются равномерно в заданной пропорции.
+    При доле 0.5: S00001, C00001, S00002, C00002, ...
+    """
+    if not 0 <= saving_share <= 1:
+        raise ValueError("Доля сберегательных счетов должна быть от 0 до 1.")
+    numbers: list[str] = []
+    saving, current = 0, 0
+    for idx in range(accounts_count):
+        if math.floor((idx + 1) * saving_share + 0.5) > math.floor(idx * saving_share + 0.5):
+            saving += 1
+            numbers.append(f"S{str(saving).zfill(5)}")
+        else:
+            current += 1
+            numbers.append(f"C{str(current).zfill(5)}")
+    return numbers
+
+
+def generate_data(directory: Path, accounts_count: int, history_length: int, seed: int = 42,
+                  saving_share: float = SAVING_SHARE) -> tuple[Path, Path]:
+    """
+    Сгенерировать реестр счетов и историю транзакций в каталоге directory.
+    saving_share - доля сберегательных (S) счетов.
+    Результат детерминирован для одинаковых параметров.
+    Возвращает пути к файлам счетов и транзакций.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    accounts_file = directory / "ACCOUNTS.DAT"
+    transactions_file = directory / "TRANSACTIONS.DAT"
+
+    rnd = random.Random(seed)
+    accounts = account_numbers(accounts_count, saving_share)
+    with open(accounts_file, "w", encoding="UTF-8") as f:
+        for idx, account_num in enumerate(accounts):
+            f.write(f"{account_num}{'Customer ' + str(idx + 1):29}{INITIAL_BALANCE:15}\n")
+
+    # снятие не должно выводить баланс за лимиты по умолчанию
+    balances = {account_num: round(INITIAL_BALANCE * 100) for account_num in accounts}
+    with open(transactions_file, "w", encoding="UTF-8") as f:
+        for idx in range(history_length):
+            date = START_DATE + datetime.timedelta(days=idx // TRANSACTIONS_PER_DAY)
+            account_num = accounts[rnd.randrange(accounts_count)]
+            amount = rnd.randint(100, 100000)
+            if rnd.random() < 0.5 and balances[account_num] - amount >= 0:
+                txn_type = "W"
+                balances[account_num] -= amount
+            else:
+                txn_type = "D"
+                balances[account_num] += amount
+            f.write(f"{date.strftime('%Y%m%d')}{account_num}{txn_type}{amount / 100:15.2f}\n")
+
+    return accounts_file, transactions_file
+
+
+if __name__ == "__main__":
+    generate_data(Path(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3]),
+                  saving_share=float(sys.argv[4]) if len(sys.argv) > 4 else SAVING_SHARE)
@@ -0,0 +1,67 @@
+# group_commit.py
+
+"""
+Пропускная способность параллельного проведения депозитов:
+fsync каждой транзакции против групповой фиксации.
+Запуск: python -m benchmarks.group_commit [транзакций на поток]
+"""
+
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.generator import generate_data
+from application import Application
+
+# Количество транзакций в каждом потоке по умолчанию
+TXN_PER_THREAD = 500
+
+# Количество параллельных потоков
+THREAD_COUNTS = [1, 4, 16]
+
+# Количество счетов
+ACCOUNTS_COUNT = 100
+
+
+def run(accounts_file: Path, transactions_file: Path, threads_count: int, per_thread: int,
+        group_commit: bool) -> float:
+    """
+    Транзакций в секунду
+    """
+    app = Application(accounts_file, transactions_file, group_commit=group_commit)
+    app.get_all_accounts()
+
+    def post(thread_idx: int) -> None:
+        account_num = f"S{str(thread_idx % (ACCOUNTS_COUNT // 2) + 1).zfill(5)}"
+        for _ in range(per_thread):
+            app.deposit(account_num, 1)
+
+    threads = [threading.Thread(target=post, args=(idx,)) for idx in range(threads_count)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    app.close()
+    return threads_count * per_thread / (time.perf_counter() - start)
+
+
+def main() -> None:
+    per_thread = int(sys.argv[1]) if len(sys.argv) > 1 else TXN_PER_THREAD
+    print(f"{'Потоков':>8}{'fsync каждой':>16}{'группами':>12}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        accounts_file, transactions_file = generate_data(Path(tmp_dir) / "data", ACCOUNTS_COUNT, 0)
+        work_file = Path(tmp_dir) / "work.dat"
+        for threads_count in THREAD_COUNTS:
+            rates = []
+            for group_commit in (False, True):
+                shutil.copy(transactions_file, work_file)
+                rates.append(run(accounts_file, work_file, threads_count, per_thread, group_commit))
+            print(f"{threads_count:>8}{rates[0]:>16,.0f}{rates[1]:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
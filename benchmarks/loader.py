@@ -0,0 +1,40 @@
+# loader.py
+
+"""
+Загрузка TRANSACTIONS.DAT: построчный разбор против колоночной загрузки.
+Запуск: python -m benchmarks.loader
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.generator import generate_data
+from transactions import TransactionList
+from columnar import TransactionColumns
+
+# Размеры истории транзакций
+HISTORY_SIZES = [100_000, 1_000_000]
+
+# Количество счетов
+ACCOUNTS_COUNT = 10_000
+
+
+def measure(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    print(f"{'Записей':>12}{'TransactionList':>18}{'TransactionColumns':>21}{'Ускорение':>12}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in HISTORY_SIZES:
+            _, transactions_file = generate_data(Path(tmp_dir) / str(size), ACCOUNTS_COUNT, size)
+            rows = measure(TransactionList.load, transactions_file)
+            columns = measure(TransactionColumns.load, transactions_file)
+            print(f"{size:>12,}{rows:>17.2f}s{columns:>20.3f}s{rows / columns:>11.0f}x")
+
+
+if __name__ == "__main__":
+    main()
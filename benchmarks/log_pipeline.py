@@ -0,0 +1,119 @@
+# log_pipeline.py
+
+"""
+Время вызова logger.info в команде: прежняя синхронная запись в файл (FileHandler)
+против очереди (QueueHandler) с записью в отдельном потоке.
+Медленный диск (сетевой диск, fsync) имитируется задержкой после каждой записи.
+Запуск: python -m benchmarks.log_pipeline [количество записей]
+"""
+
+import logging
+import logging.handlers
+import queue
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from logging_setup import configure_logging, shutdown_logging, operation_fields, LocalQueueHandler, \
+    StructuredFormatter, LOG_FORMAT
+
+# Количество записей по умолчанию
+RECORDS = 20_000
+
+# Количество записей с имитацией медленного диска
+SLOW_RECORDS = 500
+
+# Задержка записи на медленный диск, секунд
+SLOW_DISK_DELAY = 0.001
+
+
+class SlowFileHandler(logging.FileHandler):
+    """
+    Запись в файл с задержкой, как на медленном диске
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        super().emit(record)
+        time.sleep(SLOW_DISK_DELAY)
+
+
+def measure(logger: logging.Logger, count: int) -> tuple[float, float]:
+    """
+    Записать count записей. Возвращает среднее и наибольшее время вызова logger.info, микросекунд
+    """
+    total = 0.0
+    worst = 0.0
+    for idx in range(count):
+        start = time.perf_counter()
+        logger.info(f"Внесен депозит на счет #:S{idx:05}", extra=operation_fields(f"S{idx:05}", 1.0, start))
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        worst = max(worst, elapsed)
+    return total / count * 1e6, worst * 1e6
+
+
+def run_sync(logger: logging.Logger, handler: logging.Handler, count: int) -> tuple[float, float, float]:
+    """
+    Записи пишутся в вызывающем потоке. Возвращает среднее и наибольшее время вызова, мкс, и общее время, с
+    """
+    handler.setFormatter(StructuredFormatter(LOG_FORMAT))
+    logger.addHandler(handler)
+    start = time.perf_counter()
+    mean, worst = measure(logger, count)
+    elapsed = time.perf_counter() - start
+    logger.removeHandler(handler)
+    handler.close()
+    return mean, worst, elapsed
+
+
+def run_queued(logger: logging.Logger, handler: logging.Handler, count: int) -> tuple[float, float, float]:
+    """
+    Записи ставятся в очередь, пишет поток QueueListener. Общее время - с ожиданием записи всей очереди
+    """
+    handler.setFormatter(StructuredFormatter(LOG_FORMAT))
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = LocalQueueHandler(records)
+    listener = logging.handlers.QueueListener(records, handler)
+    logger.addHandler(queue_handler)
+    listener.start()
+    start = time.perf_counter()
+    mean, worst = measure(logger, count)
+    listener.stop()
+    elapsed = time.perf_counter() - start
+    logger.removeHandler(queue_handler)
+    handler.close()
+    return mean, worst, elapsed
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else RECORDS
+    print(f"Записей: {count:,}, с медленным диском: {SLOW_RECORDS:,} (задержка {SLOW_DISK_DELAY * 1000:.0f} мс)")
+    print(f"{'Журнал':<30}{'среднее':>12}{'максимум':>12}{'всего':>10}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        logger = logging.getLogger("benchmarks.log_pipeline")
+        logger.propagate = False
+        logger.setLevel(logging.DEBUG)
+        directory = Path(tmp_dir)
+        variants = [
+            ("FileHandler", run_sync, logging.FileHandler(directory / "sync.log", encoding="UTF-8"), count),
+            ("очередь", run_queued, logging.FileHandler(directory / "queue.log", encoding="UTF-8"), count),
+            ("FileHandler, медленный диск", run_sync,
+             SlowFileHandler(directory / "slow_sync.log", encoding="UTF-8"), SLOW_RECORDS),
+            ("очередь, медленный диск", run_queued,
+             SlowFileHandler(directory / "slow_queue.log", encoding="UTF-8"), SLOW_RECORDS),
+        ]
+        for name, run, handler, records in variants:
+            mean, worst, elapsed = run(logger, handler, records)
+            print(f"{name:<30}{mean:>10.1f}мкс{worst:>9.0f}мкс{elapsed:>9.2f}с")
+
+        # настройка команд CLI: файл с ротацией и консоль через одну очередь
+        configure_logging(logger, directory / "bank.log", console_level=logging.CRITICAL)
+        start = time.perf_counter()
+        mean, worst = measure(logger, count)
+        shutdown_logging()
+        print(f"{'configure_logging':<30}{mean:>10.1f}мкс{worst:>9.0f}мкс{time.perf_counter() - start:>9.2f}с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# memory.py
+
+"""
+Память под историю транзакций: прежний класс с __dict__,
+текущий класс Transaction со __slots__ и колоночное хранилище.
+Запуск: python -m benchmarks.memory [количество записей ...]
+"""
+
+import datetime
+import gc
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.generator import generate_data
+from transactions import Transaction
+from columnar import TransactionColumns, np
+
+# Размеры истории транзакций по умолчанию
+HISTORY_SIZES = [1_000_000, 10_000_000]
+
+# Количество счетов
+ACCOUNTS_COUNT = 10_000
+
+
+class DictTransaction:
+    """
+    Транзакция в прежнем виде: закрытые атрибуты в __dict__ экземпляра
+    """
+
+    def __init__(self, date: datetime.datetime, account: str, txn_type: str, amount: float) -> None:
+        self.__date = date.date()
+        self.__account = account
+        self.__txn_type = txn_type
+        self.__amount = amount
+
+
+def measure(build) -> int:
+    """
+    Прирост памяти (в байтах), занятой результатом build()
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    gc.collect()
+    return size
+
+
+def build_legacy(transactions_file: Path) -> list:
+    """
+    История в прежнем виде: разбор строки как в прежнем Transaction.load
+    """
+    items = []
+    with open(transactions_file, "r", encoding="UTF-8") as f:
+        for line in f:
+            date = datetime.datetime.strptime(line[:8], "%Y%m%d")
+            items.append(DictTransaction(date, line[8:14], line[14:15], float(line[15:])))
+    return items
+
+
+def build_slots(transactions_file: Path) -> list:
+    """
+    История из объектов Transaction
+    """
+    with open(transactions_file, "r", encoding="UTF-8") as f:
+        return [Transaction.load(line.rstrip("\n")) for line in f]
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or HISTORY_SIZES
+    print(f"{'Записей':>12}{'__dict__':>12}{'__slots__':>12}{'колонки':>12}   байт на запись")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            _, transactions_file = generate_data(Path(tmp_dir) / str(size), ACCOUNTS_COUNT, size)
+            legacy = measure(lambda: build_legacy(transactions_file))
+            slots = measure(lambda: build_slots(transactions_file))
+            columns = measure(lambda: TransactionColumns.load(transactions_file)) if np is not None else 0
+            print(f"{size:>12,}{legacy / 2 ** 20:>10.0f}MB{slots / 2 ** 20:>10.0f}MB{columns / 2 ** 20:>10.0f}MB"
+                  f"   {legacy // size} / {slots // size} / {columns // size}")
+
+
+if __name__ == "__main__":
+    main()
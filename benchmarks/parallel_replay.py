@@ -0,0 +1,65 @@
+# parallel_replay.py
+
+"""
+Время переигровки истории в зависимости от количества процессов.
+Запуск: python -m benchmarks.parallel_replay [количество записей] [процессы ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.generator import generate_data
+from accounts import AccountDict
+from parallel_replay import replay_parallel
+from transactions import TransactionList, TXN_TYPE_DEPOSIT
+
+# Размер истории транзакций по умолчанию
+HISTORY_SIZE = 1_000_000
+
+# Количество счетов
+ACCOUNTS_COUNT = 10_000
+
+
+def replay_sequential(accounts: AccountDict, transactions_file: Path) -> None:
+    """
+    Последовательная переигровка в текущем процессе
+    """
+    for txn in TransactionList.iter_file(transactions_file):
+        account = accounts[txn.account]
+        if txn.txn_type == TXN_TYPE_DEPOSIT:
+            account.deposit_minor(txn.amount_minor)
+        else:
+            account.withdraw_minor(txn.amount_minor)
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else HISTORY_SIZE
+    cpu_count = os.cpu_count() or 1
+    workers_list = [int(arg) for arg in sys.argv[2:]] or sorted({1, 2, 4, cpu_count})
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        accounts_file, transactions_file = generate_data(Path(tmp_dir), ACCOUNTS_COUNT, size)
+        print(f"Записей: {size:,}, процессоров: {cpu_count}")
+
+        accounts = AccountDict.load(accounts_file)
+        start = time.perf_counter()
+        replay_sequential(accounts, transactions_file)
+        sequential = time.perf_counter() - start
+        expected = {num: acc.balance_minor for num, acc in accounts.items()}
+        print(f"{'последовательно':>16}{sequential:>9.2f}s")
+
+        for workers in workers_list:
+            accounts = AccountDict.load(accounts_file)
+            start = time.perf_counter()
+            replay_parallel(transactions_file, 0, accounts, workers)
+            elapsed = time.perf_counter() - start
+            if {num: acc.balance_minor for num, acc in accounts.items()} != expected:
+                raise ValueError(f"Балансы не совпадают при {workers} процессах")
+            print(f"{workers:>16}{elapsed:>9.2f}s{sequential / elapsed:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# render.py
+
+"""
+Вывод всей истории транзакций: одна таблица rich против постраничных таблиц,
+простого текста и CSV. Вывод направляется в /dev/null.
+Запуск: python -m benchmarks.render [количество записей]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from rich.console import Console
+
+from benchmarks.generator import generate_data
+from application import Application
+from render import render, paginate, FORMAT_TABLE, FORMAT_PLAIN, FORMAT_CSV
+from transactions import TransactionList
+
+# Размер истории транзакций по умолчанию
+HISTORY_SIZE = 50_000
+
+# Количество счетов
+ACCOUNTS_COUNT = 1_000
+
+# Размер страницы для постраничного вывода таблиц
+PAGE_SIZE = 1_000
+
+
+class FirstWrite:
+    """
+    Файл вывода, который запоминает время первой записи
+    """
+
+    def __init__(self, out) -> None:
+        self.out = out
+        self.first: float = 0
+
+    def write(self, text: str) -> int:
+        if not self.first:
+            self.first = time.perf_counter()
+        return self.out.write(text)
+
+    def flush(self) -> None:
+        self.out.flush()
+
+
+def run(accounts_file: Path, transactions_file: Path, output_format: str, page_size: int) -> tuple[float, float]:
+    """
+    Вывести все транзакции. Возвращает время до первой строки и общее время, секунд
+    """
+    app = Application(accounts_file, transactions_file, replay_workers=1)
+    with open(os.devnull, "w", encoding="UTF-8") as devnull:
+        out = FirstWrite(devnull)
+        console = Console(file=out, width=100)
+        start = time.perf_counter()
+        if output_format == FORMAT_TABLE and page_size == 0:
+            # прежний способ: вся история в памяти и одна таблица со всеми строками
+            console.print(app.get_all_transactions(None))
+        else:
+            rows = paginate(TransactionList.table_rows(app.iter_transactions(None)))
+            render(output_format, console, TransactionList.create_table, rows, page_size)
+        elapsed = time.perf_counter() - start
+    return out.first - start, elapsed
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else HISTORY_SIZE
+    variants = [
+        ("одна таблица", FORMAT_TABLE, 0),
+        (f"таблицы по {PAGE_SIZE}", FORMAT_TABLE, PAGE_SIZE),
+        ("простой текст", FORMAT_PLAIN, 0),
+        ("CSV", FORMAT_CSV, 0),
+    ]
+    print(f"История: {size:,} транзакций")
+    print(f"{'Вывод':<20}{'первая строка':>15}{'всего':>10}{'пик памяти':>14}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        accounts_file, transactions_file = generate_data(Path(tmp_dir), ACCOUNTS_COUNT, size)
+        for name, output_format, page_size in variants:
+            first, elapsed = run(accounts_file, transactions_file, output_format, page_size)
+            tracemalloc.start()
+            run(accounts_file, transactions_file, output_format, page_size)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{name:<20}{first:>14.2f}s{elapsed:>9.2f}s{peak / 2 ** 20:>12.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
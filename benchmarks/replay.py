@@ -0,0 +1,63 @@
+# replay.py
+
+"""
+Время и пиковая память при переигровке истории: потоковое чтение против загрузки всей истории.
+Запуск: python -m benchmarks.replay [количество записей ...]
+"""
+
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.generator import generate_data
+from application import Application
+
+# Размеры истории транзакций по умолчанию
+HISTORY_SIZES = [100_000, 1_000_000]
+
+# Количество счетов
+ACCOUNTS_COUNT = 10_000
+
+
+def replay(accounts_file: Path, transactions_file: Path, with_history: bool) -> None:
+    """
+    Расчет балансов с нуля (без контрольной точки)
+    """
+    app = Application(accounts_file, transactions_file)
+    if with_history:
+        # история загружается целиком до расчета балансов
+        app.get_all_transactions("S00001")
+    app.get_account("S00001")
+
+
+def measure(accounts_file: Path, transactions_file: Path, with_history: bool) -> tuple[float, int]:
+    """
+    Время (без трассировки памяти) и пиковая память переигровки истории
+    """
+    start = time.perf_counter()
+    replay(accounts_file, transactions_file, with_history)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    replay(accounts_file, transactions_file, with_history)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or HISTORY_SIZES
+    print(f"{'Записей':>12}{'поток':>20}{'вся история':>22}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            accounts_file, transactions_file = generate_data(Path(tmp_dir) / str(size), ACCOUNTS_COUNT, size)
+            streamed = measure(accounts_file, transactions_file, with_history=False)
+            loaded = measure(accounts_file, transactions_file, with_history=True)
+            print(f"{size:>12,}{streamed[0]:>9.1f}s{streamed[1] / 2 ** 20:>9.0f}MB"
+                  f"{loaded[0]:>11.1f}s{loaded[1] / 2 ** 20:>9.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
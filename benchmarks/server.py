@@ -0,0 +1,90 @@
+# server.py
+
+"""
+Задержка запросов к серверу по сравнению с запуском CLI на каждую команду.
+Запуск: python -m benchmarks.server [количество записей истории]
+"""
+
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks import APP_DIR
+from benchmarks.generator import generate_data
+from client import BankClient
+
+# Размер истории транзакций по умолчанию
+HISTORY_SIZE = 100_000
+
+# Количество счетов
+ACCOUNTS_COUNT = 1_000
+
+# Количество запросов к серверу в одном подключении
+REQUESTS = 2_000
+
+# Количество запусков процесса на команду
+PROCESS_RUNS = 5
+
+
+def run_process(work_dir: Path, args: list[str]) -> float:
+    """
+    Медиана времени выполнения команды отдельным процессом, миллисекунд
+    """
+    timings = []
+    for _ in range(PROCESS_RUNS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, str(APP_DIR / "main.py"), *args],
+                       cwd=work_dir, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def wait_for_socket(socket_path: Path, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while not socket_path.exists():
+        if time.monotonic() > deadline:
+            raise TimeoutError("Сервер не запустился.")
+        time.sleep(0.05)
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else HISTORY_SIZE
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        work_dir = Path(tmp_dir)
+        generate_data(work_dir / "data", ACCOUNTS_COUNT, size)
+        cli_ms = run_process(work_dir, ["details", "S00001"])
+
+        socket_path = work_dir / "bank.sock"
+        server = subprocess.Popen([sys.executable, str(APP_DIR / "main.py"), "serve", "--socket", str(socket_path)],
+                                  cwd=work_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for_socket(socket_path)
+            remote_ms = run_process(work_dir, ["remote", "--socket", str(socket_path), "get-account", "S00001"])
+
+            latencies = {"get-account": [], "deposit": []}
+            with BankClient(socket_path) as client:
+                for idx in range(REQUESTS):
+                    command = "deposit" if idx % 2 else "get-account"
+                    params = {"account": "S00001", "amount": "1.00"} if idx % 2 else {"account": "S00001"}
+                    start = time.perf_counter()
+                    client.request(command, **params)
+                    latencies[command].append((time.perf_counter() - start) * 1000)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait()
+
+    print(f"История: {size:,} транзакций")
+    print(f"{'CLI: процесс на команду details':<40}{cli_ms:>10.1f} мс")
+    print(f"{'Клиент: процесс main.py remote':<40}{remote_ms:>10.1f} мс")
+    for command, timings in latencies.items():
+        timings.sort()
+        p99 = timings[int(len(timings) * 0.99)]
+        print(f"{'Запрос ' + command + ' (медиана/p99)':<40}{statistics.median(timings):>10.3f} / {p99:.3f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# startup.py
+
+"""
+Время запуска CLI для разных команд и разных размеров истории транзакций.
+Запуск: python -m benchmarks.startup
+"""
+
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks import APP_DIR
+from benchmarks.generator import generate_data
+
+# Размеры истории транзакций
+HISTORY_SIZES = [1_000, 10_000, 100_000]
+
+# Количество счетов
+ACCOUNTS_COUNT = 1_000
+
+# Сколько раз запускать каждую команду
+REPEAT = 3
+
+# Команды CLI и данные, которые им нужны
+COMMANDS = [
+    ["--help"],
+    ["export-accounts", "EXPORT.DAT"],
+    ["all-accounts"],
+    ["all-transactions", "S00001"],
+]
+
+
+def run_command(work_dir: Path, args: list[str]) -> float:
+    """
+    Лучшее время выполнения команды CLI (в секундах) из REPEAT запусков
+    """
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, str(APP_DIR / "main.py"), *args],
+                       cwd=work_dir, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    header = f"{'Команда':<30}" + "".join(f"{size:>14,}" for size in HISTORY_SIZES)
+    print(header)
+
+    results: dict[str, list[float]] = {" ".join(args): [] for args in COMMANDS}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in HISTORY_SIZES:
+            work_dir = Path(tmp_dir) / str(size)
+            generate_data(work_dir / "data", ACCOUNTS_COUNT, size)
+            for args in COMMANDS:
+                results[" ".join(args)].append(run_command(work_dir, args))
+
+    for command, timings in results.items():
+        print(f"{command:<30}" + "".join(f"{t * 1000:>12.1f}ms" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# stress.py
+
+"""
+Нагрузочная проверка параллельного проведения транзакций.
+Потоки проводят случайные депозиты и снятия по случайным счетам,
+итоговые балансы сверяются с последовательной переигровкой журнала.
+Запуск: python -m benchmarks.stress [транзакций на поток]
+"""
+
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.generator import generate_data
+from application import Application
+
+# Количество транзакций в каждом потоке по умолчанию
+TXN_PER_THREAD = 2_000
+
+# Количество параллельных потоков
+THREADS_COUNT = 8
+
+# Количество счетов
+ACCOUNTS_COUNT = 1_000
+
+# Количество полос блокировок: 1 - одна общая блокировка на все счета
+LOCK_STRIPES = [1, 64]
+
+
+def run(accounts_file: Path, transactions_file: Path, per_thread: int, lock_stripes: int) -> tuple[float, int]:
+    """
+    Транзакций в секунду и количество расхождений с последовательной переигровкой
+    """
+    app = Application(accounts_file, transactions_file, sync_every=0, group_commit=True,
+                      lock_stripes=lock_stripes)
+    app.get_all_accounts()
+
+    def post(seed: int) -> None:
+        rnd = random.Random(seed)
+        for _ in range(per_thread):
+            idx = rnd.randrange(ACCOUNTS_COUNT)
+            account_num = f"{'S' if idx % 2 == 0 else 'C'}{str(idx // 2 + 1).zfill(5)}"
+            try:
+                if rnd.random() < 0.5:
+                    app.deposit(account_num, rnd.randint(1, 10000) / 100)
+                else:
+                    app.withdraw(account_num, rnd.randint(1, 10000) / 100)
+            except ValueError:
+                # нарушение лимита - транзакция не проводится
+                pass
+
+    threads = [threading.Thread(target=post, args=(seed,)) for seed in range(THREADS_COUNT)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    app.close()
+    rate = THREADS_COUNT * per_thread / (time.perf_counter() - start)
+
+    replayed = Application(accounts_file, transactions_file, replay_workers=1)
+    mismatches = 0
+    for idx in range(ACCOUNTS_COUNT):
+        account_num = f"{'S' if idx % 2 == 0 else 'C'}{str(idx // 2 + 1).zfill(5)}"
+        if replayed.get_account(account_num).balance_minor != app.get_account(account_num).balance_minor:
+            mismatches += 1
+    return rate, mismatches
+
+
+def main() -> None:
+    per_thread = int(sys.argv[1]) if len(sys.argv) > 1 else TXN_PER_THREAD
+    print(f"Потоков: {THREADS_COUNT}, транзакций на поток: {per_thread:,}")
+    print(f"{'Полос блокировок':>18}{'txn/s':>12}{'расхождений':>14}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        accounts_file, transactions_file = generate_data(Path(tmp_dir) / "data", ACCOUNTS_COUNT, 0)
+        work_file = Path(tmp_dir) / "work.dat"
+        for lock_stripes in LOCK_STRIPES:
+            shutil.copy(transactions_file, work_file)
+            rate, mismatches = run(accounts_file, work_file, per_thread, lock_stripes)
+            print(f"{lock_stripes:>18}{rate:>12,.0f}{mismatches:>14}")
+            if mismatches:
+                raise ValueError("Балансы не совпадают с последовательной переигровкой")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+# suite.py
+
+"""
+Набор сценариев производительности на синтетических данных с сохранением результатов в JSON.
+Результаты двух запусков (например, двух коммитов) сравниваются командой compare.
+
+Запуск:
+    python -m benchmarks.suite run [--accounts N] [--history N] [--saving-share X] [--repeat N]
+                                   [--scenario ИМЯ ...] [--output results.json]
+    python -m benchmarks.suite compare old.json new.json [--threshold 0.1]
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, NamedTuple
+
+from rich.console import Console
+
+from benchmarks.generator import generate_data, SAVING_SHARE, START_DATE, TRANSACTIONS_PER_DAY
+from accounts import AccountDict
+from application import Application
+from render import render, FORMAT_PLAIN
+from transactions import TransactionList
+
+# Версия формата файла результатов
+RESULTS_VERSION = 1
+
+# Параметры данных по умолчанию
+ACCOUNTS_COUNT = 10_000
+HISTORY_SIZE = 200_000
+
+# Количество повторов каждого сценария
+REPEAT = 3
+
+# Количество операций в сценариях поиска, депозитов и создания счетов
+OPERATIONS = 1_000
+
+# Количество строк таблицы rich в сценарии render_table
+RENDER_TABLE_ROWS = 2_000
+
+# Замедление (доля), начиная с которого сравнение сообщает о регрессии
+REGRESSION_THRESHOLD = 0.10
+
+
+class Params(NamedTuple):
+    """ Параметры синтетических данных """
+    accounts: int
+    history: int
+    saving_share: float
+
+
+class Scenario(NamedTuple):
+    """
+    Сценарий: подготовка (не замеряется) и замеряемая часть.
+    setup получает файлы счетов и транзакций в отдельном каталоге и возвращает состояние для run;
+    run возвращает количество выполненных операций.
+    """
+    description: str
+    setup: Callable[[Path, Path, Params], Any]
+    run: Callable[[Any], int]
+
+
+def _files(accounts_file: Path, transactions_file: Path, params: Params) -> tuple[Path, Path, Params]:
+    return accounts_file, transactions_file, params
+
+
+def _load(state: tuple[Path, Path, Params]) -> int:
+    accounts_file, transactions_file, params = state
+    AccountDict.load(accounts_file)
+    TransactionList.load(transactions_file)
+    return params.history
+
+
+def _replay(state: tuple[Path, Path, Params]) -> int:
+    accounts_file, transactions_file, params = state
+    app = Application(accounts_file, transactions_file, replay_workers=1)
+    app.preload()
+    return params.history
+
+
+def _loaded_history(accounts_file: Path, transactions_file: Path, params: Params) -> TransactionList:
+    return TransactionList.load(transactions_file)
+
+
+def _search(transactions: TransactionList) -> int:
+    numbers = sorted({txn.account for txn in transactions[:OPERATIONS * 10]})
+    days = max(1, len(transactions) // TRANSACTIONS_PER_DAY)
+    for idx in range(OPERATIONS):
+        account_num = numbers[idx % len(numbers)]
+        transactions.search(account_num)
+        start = START_DATE + datetime.timedelta(days=idx % days)
+        transactions.between(start, start + datetime.timedelta(days=6), account_num)
+    return OPERATIONS
+
+
+def _preloaded_app(accounts_file: Path, transactions_file: Path, params: Params) -> Application:
+    app = Application(accounts_file, transactions_file, replay_workers=1)
+    app.preload()
+    return app
+
+
+def _deposit(app: Application) -> int:
+    numbers = [account.account_number for account in app.iter_accounts()]
+    for idx in range(OPERATIONS):
+        app.deposit(numbers[idx % len(numbers)], 1)
+    app.close()
+    return OPERATIONS
+
+
+def _add_account(app: Application) -> int:
+    for idx in range(OPERATIONS):
+        app.add_new_account(f"Customer {idx}", "S" if idx % 2 == 0 else "C", 0)
+    app.close()
+    return OPERATIONS
+
+
+def _loaded_data(accounts_file: Path, transactions_file: Path,
+                 params: Params) -> tuple[AccountDict, TransactionList, Path]:
+    return AccountDict.load(accounts_file), TransactionList.load(transactions_file), accounts_file.parent
+
+
+def _save(state: tuple[AccountDict, TransactionList, Path]) -> int:
+    accounts, transactions, directory = state
+    accounts.save(directory / "ACCOUNTS.OUT")
+    transactions.save(directory / "TRANSACTIONS.OUT")
+    return len(accounts) + len(transactions)
+
+
+def _render_table(state: tuple[AccountDict, TransactionList, Path]) -> int:
+    _, transactions, _ = state
+    with open(os.devnull, "w", encoding="UTF-8") as devnull:
+        table = TransactionList.create_table()
+        for row in TransactionList.table_rows(transactions[:RENDER_TABLE_ROWS]):
+            table.add_row(*row)
+        Console(file=devnull, width=100).print(table)
+    return min(RENDER_TABLE_ROWS, len(transactions))
+
+
+def _render_plain(state: tuple[AccountDict, TransactionList, Path]) -> int:
+    accounts, transactions, _ = state
+    with open(os.devnull, "w", encoding="UTF-8") as devnull:
+        console = Console(file=devnull)
+        count = render(FORMAT_PLAIN, console, AccountDict.create_table, AccountDict.table_rows(accounts.values()))
+        count += render(FORMAT_PLAIN, console, TransactionList.create_table, TransactionList.table_rows(transactions))
+    return count
+
+
+# Сценарии по имени
+SCENARIOS: dict[str, Scenario] = {
+    "load": Scenario("Загрузка ACCOUNTS.DAT и TRANSACTIONS.DAT", _files, _load),
+    "replay": Scenario("Расчет балансов переигровкой истории", _files, _replay),
+    "search": Scenario("Поиск по счету и по периоду", _loaded_history, _search),
+    "deposit": Scenario("Депозиты через Application", _preloaded_app, _deposit),
+    "add_account": Scenario("Создание счетов через Application", _preloaded_app, _add_account),
+    "save": Scenario("Полная запись счетов и истории", _loaded_data, _save),
+    "render_table": Scenario(f"Таблица rich на {RENDER_TABLE_ROWS} строк", _loaded_data, _render_table),
+    "render_plain": Scenario("Вывод счетов и истории простым текстом", _loaded_data, _render_plain),
+}
+
+
+def run_scenario(scenario: Scenario, data_dir: Path, work_dir: Path, params: Params, repeat: int) -> dict[str, Any]:
+    """
+    Выполнить сценарий repeat раз на свежей копии данных.
+    Возвращает время каждого повтора, медиану, минимум и операций в секунду по медиане.
+    """
+    timings = []
+    operations = 0
+    for _ in range(repeat):
+        if work_dir.exists():
+            shutil.rmtree(work_dir)
+        shutil.copytree(data_dir, work_dir)
+        state = scenario.setup(work_dir / "ACCOUNTS.DAT", work_dir / "TRANSACTIONS.DAT", params)
+        start = time.perf_counter()
+        operations = scenario.run(state)
+        timings.append(time.perf_counter() - start)
+    median = statistics.median(timings)
+    return {
+        "description": scenario.description,
+        "operations": operations,
+        "timings": timings,
+        "median": median,
+        "min": min(timings),
+        "ops_per_second": operations / median if median > 0 else None,
+    }
+
+
+def environment() -> dict[str, Any]:
+    """
+    Описание окружения запуска: коммит, версия Python, платформа
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def run(args: argparse.Namespace) -> int:
+    params = Params(args.accounts, args.history, args.saving_share)
+    names = args.scenario or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        print(f"Неизвестные сценарии: {', '.join(unknown)}. Доступны: {', '.join(SCENARIOS)}", file=sys.stderr)
+        return 2
+
+    results: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = Path(tmp_dir) / "data"
+        generate_data(data_dir, params.accounts, params.history, saving_share=params.saving_share)
+        for name in names:
+            results[name] = run_scenario(SCENARIOS[name], data_dir, Path(tmp_dir) / "work", params, args.repeat)
+            print(f"{name:<15}{results[name]['median']:>10.3f} с{results[name]['ops_per_second'] or 0:>14,.0f} оп/с")
+
+    report = {
+        "version": RESULTS_VERSION,
+        "environment": environment(),
+        "params": params._asdict(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output is not None:
+        with open(args.output, "w", encoding="UTF-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Результаты записаны: {args.output}")
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    """
+    Сравнить медианы сценариев двух запусков.
+    Код возврата 1, если хотя бы один сценарий замедлился больше порога.
+    """
+    with open(args.old, encoding="UTF-8") as f:
+        old = json.load(f)
+    with open(args.new, encoding="UTF-8") as f:
+        new = json.load(f)
+    if old.get("params") != new.get("params"):
+        print(f"Внимание: параметры данных различаются: {old.get('params')} и {new.get('params')}")
+
+    print(f"{old['environment'].get('commit')} -> {new['environment'].get('commit')}")
+    print(f"{'Сценарий':<15}{'было':>10}{'стало':>10}{'изменение':>12}")
+    regressions = 0
+    for name, result in new["results"].items():
+        if name not in old["results"]:
+            continue
+        before, after = old["results"][name]["median"], result["median"]
+        change = (after - before) / before if before > 0 else 0.0
+        mark = ""
+        if change > args.threshold:
+            mark = "  РЕГРЕССИЯ"
+            regressions += 1
+        print(f"{name:<15}{before:>9.3f}с{after:>9.3f}с{change:>+11.1%}{mark}")
+    return 1 if regressions else 0
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite",
+                                     description="Сценарии производительности bank_accounts")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="выполнить сценарии")
+    run_parser.add_argument("--accounts", type=int, default=ACCOUNTS_COUNT, help="количество счетов")
+    run_parser.add_argument("--history", type=int, default=HISTORY_SIZE, help="количество транзакций")
+    run_parser.add_argument("--saving-share", type=float, default=SAVING_SHARE, help="доля счетов S")
+    run_parser.add_argument("--repeat", type=int, default=REPEAT, help="повторов каждого сценария")
+    run_parser.add_argument("--scenario", action="append", help=f"сценарий: {', '.join(SCENARIOS)}")
+    run_parser.add_argument("--output", type=Path, default=None, help="файл результатов JSON")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="сравнить два файла результатов")
+    compare_parser.add_argument("old", type=Path)
+    compare_parser.add_argument("new", type=Path)
+    compare_parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                                help="допустимое замедление (доля)")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
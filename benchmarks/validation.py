@@ -0,0 +1,126 @@
+# validation.py
+
+"""
+Стоимость проверки записей в пересчете на одну строку:
+номер счета (прежний разбор по символам, общий шаблон, пакетная проверка колонки)
+и загрузка транзакций (проверка каждой строки, пакетная проверка, проверенное начало файла по CRC).
+Запуск: python -m benchmarks.validation [количество строк]
+"""
+
+import gc
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from typing import Callable
+
+from benchmarks.generator import generate_data
+from accounts import validate_account_number, validate_account_numbers, AccountDict, ACC_TYPE_SAVING, ACC_TYPE_CURRENT
+from transactions import Transaction, TransactionList
+
+# Количество строк по умолчанию
+ROWS = 200_000
+
+# Количество счетов
+ACCOUNTS_COUNT = 10_000
+
+# Количество повторов, берется лучшее время
+REPEAT = 5
+
+
+def validate_by_symbols(account: str) -> None:
+    """
+    Прежняя проверка номера счета: разбор по символам
+    """
+    if len(account) != 6:
+        raise ValueError("Номер счета должен содержать 6 символов.")
+    for idx, sym in enumerate(account):
+        if idx == 0 and sym != ACC_TYPE_SAVING and sym != ACC_TYPE_CURRENT:
+            raise ValueError("Первый символ счета должен содержать буквы S или C")
+        if idx > 0 and not sym.isdigit():
+            raise ValueError("Номер счета должен содержать только цифры.")
+
+
+def best_time(func: Callable[[], object]) -> float:
+    """
+    Лучшее время из REPEAT запусков. Сборщик мусора на время замера выключен: его проходы
+    по растущему числу объектов добавляют к каждому варианту разный шум
+    """
+    timings = []
+    for _ in range(REPEAT):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return min(timings)
+
+
+def report(name: str, seconds: float, rows: int) -> None:
+    print(f"{name:<45}{seconds * 1e9 / rows:>10.0f} нс/строку")
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    print(f"Строк: {rows:,}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        accounts_file, transactions_file = generate_data(Path(tmp_dir), ACCOUNTS_COUNT, rows)
+        data = transactions_file.read_bytes()
+        lines = data.decode("UTF-8").splitlines()
+        accounts = [line[8:14] for line in lines]
+
+        def by_symbols() -> None:
+            for account in accounts:
+                validate_by_symbols(account)
+
+        def by_pattern() -> None:
+            for account in accounts:
+                validate_account_number(account)
+
+        report("Номер счета: разбор по символам", best_time(by_symbols), rows)
+        report("Номер счета: общий шаблон", best_time(by_pattern), rows)
+        report("Номер счета: пакетная проверка колонки", best_time(lambda: validate_account_numbers(accounts)), rows)
+
+        fields = [Transaction._parse(line) for line in lines]
+
+        def fields_by_symbols() -> None:
+            # прежняя проверка транзакции: каждое поле каждой строки
+            for _, account, txn_type, amount in fields:
+                validate_by_symbols(account)
+                Transaction._validate_txn_type(txn_type)
+                Transaction._validate_amount(amount)
+
+        def fields_by_row() -> None:
+            for _, account, txn_type, amount in fields:
+                Transaction._validate_account(account)
+                Transaction._validate_txn_type(txn_type)
+                Transaction._validate_amount(amount)
+
+        def fields_by_column() -> None:
+            validate_account_numbers(account for _, account, _, _ in fields)
+            if not {txn_type for _, _, txn_type, _ in fields} <= {"D", "W"} or min(f[3] for f in fields) <= 0:
+                raise ValueError("Некорректные транзакции")
+
+        report("Поля транзакции: разбор по символам", best_time(fields_by_symbols), rows)
+        report("Поля транзакции: общий шаблон", best_time(fields_by_row), rows)
+        report("Поля транзакции: пакетная проверка колонок", best_time(fields_by_column), rows)
+
+        def row_by_row() -> TransactionList:
+            # загрузка с проверкой каждой строки отдельно
+            return TransactionList(Transaction.load(line) for line in lines)
+
+        trusted = (len(data), zlib.crc32(data))
+        report("Загрузка: проверка каждой строки", best_time(row_by_row), rows)
+        report("Загрузка: пакетная проверка", best_time(lambda: TransactionList.load_lines(lines)), rows)
+        report("Загрузка файла: пакетная проверка", best_time(lambda: TransactionList.load(transactions_file)), rows)
+        report("Загрузка файла: проверенный по CRC",
+               best_time(lambda: TransactionList.load(transactions_file, trusted_prefix=trusted)), rows)
+        report("Счета: загрузка файла", best_time(lambda: AccountDict.load(accounts_file)), ACCOUNTS_COUNT)
+
+
+if __name__ == "__main__":
+    main()
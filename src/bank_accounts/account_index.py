@@ -0,0 +1,124 @@
+# account_index.py
+
+"""
+Индекс файла транзакций по номерам счетов
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Optional
+
+from transactions import Transaction, TransactionList, read_last_record, is_record_boundary
+from storage import atomic_write
+
+
+class AccountIndex:
+    """
+    Индекс файла транзакций: номер счета -> смещения (в байтах) его записей.
+    Позволяет прочитать историю одного счета, не загружая весь файл.
+    Индекс покрывает первые size байт файла, записи после них
+    дочитываются при обновлении индекса (update).
+    """
+
+    def __init__(self, size: int = 0, last_record: str = "", offsets: Optional[dict[str, list[int]]] = None) -> None:
+        self.__size = size
+        self.__last_record = last_record
+        self.__offsets: dict[str, list[int]] = offsets if offsets is not None else {}
+
+    @property
+    def size(self) -> int:
+        """ Количество байт файла транзакций, покрытых индексом """
+        return self.__size
+
+    def offsets(self, account_num: str) -> list[int]:
+        """
+        Смещения записей по номеру счета
+        """
+        return list(self.__offsets.get(account_num, []))
+
+    def matches(self, transactions_file: Path) -> bool:
+        """
+        Проверка, что индекс соответствует файлу транзакций (файл не был перезаписан)
+        """
+        if self.__size == 0:
+            return True
+        if not os.path.isfile(transactions_file) or os.path.getsize(transactions_file) < self.__size:
+            return False
+        if not is_record_boundary(transactions_file, self.__size):
+            return False
+        return read_last_record(transactions_file, self.__size) == self.__last_record
+
+    def update(self, transactions_file: Path) -> int:
+        """
+        Дочитать в индекс записи, добавленные в файл после последнего обновления.
+        Возвращает количество новых записей.
+        """
+        count = 0
+        offset = self.__size
+        with open(transactions_file, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                record = line.rstrip(b"\r\n")
+                if record:
+                    self.__offsets.setdefault(record[8:14].decode("UTF-8"), []).append(offset)
+                    count += 1
+                offset += len(line)
+
+        if offset != self.__size:
+            self.__size = offset
+            self.__last_record = read_last_record(transactions_file, offset)
+        return count
+
+    def read_transactions(self, transactions_file: Path, account_num: str) -> TransactionList:
+        """
+        Прочитать из файла транзакции по номеру счета
+        """
+        items = TransactionList()
+        with open(transactions_file, "rb") as f:
+            for offset in self.__offsets.get(account_num, []):
+                f.seek(offset)
+                items.append(Transaction.load(f.readline().decode("UTF-8").rstrip("\r\n")))
+        return items
+
+    def save(self, file_name: Path) -> None:
+        """
+        Сохранение индекса в файл.
+        Файл заменяется целиком, чтобы не оставить на диске половину индекса.
+        """
+        lines = [f"{self.__size:15}", self.__last_record]
+        lines.extend(f"{account_num} {' '.join(str(offset) for offset in offsets)}"
+                     for account_num, offsets in self.__offsets.items())
+        with atomic_write(file_name) as f:
+            f.write("".join(f"{line}\n" for line in lines).encode("UTF-8"))
+
+    @staticmethod
+    def load(file_name: Path) -> Optional[AccountIndex]:
+        """
+        Загрузка индекса из файла.
+        Если файла нет - возвращает None.
+        """
+        if not os.path.isfile(file_name):
+            return None
+
+        with open(file_name, "r", encoding="UTF-8") as f:
+            lines = f.read().splitlines()
+
+        if len(lines) < 2:
+            raise ValueError(f"Некорректный формат файла индекса: {file_name}")
+
+        offsets: dict[str, list[int]] = {}
+        for line in lines[2:]:
+            offsets[line[:6]] = [int(offset) for offset in line[7:].split()]
+
+        return AccountIndex(int(lines[0]), lines[1], offsets)
+
+    @staticmethod
+    def build(transactions_file: Path) -> AccountIndex:
+        """
+        Построить индекс по всему файлу транзакций
+        """
+        index = AccountIndex()
+        if os.path.isfile(transactions_file):
+            index.update(transactions_file)
+        return index
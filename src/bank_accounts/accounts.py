@@ -5,26 +5,96 @@
 """
 from __future__ import annotations
 
+import os
+import re
 from pathlib import Path
+from typing import Iterable, Iterator, Optional
 
 from rich.table import Table
 
+from money import to_minor, from_minor, format_minor
+from storage import atomic_write, WriteAheadLog
+
 # Максимальная сумма на счете по умолчанию
 DEFAULT_MAX_LIMIT = 1000000.00
 
 # Минимальная сумма на счете по умолчанию
 DEFAULT_MIN_LIMIT = -10000.00
 
+# Лимиты по умолчанию в копейках
+DEFAULT_MAX_LIMIT_MINOR = to_minor(DEFAULT_MAX_LIMIT)
+DEFAULT_MIN_LIMIT_MINOR = to_minor(DEFAULT_MIN_LIMIT)
+
 # Допустимые типы счетов
 ACC_TYPE_SAVING = "S"
 ACC_TYPE_CURRENT = "C"
 
+# Максимальный номер счета (5 цифр после типа счета)
+MAX_ACCOUNT_NUMBER = 99999
+
+# Корректный номер счета: тип счета и 5 цифр
+_ACCOUNT_NUMBER_RE = re.compile(f"[{ACC_TYPE_SAVING}{ACC_TYPE_CURRENT}][0-9]{{5}}")
+
+# Ширина записи счета в файле (номер, имя, баланс, лимиты).
+# Записи без лимитов дополняются пробелами, чтобы установка лимитов
+# перезаписывала запись на месте.
+ACCOUNT_RECORD_WIDTH = 80
+
+
+def validate_account_number(account: str) -> None:
+    """
+    Проверка номера счета: 6 символов, первый - тип счета (S или C), остальные - цифры.
+    Корректный номер проверяется одним сравнением с шаблоном,
+    разбор по символам нужен только для сообщения об ошибке.
+    """
+    if _ACCOUNT_NUMBER_RE.fullmatch(account):
+        return
+    if len(account) != 6:
+        raise ValueError("Номер счета должен содержать 6 символов.")
+    if account[0] != ACC_TYPE_SAVING and account[0] != ACC_TYPE_CURRENT:
+        raise ValueError("Первый символ счета должен содержать буквы S или C")
+    raise ValueError("Номер счета должен содержать только цифры.")
+
+
+def validate_account_numbers(accounts: Iterable[str]) -> None:
+    """
+    Пакетная проверка номеров счетов (например, колонки счетов при загрузке файла):
+    каждый различный номер проверяется один раз.
+    """
+    for account in set(accounts):
+        validate_account_number(account)
+
 
 class AccountDict(dict[str, "Account"]):
     """
-    Реестр банковских счетов
+    Реестр банковских счетов.
+    Для каждого типа счета хранится наибольший выданный номер,
+    следующий свободный номер определяется без просмотра реестра.
+    Для файла, из которого реестр загружен (или в который сохранен),
+    хранятся смещения записей, чтобы сохранять изменения отдельных счетов
+    без перезаписи всего файла.
     """
 
+    def __init__(self) -> None:
+        super().__init__()
+        self.__last_numbers: dict[str, int] = {ACC_TYPE_SAVING: 0, ACC_TYPE_CURRENT: 0}
+        # файл реестра, его размер и смещение/длина (в байтах) записи каждого счета
+        self.__file_name: Optional[Path] = None
+        self.__file_size = 0
+        self.__records: dict[str, tuple[int, int]] = {}
+
+    def __setitem__(self, key: str, value: Account) -> None:
+        dict.__setitem__(self, key, value)
+        acc_type = key[:1]
+        if acc_type in self.__last_numbers:
+            num = int(key[1:6])
+            if num > self.__last_numbers[acc_type]:
+                self.__last_numbers[acc_type] = num
+
+    def __reduce__(self):
+        # при восстановлении (pickle, copy) счета добавляются через __setitem__
+        return AccountDict, (), None, None, iter(self.items())
+
     def __getitem__(self, key):
         try:
             val = dict.__getitem__(self, key)
@@ -44,11 +114,55 @@ class AccountDict(dict[str, "Account"]):
     def save(self, file_name: Path) -> None:
         """
         Сохранение списка счетов в указанный файл.
-        Если файл уже существует, он будет перезаписан.
+        Если файл уже существует, он будет заменен целиком (через временный файл).
         """
-        with open(file_name, "w", encoding="UTF-8") as f:
+        records: dict[str, tuple[int, int]] = {}
+        offset = 0
+        with atomic_write(file_name) as f:
             for account in list(self.values()):
-                f.write(f"{account.dump()}\n")
+                record = account.dump().ljust(ACCOUNT_RECORD_WIDTH).encode("UTF-8")
+                f.write(record + b"\n")
+                records[account.account_number] = (offset, len(record))
+                offset += len(record) + 1
+        self._bind_file(file_name, offset, records)
+
+    def save_changes(self, file_name: Path, account_nums: Iterable[str]) -> None:
+        """
+        Сохранение изменений отдельных счетов в файл реестра.
+        Записи существующих счетов перезаписываются на месте, новые счета дописываются в конец.
+        Изменения проходят через журнал предзаписи, поэтому сбой не оставит запись записанной наполовину.
+        Если файл не совпадает с загруженным или длина записи изменилась - файл перезаписывается целиком.
+        """
+        if not self._is_bound_to(file_name):
+            self.save(file_name)
+            return
+
+        changes: list[tuple[int, bytes]] = []
+        appended: list[tuple[str, bytes]] = []
+        for account_num in account_nums:
+            record = self[account_num].dump().ljust(ACCOUNT_RECORD_WIDTH).encode("UTF-8")
+            known = self.__records.get(account_num)
+            if known is None:
+                appended.append((account_num, record))
+            elif known[1] == len(record):
+                changes.append((known[0], record))
+            else:
+                self.save(file_name)
+                return
+
+        offset = self.__file_size
+        if appended:
+            tail = bytearray()
+            if offset > 0 and not self._ends_with_newline(file_name):
+                tail += b"\n"
+            for account_num, record in appended:
+                self.__records[account_num] = (offset + len(tail), len(record))
+                tail += record + b"\n"
+            changes.append((offset, bytes(tail)))
+            offset += len(tail)
+
+        WriteAheadLog(file_name).write(changes)
+        self.__file_size = offset
 
     @staticmethod
     def load(file_name: Path) -> AccountDict:
@@ -57,18 +171,53 @@ class AccountDict(dict[str, "Account"]):
         Возвращает новый реестр счетов.
         """
         items = AccountDict()
-        with open(file_name, "r", encoding="UTF-8") as f:
-            acc_lines = f.read().splitlines()
-            for acc_line in acc_lines:
-                acc = Account.load(acc_line)
+        records: dict[str, tuple[int, int]] = {}
+        offset = 0
+        with open(file_name, "rb") as f:
+            data = f.read()
+        for raw_line in data.splitlines(keepends=True):
+            record = raw_line.rstrip(b"\r\n")
+            if record:
+                acc = Account.load(record.decode("UTF-8"))
                 items[acc.account_number] = acc
+                records[acc.account_number] = (offset, len(record))
+            offset += len(raw_line)
+        items._bind_file(file_name, offset, records)
         return items
 
+    @staticmethod
+    def _ends_with_newline(file_name: Path) -> bool:
+        with open(file_name, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _bind_file(self, file_name: Path, file_size: int, records: dict[str, tuple[int, int]]) -> None:
+        self.__file_name = Path(file_name)
+        self.__file_size = file_size
+        self.__records = records
+
+    def _is_bound_to(self, file_name: Path) -> bool:
+        """
+        Смещения записей действительны: файл тот же и не изменялся извне
+        """
+        if self.__file_name is None or Path(file_name) != self.__file_name:
+            return False
+        return os.path.isfile(file_name) and os.path.getsize(file_name) == self.__file_size
+
     def to_table_view(self) -> Table:
         """
         Список всех счетов в виде таблицы
         """
+        table = self.create_table()
+        for row in self.table_rows(self.values()):
+            table.add_row(*row)
+        return table
 
+    @staticmethod
+    def create_table() -> Table:
+        """
+        Пустая таблица счетов с заголовками колонок
+        """
         table = Table(show_header=True, header_style="bold blue")
         table.add_column("#", style="dim", width=6)
         table.add_column("Тип счета", min_width=15)
@@ -76,7 +225,13 @@ class AccountDict(dict[str, "Account"]):
         table.add_column("Баланс", min_width=15, justify="right")
         table.add_column("Мин. лимит", min_width=15, justify="right")
         table.add_column("Макс. лимит", min_width=15, justify="right")
+        return table
 
+    @staticmethod
+    def table_rows(accounts: Iterable[Account]) -> Iterator[tuple[str, ...]]:
+        """
+        Строки таблицы счетов. Формируются по одной, по мере перебора счетов.
+        """
         def get_account_type(account_number: str) -> str:
             if account_number[0] == ACC_TYPE_SAVING:
                 return "Сберегательный"
@@ -84,24 +239,22 @@ class AccountDict(dict[str, "Account"]):
                 return "Текущий"
             return ""
 
-        accounts = self.values()
-
         for account in accounts:
 
             acc_type = get_account_type(account.account_number)
-            acc_balance = f"{account.balance:.2f}"
+            acc_balance = format_minor(account.balance_minor)
 
-            if account.min_limit != DEFAULT_MIN_LIMIT:
-                acc_min_limit = f"{account.min_limit:.2f}"
+            if account.min_limit_minor != DEFAULT_MIN_LIMIT_MINOR:
+                acc_min_limit = format_minor(account.min_limit_minor)
             else:
                 acc_min_limit = ""
 
-            if account.max_limit != DEFAULT_MAX_LIMIT:
-                acc_max_limit = f"{account.max_limit:.2f}"
+            if account.max_limit_minor != DEFAULT_MAX_LIMIT_MINOR:
+                acc_max_limit = format_minor(account.max_limit_minor)
             else:
                 acc_max_limit = ""
 
-            table.add_row(
+            yield (
                 account.account_number,
                 acc_type,
                 account.customer_name,
@@ -109,39 +262,57 @@ class AccountDict(dict[str, "Account"]):
                 acc_min_limit,
                 acc_max_limit)
 
-        return table
-
     def get_next_free_account_number(self, acc_type: str) -> str:
-        max_num = 0
-        for acc in self.values():
-            if acc.account_number[0] != acc_type:
-                continue
-            account_no = acc.account_number[1:6]
-            num = int(account_no)
-            if num > max_num:
-                max_num = num
-        max_num = max_num + 1
+        """
+        Следующий свободный номер счета указанного типа.
+        Номер не резервируется - он будет занят при добавлении счета в реестр.
+        """
+        return self._format_account_number(acc_type, self._get_last_number(acc_type) + 1)
 
-        return f"{acc_type}{str(max_num).zfill(5)}"
+    def reserve_account_numbers(self, acc_type: str, count: int) -> list[str]:
+        """
+        Зарезервировать count номеров счетов указанного типа подряд.
+        Зарезервированные номера не выдаются повторно, даже если счета не будут добавлены.
+        """
+        first = self._get_last_number(acc_type) + 1
+        numbers = [self._format_account_number(acc_type, num) for num in range(first, first + count)]
+        self.__last_numbers[acc_type] = first + count - 1
+        return numbers
+
+    def _get_last_number(self, acc_type: str) -> int:
+        if acc_type not in self.__last_numbers:
+            raise ValueError(f"Invalid account type: {acc_type}")
+        return self.__last_numbers[acc_type]
+
+    @staticmethod
+    def _format_account_number(acc_type: str, num: int) -> str:
+        if num > MAX_ACCOUNT_NUMBER:
+            raise ValueError(f"Исчерпаны номера счетов типа {acc_type}.")
+        return f"{acc_type}{str(num).zfill(5)}"
 
 
 class Account:
     """
-        Супер-класс для банковского счета
+        Супер-класс для банковского счета.
+        Баланс и лимиты хранятся в копейках (целые числа).
     """
 
+    # без __dict__ у каждого экземпляра
+    __slots__ = ("__max_limit", "__min_limit", "__account_num", "__customer_name", "__balance", "__initial_balance")
+
     def __init__(self, account_number: str, customer_name: str, balance: float) -> None:
-        self.__max_limit = DEFAULT_MAX_LIMIT
-        self.__min_limit = DEFAULT_MIN_LIMIT
+        self.__max_limit = DEFAULT_MAX_LIMIT_MINOR
+        self.__min_limit = DEFAULT_MIN_LIMIT_MINOR
 
+        balance_minor = to_minor(balance)
         self._validate_account(account_number)
         self._validate_customer_name(customer_name)
-        self._validate_balance(balance)
+        self._validate_balance(balance_minor)
 
         self.__account_num = account_number
         self.__customer_name = customer_name
-        self.__balance = balance
-        self.__initial_balance = balance
+        self.__balance = balance_minor
+        self.__initial_balance = balance_minor
 
     @property
     def account_number(self) -> str:
@@ -158,36 +329,75 @@ class Account:
     @property
     def balance(self) -> float:
         """ Баланс по счету """
+        return from_minor(self.__balance)
+
+    @property
+    def balance_minor(self) -> int:
+        """ Баланс по счету в копейках """
         return self.__balance
 
     @property
     def max_limit(self) -> float:
         """ Максимальный лимит по счету """
+        return from_minor(self.__max_limit)
+
+    @property
+    def max_limit_minor(self) -> int:
+        """ Максимальный лимит по счету в копейках """
         return self.__max_limit
 
     @property
     def min_limit(self) -> float:
         """ Минимальный лимит по счету """
+        return from_minor(self.__min_limit)
+
+    @property
+    def min_limit_minor(self) -> int:
+        """ Минимальный лимит по счету в копейках """
         return self.__min_limit
 
+    @classmethod
+    def from_minor_units(cls, account_number: str, customer_name: str, balance: int) -> Account:
+        """ Создать счет с балансом в копейках, без промежуточного float """
+        account = cls(account_number, customer_name, 0)
+        account.set_balance_minor(balance)
+        account.__initial_balance = balance
+        return account
+
     def set_limits(self, min_limit: float = 0, max_limit: float = 0) -> None:
         """ Установить лимиты по счету """
+        self.set_limits_minor(to_minor(min_limit), to_minor(max_limit))
+
+    def set_limits_minor(self, min_limit: int, max_limit: int) -> None:
+        """ Установить лимиты по счету в копейках """
         self.__min_limit = min_limit
         self.__max_limit = max_limit
 
     def set_balance(self, new_balance: float) -> None:
         """ Установить баланс """
+        self.set_balance_minor(to_minor(new_balance))
+
+    def set_balance_minor(self, new_balance: int) -> None:
+        """ Установить баланс в копейках """
         self._validate_balance(new_balance)
         self.__balance = new_balance
 
     def deposit(self, amount: float) -> None:
         """ Внести депозит """
+        self.deposit_minor(to_minor(amount))
+
+    def deposit_minor(self, amount: int) -> None:
+        """ Внести депозит в копейках """
         new_balance = self.__balance + amount
         self._validate_balance(new_balance)
         self.__balance = new_balance
 
     def withdraw(self, amount: float) -> None:
         """ Снять деньги """
+        self.withdraw_minor(to_minor(amount))
+
+    def withdraw_minor(self, amount: int) -> None:
+        """ Снять деньги в копейках """
         new_balance = self.__balance - amount
         self._validate_balance(new_balance)
         self.__balance = new_balance
@@ -196,20 +406,21 @@ class Account:
         """ Информация по счету """
         print(f"Номер счета: {self.__account_num}")
         print(f"Клиент: {self.__customer_name}")
-        print(f"Баланс: {self.__balance:.2f}")
-        if self.__min_limit != DEFAULT_MIN_LIMIT:
-            print(f"Минимальный лимит: {self.__min_limit:.2f}")
-        if self.__max_limit != DEFAULT_MAX_LIMIT:
-            print(f"Максимальный лимит: {self.__max_limit:.2f}")
+        print(f"Баланс: {format_minor(self.__balance)}")
+        if self.__min_limit != DEFAULT_MIN_LIMIT_MINOR:
+            print(f"Минимальный лимит: {format_minor(self.__min_limit)}")
+        if self.__max_limit != DEFAULT_MAX_LIMIT_MINOR:
+            print(f"Максимальный лимит: {format_minor(self.__max_limit)}")
 
     def dump(self) -> str:
         """
         Выгрузка счета в формате, пригодном для сохранения в файл
         """
-        # TODO: Save and restore limits
-        if self.__min_limit == DEFAULT_MIN_LIMIT and self.__max_limit == DEFAULT_MAX_LIMIT:
-            return f"{self.__account_num}{self.customer_name:29}{self.__initial_balance:15}"
-        return f"{self.__account_num}{self.customer_name:29}{self.__initial_balance:15}{self.__min_limit:15}{self.__max_limit:15}"
+        balance = format_minor(self.__initial_balance)
+        if self.__min_limit == DEFAULT_MIN_LIMIT_MINOR and self.__max_limit == DEFAULT_MAX_LIMIT_MINOR:
+            return f"{self.__account_num}{self.customer_name:29}{balance:>15}"
+        return (f"{self.__account_num}{self.customer_name:29}{balance:>15}"
+                f"{format_minor(self.__min_limit):>15}{format_minor(self.__max_limit):>15}")
 
     @staticmethod
     def load(line: str) -> Account:
@@ -218,14 +429,14 @@ class Account:
         """
         account_no = line[:6]
         customer_name = line[6:35].strip()
-        balance = float(line[35:50])
+        balance = to_minor(line[35:50])
         account: Account
         if account_no[0] == ACC_TYPE_SAVING:
             # создать сберегательный счет
-            account = SavingAccount(account_no, customer_name, balance)
+            account = SavingAccount.from_minor_units(account_no, customer_name, balance)
         elif account_no[0] == ACC_TYPE_CURRENT:
             # создать текущий счет
-            account = CurrentAccount(account_no, customer_name, balance)
+            account = CurrentAccount.from_minor_units(account_no, customer_name, balance)
         else:
             raise ValueError(f"Некорректный тип счета в строке: {line}")
 
@@ -233,13 +444,7 @@ class Account:
         return account
 
     def _validate_account(self, account: str) -> None:
-        if len(account) != 6:
-            raise ValueError("Номер счета должен содержать 6 символов.")
-        for idx, sym in enumerate(account):
-            if idx == 0 and sym != ACC_TYPE_SAVING and sym != ACC_TYPE_CURRENT:
-                raise ValueError("Первый символ счета должен содержать буквы S или C")
-            if idx > 0 and not sym.isdigit():
-                raise ValueError("Номер счета должен содержать только цифры.")
+        validate_account_number(account)
 
     def _validate_customer_name(self, customer_name: str) -> None:
         if len(customer_name.strip()) == 0:
@@ -247,33 +452,35 @@ class Account:
         if len(customer_name) > 29:
             raise ValueError("Имя пользователя должно быть не более 29 символов.")
 
-    def _validate_balance(self, balance: float) -> None:
-        if balance < self.min_limit:
-            raise ValueError(f"Достигнуто ограничение по минимальной сумме на счете {self.min_limit}")
-        if balance > self.max_limit:
-            raise ValueError(f"Достигнуто ограничение по максимальной сумме на счете {self.max_limit}")
+    def _validate_balance(self, balance: int) -> None:
+        if balance < self.__min_limit:
+            raise ValueError(f"Достигнуто ограничение по минимальной сумме на счете {format_minor(self.__min_limit)}")
+        if balance > self.__max_limit:
+            raise ValueError(f"Достигнуто ограничение по максимальной сумме на счете {format_minor(self.__max_limit)}")
 
     @staticmethod
     def _set_limits_from_string(account: Account, line: str):
 
         min_limit_str = line[50:65].strip()
         if len(min_limit_str) > 0:
-            min_limit = float(min_limit_str)
+            min_limit = to_minor(min_limit_str)
         else:
-            min_limit = DEFAULT_MIN_LIMIT
+            min_limit = DEFAULT_MIN_LIMIT_MINOR
 
         max_limit_str = line[65:80].strip()
         if len(max_limit_str) > 0:
-            max_limit = float(max_limit_str)
+            max_limit = to_minor(max_limit_str)
         else:
-            max_limit = DEFAULT_MAX_LIMIT
+            max_limit = DEFAULT_MAX_LIMIT_MINOR
 
-        account.set_limits(min_limit, max_limit)
+        account.set_limits_minor(min_limit, max_limit)
 
 
 class SavingAccount(Account):  # inheritance
     """ Сберегательный счет """
 
+    __slots__ = ("__interest",)
+
     def __init__(self, account_number: str, customer_name: str, balance: float) -> None:
         super().__init__(account_number, customer_name, balance)
         self.__interest = 0.01 / 12
@@ -292,6 +499,8 @@ class SavingAccount(Account):  # inheritance
 class CurrentAccount(Account):
     """ Текущий счет """
 
+    __slots__ = ()
+
     def __init__(self, account_number: str, customer_name: str, balance: float) -> None:
         super().__init__(account_number, customer_name, balance)
 
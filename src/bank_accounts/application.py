@@ -5,14 +5,33 @@
 """
 from __future__ import annotations
 
+import atexit
 import datetime
+import itertools
+import os
+import threading
+import uuid
+from collections import Counter
+from concurrent.futures import Future
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterable, Iterator, Optional, TYPE_CHECKING
 
 from rich.console import Console
 from rich.table import Table
 
 from accounts import AccountDict, Account, SavingAccount, CurrentAccount, ACC_TYPE_SAVING, ACC_TYPE_CURRENT
-from transactions import TransactionList, Transaction, TXN_TYPE_DEPOSIT, TXN_TYPE_WITHDRAW
+from transactions import (TransactionList, Transaction, TXN_TYPE_DEPOSIT, TXN_TYPE_WITHDRAW,
+                          read_last_record, is_record_boundary)
+from journal import TransactionJournal, GroupCommitter, DEFAULT_SYNC_EVERY, DEFAULT_SYNC_INTERVAL_MS
+from checkpoint import Checkpoint
+from account_index import AccountIndex
+from locks import StripedLock, FileLock, DEFAULT_LOCK_STRIPES, DEFAULT_LOCK_TIMEOUT_MS
+from metrics import metrics, timed
+from storage import WriteAheadLog, file_crc32
+
+if TYPE_CHECKING:
+    from binary_store import BinaryTransactionStore
 
 # Файл для хранения счетов
 ACCOUNTS_FILE_NAME = Path("data/ACCOUNTS.DAT")
@@ -20,121 +39,804 @@ ACCOUNTS_FILE_NAME = Path("data/ACCOUNTS.DAT")
 # Файл для хранения транзакций
 TRANSACTIONS_FILE_NAME = Path("data/TRANSACTIONS.DAT")
 
+# Файл контрольной точки с балансами по счетам
+CHECKPOINT_FILE_NAME = Path("data/CHECKPOINT.DAT")
 
-class Application:
-    def __init__(self, accounts_file: Path, transactions_file: Path) -> None:
-        self.__accounts = AccountDict.load(accounts_file)
-        self.__transactions = TransactionList.load(transactions_file)
-        self._init_accounts()
+# Файл индекса транзакций по номерам счетов
+INDEX_FILE_NAME = Path("data/TRANSACTIONS.IDX")
+
+# Файл накопленных метрик (команды CLI с параметром --metrics)
+METRICS_FILE_NAME = Path("data/METRICS.json")
+
+# Автоматически записывать контрольную точку, если после последней
+# накопилось не менее N транзакций. 0 - только по команде checkpoint
+CHECKPOINT_EVERY = 1000
+
+# Синхронизация журнала транзакций с диском: каждые N записей
+JOURNAL_SYNC_EVERY = DEFAULT_SYNC_EVERY
+
+# Синхронизация журнала транзакций с диском: не реже, чем раз в T миллисекунд
+JOURNAL_SYNC_INTERVAL_MS = DEFAULT_SYNC_INTERVAL_MS
+
+# Количество процессов для переигровки истории при расчете балансов
+REPLAY_WORKERS = os.cpu_count() or 1
 
+# Переигрывать историю в нескольких процессах, если непрочитанный хвост
+# файла транзакций не меньше N байт (запуск процессов дороже короткой истории)
+PARALLEL_REPLAY_MIN_BYTES = 16 * 1024 * 1024
+
+# Переигрывать историю векторно (колонки numpy), если непрочитанный хвост
+# файла транзакций не меньше N байт (импорт numpy дороже короткой истории)
+COLUMNAR_REPLAY_MIN_BYTES = 1024 * 1024
+
+# Наибольшее время ожидания блокировки файлов данных другим процессом, миллисекунд
+LOCK_TIMEOUT_MS = DEFAULT_LOCK_TIMEOUT_MS
+
+
+class Application:
+    """
+    Приложение загружает данные по требованию:
+    реестр счетов - при первом обращении к счетам,
+    балансы - при первом обращении к балансам (переигровка транзакций),
+    историю транзакций - при первом обращении к истории.
+    Проведение транзакций потокобезопасно: баланс счета меняется под блокировкой
+    его полосы (lock_stripes), поэтому транзакции по разным счетам не ждут друг друга.
+    В режиме групповой фиксации (group_commit) транзакции параллельных вызовов
+    сбрасываются на диск общими группами.
+    Несколько процессов (например, одновременно запущенные команды CLI) работают
+    с одними файлами под блокировкой <файл транзакций>.lock: чтение - под общей,
+    изменение - под исключительной. Захватив блокировку, процесс дочитывает
+    изменения, сделанные другими процессами, поэтому лимиты проверяются по актуальным балансам.
+    """
+
+    def __init__(self, accounts_file: Path, transactions_file: Path,
+                 sync_every: int = JOURNAL_SYNC_EVERY,
+                 sync_interval_ms: int = JOURNAL_SYNC_INTERVAL_MS,
+                 checkpoint_file: Optional[Path] = None,
+                 checkpoint_every: int = CHECKPOINT_EVERY,
+                 index_file: Optional[Path] = None,
+                 replay_workers: int = REPLAY_WORKERS,
+                 group_commit: bool = False,
+                 lock_stripes: int = DEFAULT_LOCK_STRIPES,
+                 lock_timeout_ms: int = LOCK_TIMEOUT_MS) -> None:
+        self.__accounts_file = accounts_file
+        self.__transactions_file = transactions_file
+        self.__checkpoint_file = checkpoint_file
+        self.__index_file = index_file
+        self.__checkpoint_every = checkpoint_every
+        self.__checkpoint_count = 0
+        # смещение и CRC32 начала файла транзакций по последней контрольной точке:
+        # CRC следующей точки считается только по дописанной части файла
+        self.__prefix_crc: Optional[tuple[int, int]] = None
+        self.__replay_workers = replay_workers
+        self.__journal = TransactionJournal(transactions_file, sync_every, sync_interval_ms)
+        self.__committer = GroupCommitter(self.__journal) if group_commit else None
+        # блокировки счетов: баланс счета и порядок его транзакций в журнале
+        self.__account_locks = StripedLock(lock_stripes)
+        # общая блокировка: загрузка данных, реестр счетов, история, журнал и счетчик транзакций.
+        # Захватывается после блокировок счетов и удерживается недолго
+        self.__lock = threading.RLock()
+        # блокировка файлов данных между процессами и метка последнего учтенного изменения
+        self.__file_lock = FileLock(Path(f"{transactions_file}.lock"), lock_timeout_ms)
+        self.__stamp_prefix = uuid.uuid4().hex
+        self.__stamp: Optional[str] = None
+        self.__stamp_count = 0
+        # данные изменены этим процессом, метку нужно обновить при освобождении блокировки
+        self.__dirty = False
+
+        # загружаются по требованию
+        self.__accounts: Optional[AccountDict] = None
+        self.__transactions: Optional[TransactionList] = None
+        self.__index: Optional[AccountIndex] = None
+        self.__balances_ready = False
+        # количество транзакций в файле, учтенных в балансах
+        self.__txn_count = 0
+        # прочитанная часть файла транзакций (смещение и последняя запись) и состояние файла счетов
+        self.__txn_offset = 0
+        self.__txn_last_record = ""
+        self.__accounts_stat: Optional[tuple[int, int]] = None
+        # восстановление после сбоя выполняется при первом захвате блокировки файлов, а не при создании
+        self.__recovered = False
+
+    @timed("app.add_new_account")
     def add_new_account(self, name: str, account_type: str, balance: float) -> Account:
         """
         Создать новый пользовательский счет
         """
-        account_num = self.__accounts.get_next_free_account_number(account_type)
-        account: Account
-
-        if account_type == ACC_TYPE_SAVING:
-            account = SavingAccount(account_num, name, balance)
-        elif account_type == ACC_TYPE_CURRENT:
-            account = CurrentAccount(account_num, name, balance)
-        else:
-            raise ValueError(f"Invalid account type: {account_type}")
-
-        self.__accounts.append(account)
-        self.save_accounts()
+        with self._data_lock(exclusive=True):
+            accounts = self._get_accounts()
+            with self.__lock:
+                account = self._create_account(accounts.get_next_free_account_number(account_type),
+                                               name, account_type, balance)
+                accounts.append(account)
+                self.__dirty = True
+                with metrics.timer("save.accounts"):
+                    accounts.save_changes(self.__accounts_file, [account.account_number])
         return account
 
+    @timed("app.add_accounts")
+    def add_accounts(self, new_accounts: Iterable[tuple[str, str, float]]) -> list[Account]:
+        """
+        Создать несколько счетов: (имя пользователя, тип счета, баланс).
+        Номера выделяются блоком для каждого типа счета, новые счета дописываются в файл одной операцией.
+        Если хотя бы один счет некорректен, ни один счет не создается.
+        """
+        requests = list(new_accounts)
+
+        with self._data_lock(exclusive=True), self.__lock:
+            accounts = self._get_accounts()
+            numbers: dict[str, Iterator[str]] = {}
+            for account_type, count in Counter(account_type for _, account_type, _ in requests).items():
+                numbers[account_type] = iter(accounts.reserve_account_numbers(account_type, count))
+
+            created = [self._create_account(next(numbers[account_type]), name, account_type, balance)
+                       for name, account_type, balance in requests]
+            for account in created:
+                accounts.append(account)
+            self.__dirty = True
+            with metrics.timer("save.accounts"):
+                accounts.save_changes(self.__accounts_file, [account.account_number for account in created])
+        return created
+
+    @timed("app.set_limits")
     def set_limits(self, account_num: str, min_limit: float, max_limit: float) -> Account:
         """
         Установить лимиты по счету
         """
-        found_account = self.__accounts[account_num]
-        found_account.set_limits(min_limit, max_limit)
-        self.save_accounts()
+        with self._data_lock(exclusive=True):
+            found_account = self._get_balances()[account_num]
+            with self.__account_locks.hold([account_num]), self.__lock:
+                found_account.set_limits(min_limit, max_limit)
+                self.__dirty = True
+                with metrics.timer("save.accounts"):
+                    self._get_accounts().save_changes(self.__accounts_file, [account_num])
         return found_account
 
+    @timed("app.deposit")
     def deposit(self, account_num: str, amount: float) -> Transaction:
         """
         Внести сумму на счет.
         """
+        with self._data_lock(exclusive=True):
+            # проверим, что счет существует
+            _ = self._get_balances()[account_num]
 
-        # проверим, что счет существует
-        _ = self.__accounts[account_num]
-
-        txn = Transaction(datetime.datetime.now(), account_num, TXN_TYPE_DEPOSIT, amount)
-        self.__transactions.append(txn)
-        self._apply_transaction(txn)
-        self.save_transactions()
+            txn = Transaction(datetime.datetime.now(), account_num, TXN_TYPE_DEPOSIT, amount)
+            self._post_transaction(txn)
         return txn
 
+    @timed("app.withdraw")
     def withdraw(self, account_num: str, amount: float) -> Transaction:
         """
         Снять сумму со счета.
         """
+        with self._data_lock(exclusive=True):
+            # проверим, что счет существует
+            _ = self._get_balances()[account_num]
 
-        # проверим, что счет существует
-        _ = self.__accounts[account_num]
-
-        txn = Transaction(datetime.datetime.now(), account_num, TXN_TYPE_WITHDRAW, amount)
-        self.__transactions.append(txn)
-        self._apply_transaction(txn)
-        self.save_transactions()
+            txn = Transaction(datetime.datetime.now(), account_num, TXN_TYPE_WITHDRAW, amount)
+            self._post_transaction(txn)
         return txn
 
+    @timed("app.apply_batch")
+    def apply_batch(self, transactions: Iterable[Transaction]) -> int:
+        """
+        Провести пакет транзакций по принципу "все или ничего".
+        Все транзакции проверяются по текущим балансам и лимитам счетов,
+        затем применяются и сохраняются в журнал одной операцией записи.
+        Возвращает количество проведенных транзакций.
+        """
+        batch = list(transactions)
+        with self._data_lock(exclusive=True):
+            with self.__account_locks.hold(txn.account for txn in batch):
+                durable = self._apply_batch(batch)
+            self._checkpoint_by_policy()
+            if durable is not None:
+                durable.result()
+        return len(batch)
+
+    def _apply_batch(self, batch: list[Transaction]) -> Optional[Future]:
+        accounts = self._get_balances()
+
+        # проверка пакета на копии балансов
+        balances: dict[str, int] = {}
+        limits: dict[str, tuple[int, int]] = {}
+        with metrics.timer("validate.batch"):
+            for idx, txn in enumerate(batch, 1):
+                account_num = txn.account
+                balance = balances.get(account_num)
+                if balance is None:
+                    account = accounts[account_num]
+                    balance = account.balance_minor
+                    limits[account_num] = (account.min_limit_minor, account.max_limit_minor)
+                if txn.txn_type == TXN_TYPE_DEPOSIT:
+                    balance += txn.amount_minor
+                else:
+                    balance -= txn.amount_minor
+                min_limit, max_limit = limits[account_num]
+                if balance < min_limit or balance > max_limit:
+                    metrics.increment("transactions.rejected", len(batch))
+                    raise ValueError(f"Транзакция {idx} по счету #{account_num} нарушает лимиты. Пакет не проведен.")
+                balances[account_num] = balance
+
+        for account_num, balance in balances.items():
+            accounts[account_num].set_balance_minor(balance)
+        with self.__lock:
+            if self.__transactions is not None:
+                self.__transactions.extend(batch)
+            durable = self._write_journal(batch)
+            self.__txn_count += len(batch)
+        metrics.increment("transactions.posted", len(batch))
+        return durable
+
+    def preload(self) -> None:
+        """
+        Загрузить реестр счетов и рассчитать балансы заранее, не дожидаясь первого запроса.
+        """
+        with self._data_lock(exclusive=False):
+            self._get_balances()
+
+    @timed("app.get_account")
     def get_account(self, account_num: str) -> Account:
         """
         Получить информацию по счету.
         """
-        return self.__accounts[account_num]
+        with self._data_lock(exclusive=False):
+            return self._get_balances()[account_num]
 
     def get_all_accounts(self) -> Table:
         """
         Получить список всех счетов в виде таблицы.
         """
-
-        return self.__accounts.to_table_view()
+        with self._data_lock(exclusive=False):
+            return self._get_balances().to_table_view()
 
     def get_all_transactions(self, account_num: str) -> Table:
         """
         История транзакций по счету.
         """
-        return self.__transactions.to_table_view(account_num)
+        return self.get_transactions(account_num).to_table_view(account_num)
+
+    def get_transactions(self, account_num: Optional[str]) -> TransactionList:
+        """
+        История транзакций по счету (все транзакции, если счет не указан).
+        """
+        with self._data_lock(exclusive=False):
+            if account_num is not None and self.__transactions is None and self.__index_file is not None:
+                # история одного счета читается из файла по индексу
+                with self.__lock:
+                    self._drain_journal()
+                    return self._get_index().read_transactions(self.__transactions_file, account_num)
+            with self.__lock:
+                transactions = self._get_transactions()
+        return transactions if account_num is None else TransactionList(transactions.search(account_num))
+
+    def iter_accounts(self) -> list[Account]:
+        """
+        Все счета с актуальными балансами.
+        """
+        with self._data_lock(exclusive=False), self.__lock:
+            return list(self._get_balances().values())
+
+    def iter_transactions(self, account_num: Optional[str],
+                          start: Optional[datetime.date] = None,
+                          end: Optional[datetime.date] = None) -> Iterator[Transaction]:
+        """
+        История транзакций по счету (все транзакции, если счет не указан) по мере чтения.
+        Если задан период (start, end включительно), история загружается в память
+        и транзакции выбираются по индексу дат.
+        Иначе, если история не загружена в память, файл транзакций читается потоково.
+        Файлы данных остаются под общей блокировкой, пока перебор не закончен.
+        """
+        with self._data_lock(exclusive=False):
+            if start is not None or end is not None:
+                with self.__lock:
+                    transactions = self._get_transactions()
+                yield from transactions.between(start, end, account_num)
+                return
+            if self.__transactions is not None or (account_num is not None and self.__index_file is not None):
+                yield from self.get_transactions(account_num)
+                return
+            with self.__lock:
+                self._drain_journal()
+            if not os.path.isfile(self.__transactions_file):
+                return
+            for txn in TransactionList.iter_file(self.__transactions_file):
+                if account_num is None or txn.account == account_num:
+                    yield txn
 
     def save_transactions(self, file_name: Path = TRANSACTIONS_FILE_NAME) -> None:
         """
         Выгрузить историю транзакций в файл.
         """
-        self.__transactions.save(file_name)
+        with self._data_lock(exclusive=False), self.__lock:
+            self._get_transactions().save(file_name)
 
     def save_accounts(self, file_name: Path = ACCOUNTS_FILE_NAME) -> None:
         """
         Выгрузить счета в файл
         """
-        self.__accounts.save(file_name)
+        with self._data_lock(exclusive=False), self.__lock:
+            self._get_accounts().save(file_name)
+
+    def export_binary(self, file_name: Path) -> int:
+        """
+        Выгрузить историю транзакций в двоичный файл.
+        Возвращает количество записей.
+        """
+        from binary_store import BinaryTransactionStore
+        with self._data_lock(exclusive=False):
+            self._drain_journal()
+            return BinaryTransactionStore.from_text(self.__transactions_file, file_name)
+
+    @staticmethod
+    def open_binary_store(file_name: Path) -> BinaryTransactionStore:
+        """
+        Открыть двоичный файл транзакций для чтения без загрузки в память.
+        """
+        from binary_store import BinaryTransactionStore
+        return BinaryTransactionStore(file_name)
+
+    @timed("app.compact")
+    def compact(self) -> None:
+        """
+        Уплотнить журнал: полностью перезаписать файл транзакций.
+        """
+        with self._data_lock(exclusive=True), self.__account_locks.hold_all(), self.__lock:
+            self._compact()
+
+    @timed("app.checkpoint")
+    def checkpoint(self) -> Checkpoint:
+        """
+        Записать контрольную точку: текущие балансы и позицию в файле транзакций.
+        """
+        if self.__checkpoint_file is None:
+            raise ValueError("Файл контрольной точки не задан.")
+
+        # все счета блокируются, чтобы балансы соответствовали позиции в журнале
+        with self._data_lock(exclusive=True), self.__account_locks.hold_all(), self.__lock:
+            return self._write_checkpoint()
+
+    def close(self) -> None:
+        """
+        Сбросить на диск несинхронизированные записи журнала.
+        """
+        self._close_journal()
+        self.__file_lock.close()
 
     def import_data(self, accounts_file: Path, transactions_file: Path) -> None:
         """
         Импортировать данные из файлов и проинициализировать систему
         """
-        self.__transactions.load(transactions_file)
-        self.__accounts.load(accounts_file)
-        self._init_accounts()
+        accounts = AccountDict.load(accounts_file)
+        transactions = TransactionList.load(transactions_file)
+
+        with self._data_lock(exclusive=True), self.__account_locks.hold_all(), self.__lock:
+            self._close_journal()
+            self.__accounts = accounts
+            self.__transactions = transactions
+            self.__balances_ready = False
+            self._init_accounts(use_checkpoint=False)
+
+            accounts.save(self.__accounts_file)
+            self._compact()
+
+    def _compact(self) -> None:
+        # файл перезаписывается историей из памяти или из файла - очередь записывается до чтения
+        self._drain_journal()
+        transactions = self._get_transactions()
+        self._close_journal()
+        self.__dirty = True
+        with metrics.timer("save.transactions"):
+            transactions.save(self.__transactions_file)
+        # смещения записей изменились, старые контрольная точка и индекс недействительны
+        self.__index = None
+        self.__prefix_crc = None
+        if self.__checkpoint_file is not None:
+            self._write_checkpoint()
+        else:
+            self._save_index()
+
+    def _write_checkpoint(self) -> Checkpoint:
+        accounts = self._get_balances()
+        self._flush_journal()
+        offset = os.path.getsize(self.__transactions_file) if os.path.isfile(self.__transactions_file) else 0
+        balances = {acc.account_number: acc.balance_minor for acc in accounts.values()}
+        start, crc = self.__prefix_crc if self.__prefix_crc is not None and self.__prefix_crc[0] <= offset else (0, 0)
+        checkpoint = Checkpoint(
+            offset,
+            self.__txn_count,
+            read_last_record(self.__transactions_file, offset),
+            balances,
+            file_crc32(self.__transactions_file, offset, start, crc))
+        with metrics.timer("save.checkpoint"):
+            checkpoint.save(self.__checkpoint_file)
+        self.__checkpoint_count = checkpoint.count
+        self.__prefix_crc = (checkpoint.offset, checkpoint.crc)
+        self._save_index()
+        return checkpoint
+
+    def _recover(self) -> None:
+        """
+        Восстановление после сбоя: применить завершенный журнал предзаписи
+        файла счетов и отрезать недописанную запись в конце файла транзакций.
+        Файлы данных целиком не читаются. Выполняется один раз в процессе, до первого захвата
+        блокировки файлов: следы сбоя ищутся под общей блокировкой, и только если они есть -
+        файлы восстанавливаются под кратковременной исключительной.
+        """
+        self.__file_lock.acquire(False)
+        try:
+            needed = self._needs_recovery()
+        finally:
+            self.__file_lock.release()
+        if needed:
+            self.__file_lock.acquire(True)
+            try:
+                with self.__lock:
+                    applied = WriteAheadLog(self.__accounts_file).recover()
+                    if self.__journal.repair() or applied:
+                        # другие процессы дочитают восстановленные файлы по новой метке
+                        self.__dirty = True
+            finally:
+                self.__file_lock.release(self._publish)
+        self.__recovered = True
+
+    def _needs_recovery(self) -> bool:
+        """
+        После сбоя остался журнал предзаписи счетов или незавершенная запись транзакции.
+        Под общей блокировкой журнал предзаписи не может принадлежать работающему писателю.
+        """
+        return WriteAheadLog(self.__accounts_file).wal_file.exists() or self.__journal.needs_repair()
+
+    @staticmethod
+    def _create_account(account_num: str, name: str, account_type: str, balance: float) -> Account:
+        if account_type == ACC_TYPE_SAVING:
+            return SavingAccount(account_num, name, balance)
+        if account_type == ACC_TYPE_CURRENT:
+            return CurrentAccount(account_num, name, balance)
+        raise ValueError(f"Invalid account type: {account_type}")
 
-    def _init_accounts(self) -> None:
-        for txn in self.__transactions:
+    def _get_accounts(self) -> AccountDict:
+        """
+        Реестр счетов. Балансы могут быть еще не пересчитаны по истории транзакций.
+        """
+        if self.__accounts is None:
+            with self.__lock:
+                if self.__accounts is None:
+                    self.__accounts_stat = self._stat_accounts()
+                    with metrics.timer("load.accounts"):
+                        self.__accounts = AccountDict.load(self.__accounts_file)
+        return self.__accounts
+
+    def _get_balances(self) -> AccountDict:
+        """
+        Реестр счетов с актуальными балансами.
+        """
+        if not self.__balances_ready:
+            with self.__lock:
+                if not self.__balances_ready:
+                    self._init_accounts()
+        return self._get_accounts()
+
+    def _get_transactions(self) -> TransactionList:
+        """
+        Полная история транзакций.
+        """
+        if self.__transactions is None:
+            # транзакции, уже учтенные в балансах, могут еще стоять в очереди групповой фиксации
+            self._drain_journal()
+            with metrics.timer("load.transactions"):
+                self.__transactions = TransactionList.load(self.__transactions_file,
+                                                           trusted_prefix=self._trusted_prefix())
+            if not self.__balances_ready:
+                self._remember_transactions_file()
+        return self.__transactions
+
+    def _get_index(self) -> AccountIndex:
+        """
+        Индекс файла транзакций по номерам счетов, дочитанный до конца файла.
+        Если индекса нет на диске или он устарел - строится заново и сохраняется.
+        """
+        if self.__index is None:
+            index = AccountIndex.load(self.__index_file) if self.__index_file is not None else None
+            if index is None or not index.matches(self.__transactions_file):
+                index = AccountIndex.build(self.__transactions_file)
+                if self.__index_file is not None:
+                    index.save(self.__index_file)
+            self.__index = index
+        if os.path.isfile(self.__transactions_file):
+            self.__index.update(self.__transactions_file)
+        return self.__index
+
+    def _save_index(self) -> None:
+        if self.__index_file is not None:
+            self._get_index().save(self.__index_file)
+
+    def _post_transaction(self, txn: Transaction) -> None:
+        with self.__account_locks.hold([txn.account]):
+            try:
+                # при переигровке истории замеряется только весь проход (replay), не каждая транзакция
+                with metrics.timer("apply_transaction"):
+                    self._apply_transaction(txn)
+            except ValueError:
+                metrics.increment("transactions.rejected")
+                raise
+            # транзакция попадает в журнал, пока счет заблокирован:
+            # порядок транзакций счета в журнале совпадает с порядком проверки лимитов
+            with self.__lock:
+                if self.__transactions is not None:
+                    self.__transactions.append(txn)
+                durable = self._write_journal([txn])
+                self.__txn_count += 1
+        metrics.increment("transactions.posted")
+        self._checkpoint_by_policy()
+        # ожидание записи на диск - вне блокировки, чтобы транзакции других потоков попали в ту же группу
+        if durable is not None:
+            durable.result()
+
+    @timed("journal.write")
+    def _write_journal(self, txns: list[Transaction]) -> Optional[Future]:
+        """
+        Записать транзакции в журнал.
+        В режиме групповой фиксации возвращает Future, который завершится после записи на диск.
+        """
+        self.__dirty = True
+        if self.__committer is not None:
+            return self.__committer.submit(txns)
+        self.__journal.append_many(txns)
+        return None
+
+    @contextmanager
+    def _data_lock(self, exclusive: bool) -> Iterator[None]:
+        """
+        Блокировка файлов данных между процессами.
+        При захвате учитываются изменения других процессов,
+        при освобождении исключительной блокировки публикуются изменения этого процесса.
+        Перед первым захватом в процессе выполняется восстановление после сбоя (_recover),
+        затем захватывается блокировка запрошенного вида.
+        """
+        if not self.__recovered:
+            self._recover()
+        self.__file_lock.acquire(exclusive, self._refresh)
+        try:
+            yield
+        finally:
+            self.__file_lock.release(self._publish)
+
+    @timed("refresh")
+    def _refresh(self) -> None:
+        """
+        Дочитать изменения файлов данных, сделанные другими процессами.
+        Транзакции, дописанные в конец файла, применяются к балансам;
+        если файл транзакций перезаписан или изменился файл счетов - данные загружаются заново.
+        """
+        stamp = self.__file_lock.read_stamp()
+        if stamp == self.__stamp:
+            return
+        with self.__account_locks.hold_all(), self.__lock:
+            self.__stamp = stamp
+            if self.__accounts is None and self.__transactions is None:
+                return
+            # другой процесс мог заменить файл транзакций - журнал откроется заново
+            self._close_journal()
+            if self._stat_accounts() != self.__accounts_stat or not self._transactions_file_matches():
+                self._reset()
+                return
+            if not self.__balances_ready and self.__transactions is None:
+                return
+            try:
+                for txn in TransactionList.iter_file(self.__transactions_file, self.__txn_offset):
+                    if self.__transactions is not None:
+                        self.__transactions.append(txn)
+                    if self.__balances_ready:
+                        self._apply_transaction(txn)
+                        self.__txn_count += 1
+            except ValueError:
+                self._reset()
+                raise
+            self._remember_transactions_file()
+
+    def _publish(self, exclusive: bool) -> None:
+        """
+        Сохранить изменения этого процесса на диск и обновить метку в файле блокировки,
+        чтобы другие процессы их дочитали. Вызывается перед освобождением блокировки файлов.
+        """
+        if not exclusive:
+            return
+        with self.__lock:
+            if not self.__dirty:
+                return
+            # другим процессам достаточно записи в файл, синхронизация с диском - по политике журнала
+            self._drain_journal()
+            self._remember_transactions_file()
+            self.__accounts_stat = self._stat_accounts()
+            self.__stamp_count += 1
+            self.__stamp = f"{self.__stamp_prefix}:{self.__stamp_count}"
+            self.__file_lock.write_stamp(self.__stamp)
+            self.__dirty = False
+
+    def _reset(self) -> None:
+        """
+        Сбросить загруженные данные: они будут прочитаны из файлов заново
+        """
+        self.__accounts = None
+        self.__transactions = None
+        self.__index = None
+        self.__balances_ready = False
+        self.__txn_count = 0
+        self.__checkpoint_count = 0
+        self.__prefix_crc = None
+
+    def _remember_transactions_file(self) -> None:
+        """
+        Запомнить, до какого места прочитан файл транзакций
+        """
+        if os.path.isfile(self.__transactions_file):
+            self.__txn_offset = os.path.getsize(self.__transactions_file)
+        else:
+            self.__txn_offset = 0
+        self.__txn_last_record = read_last_record(self.__transactions_file, self.__txn_offset)
+
+    def _transactions_file_matches(self) -> bool:
+        """
+        Файл транзакций только дополнялся с момента последнего чтения
+        """
+        if self.__txn_offset == 0:
+            return True
+        if not os.path.isfile(self.__transactions_file) or \
+                os.path.getsize(self.__transactions_file) < self.__txn_offset:
+            return False
+        return (is_record_boundary(self.__transactions_file, self.__txn_offset) and
+                read_last_record(self.__transactions_file, self.__txn_offset) == self.__txn_last_record)
+
+    def _stat_accounts(self) -> Optional[tuple[int, int]]:
+        if not os.path.isfile(self.__accounts_file):
+            return None
+        stat = os.stat(self.__accounts_file)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _flush_journal(self) -> None:
+        self._drain_journal()
+        self.__journal.sync()
+
+    def _drain_journal(self) -> None:
+        """
+        Дождаться записи в файл транзакций, стоящих в очереди групповой фиксации
+        """
+        if self.__committer is not None:
+            self.__committer.flush()
+
+    def _close_journal(self) -> None:
+        if self.__committer is not None:
+            self.__committer.close()
+        self.__journal.close()
+
+    @timed("replay")
+    def _init_accounts(self, use_checkpoint: bool = True) -> None:
+        self._get_accounts()
+        offset, count = self._restore_checkpoint() if use_checkpoint else (0, 0)
+        restored = count
+
+        tail: Iterable[Transaction]
+        replayed = self._replay_columnar(offset) if self.__transactions is None else None
+        if replayed is not None:
+            count += replayed
+            tail = []
+        elif self.__transactions is None and self._use_parallel_replay(offset):
+            # балансы счетов независимы - группы счетов переигрываются в отдельных процессах
+            from parallel_replay import replay_parallel
+            count += replay_parallel(self.__transactions_file, offset, self._get_accounts(), self.__replay_workers)
+            tail = []
+        elif self.__transactions is not None:
+            tail = itertools.islice(self.__transactions, count, None)
+        elif os.path.isfile(self.__transactions_file):
+            # история не нужна - хвост файла после контрольной точки читается потоково,
+            # в памяти остаются только балансы счетов
+            tail = TransactionList.iter_file(self.__transactions_file, offset)
+        else:
+            tail = []
+
+        for txn in tail:
             self._apply_transaction(txn)
+            count += 1
+        metrics.increment("replay.transactions", count - restored)
+        self.__txn_count = count
+        self.__balances_ready = True
+        if self.__transactions is None:
+            self._remember_transactions_file()
+
+    def _replay_columnar(self, offset: int) -> Optional[int]:
+        """
+        Переиграть хвост файла транзакций векторно и записать итоговые балансы в счета.
+        Возвращает количество записей или None, если векторная переигровка не применяется:
+        хвост короче COLUMNAR_REPLAY_MIN_BYTES, нет numpy или в хвосте ошибка.
+        Ошибку затем сообщает переигровка по записям - с тем же текстом, что и всегда.
+        """
+        if not os.path.isfile(self.__transactions_file):
+            return None
+        if os.path.getsize(self.__transactions_file) - offset < COLUMNAR_REPLAY_MIN_BYTES:
+            return None
+        # numpy загружается только для длинной истории
+        import columnar
+        if columnar.np is None:
+            return None
+        accounts = self._get_accounts()
+        try:
+            columns = columnar.TransactionColumns.load(self.__transactions_file, offset)
+            balances = columns.balances(
+                {account_num: account.balance_minor for account_num, account in accounts.items()},
+                {account_num: (account.min_limit_minor, account.max_limit_minor)
+                 for account_num, account in accounts.items()})
+        except ValueError:
+            return None
+        for account_num, balance in balances.items():
+            accounts[account_num].set_balance_minor(balance)
+        return len(columns)
+
+    def _use_parallel_replay(self, offset: int) -> bool:
+        if self.__replay_workers <= 1 or not os.path.isfile(self.__transactions_file):
+            return False
+        return os.path.getsize(self.__transactions_file) - offset >= PARALLEL_REPLAY_MIN_BYTES
+
+    def _restore_checkpoint(self) -> tuple[int, int]:
+        """
+        Восстановить балансы из контрольной точки.
+        Возвращает смещение в файле транзакций и количество транзакций,
+        которые уже учтены в балансах.
+        """
+        if self.__checkpoint_file is None:
+            return 0, 0
+
+        checkpoint = Checkpoint.load(self.__checkpoint_file)
+        if checkpoint is None or not checkpoint.matches(self.__transactions_file):
+            return 0, 0
+        if self.__transactions is not None and checkpoint.count > len(self.__transactions):
+            return 0, 0
+
+        accounts = self._get_accounts()
+        if any(account_num not in accounts for account_num in checkpoint.balances):
+            return 0, 0
+
+        for account_num, balance in checkpoint.balances.items():
+            accounts[account_num].set_balance_minor(balance)
+        self.__checkpoint_count = checkpoint.count
+        if checkpoint.crc is not None:
+            self.__prefix_crc = (checkpoint.offset, checkpoint.crc)
+        return checkpoint.offset, checkpoint.count
+
+    def _trusted_prefix(self) -> Optional[tuple[int, int]]:
+        """
+        Смещение и CRC32 начала файла транзакций, записи которого уже проверены (по контрольной точке).
+        Совпадение CRC с файлом проверяет TransactionList.load.
+        """
+        if self.__prefix_crc is not None:
+            return self.__prefix_crc
+        if self.__checkpoint_file is None:
+            return None
+        checkpoint = Checkpoint.load(self.__checkpoint_file)
+        if checkpoint is None or checkpoint.crc is None:
+            return None
+        return checkpoint.offset, checkpoint.crc
+
+    def _checkpoint_by_policy(self) -> None:
+        if self.__checkpoint_file is None or self.__checkpoint_every <= 0:
+            return
+        if self.__txn_count - self.__checkpoint_count >= self.__checkpoint_every:
+            self.checkpoint()
 
     def _apply_transaction(self, txn: Transaction) -> None:
-        found_account = self.__accounts[txn.account]
+        found_account = self._get_accounts()[txn.account]
         if txn.txn_type == TXN_TYPE_DEPOSIT:
-            found_account.deposit(txn.amount)
+            found_account.deposit_minor(txn.amount_minor)
         if txn.txn_type == TXN_TYPE_WITHDRAW:
-            found_account.withdraw(txn.amount)
+            found_account.withdraw_minor(txn.amount_minor)
 
 
-# start application and load data
-bank_app = Application(ACCOUNTS_FILE_NAME, TRANSACTIONS_FILE_NAME)
+# приложение загружает данные по требованию, при импорте модуля файлы не читаются
+bank_app = Application(ACCOUNTS_FILE_NAME, TRANSACTIONS_FILE_NAME,
+                       checkpoint_file=CHECKPOINT_FILE_NAME,
+                       index_file=INDEX_FILE_NAME)
+atexit.register(bank_app.close)
 
 if __name__ == "__main__":
     console = Console()
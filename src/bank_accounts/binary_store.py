@@ -0,0 +1,171 @@
+# binary_store.py
+
+"""
+Двоичное хранилище транзакций с записями фиксированного размера.
+Файл читается через mmap без копирования данных.
+"""
+from __future__ import annotations
+
+import datetime
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Iterator, Optional
+
+from transactions import Transaction
+
+# Заголовок файла: сигнатура, версия формата, размер записи
+BINARY_MAGIC = b"BTXN"
+BINARY_VERSION = 1
+_HEADER = struct.Struct("<4sHH")
+
+# Запись транзакции:
+#   int32  - номер дня (datetime.date.toordinal)
+#   uint8  - тип счета (S/C)
+#   uint32 - номер счета без типа
+#   uint8  - тип транзакции (D/W)
+#   int64  - сумма в копейках
+_RECORD = struct.Struct("<iBIBq")
+
+# Количество записей, упаковываемых за одну операцию записи при конвертации
+_WRITE_CHUNK = 65536
+
+# Запись в виде кортежа: номер дня, тип счета, номер счета, тип транзакции, сумма в копейках
+BinaryRecord = tuple[int, int, int, int, int]
+
+
+class BinaryTransactionStore:
+    """
+    Двоичный файл транзакций, отображенный в память.
+    Записи доступны в виде кортежей без создания объектов Transaction.
+    """
+
+    def __init__(self, file_name: Path) -> None:
+        self.__file = open(file_name, "rb")
+        size = os.path.getsize(file_name)
+        if size < _HEADER.size:
+            self.__file.close()
+            raise ValueError(f"Некорректный формат двоичного файла транзакций: {file_name}")
+
+        self.__mmap: Optional[mmap.mmap] = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size = _HEADER.unpack_from(self.__mmap, 0)
+        if magic != BINARY_MAGIC or version != BINARY_VERSION or record_size != _RECORD.size:
+            self.close()
+            raise ValueError(f"Некорректный формат двоичного файла транзакций: {file_name}")
+        if (size - _HEADER.size) % _RECORD.size != 0:
+            self.close()
+            raise ValueError(f"Двоичный файл транзакций поврежден: {file_name}")
+
+        self.__count = (size - _HEADER.size) // _RECORD.size
+
+    def __enter__(self) -> BinaryTransactionStore:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def __iter__(self) -> Iterator[BinaryRecord]:
+        return _RECORD.iter_unpack(self.records_buffer())
+
+    def __getitem__(self, idx: int) -> BinaryRecord:
+        if idx < 0:
+            idx += self.__count
+        if idx < 0 or idx >= self.__count:
+            raise IndexError("Номер записи вне диапазона.")
+        return _RECORD.unpack_from(self._get_mmap(), _HEADER.size + idx * _RECORD.size)
+
+    def records_buffer(self) -> memoryview:
+        """
+        Записи файла в виде memoryview (без копирования)
+        """
+        return memoryview(self._get_mmap())[_HEADER.size:]
+
+    def filter(self, account_num: str) -> Iterator[BinaryRecord]:
+        """
+        Записи по номеру счета
+        """
+        acc_type, acc_number = ord(account_num[0]), int(account_num[1:])
+        for record in self:
+            if record[2] == acc_number and record[1] == acc_type:
+                yield record
+
+    def totals(self) -> dict[str, int]:
+        """
+        Изменение баланса по каждому счету в копейках
+        """
+        deposit = ord("D")
+        sums: dict[tuple[int, int], int] = {}
+        for _, acc_type, acc_number, txn_type, amount in self:
+            key = (acc_type, acc_number)
+            sums[key] = sums.get(key, 0) + (amount if txn_type == deposit else -amount)
+        return {f"{chr(acc_type)}{str(acc_number).zfill(5)}": total for (acc_type, acc_number), total in sums.items()}
+
+    def close(self) -> None:
+        """
+        Закрыть файл
+        """
+        if self.__mmap is not None:
+            self.__mmap.close()
+            self.__mmap = None
+        self.__file.close()
+
+    def _get_mmap(self) -> mmap.mmap:
+        if self.__mmap is None:
+            raise ValueError("Двоичный файл транзакций закрыт.")
+        return self.__mmap
+
+    @staticmethod
+    def pack(txn: Transaction) -> bytes:
+        """
+        Упаковать транзакцию в двоичную запись
+        """
+        return _RECORD.pack(txn.date.toordinal(), ord(txn.account[0]), int(txn.account[1:]),
+                            ord(txn.txn_type), txn.amount_minor)
+
+    @staticmethod
+    def to_transaction(record: BinaryRecord) -> Transaction:
+        """
+        Создать транзакцию из двоичной записи
+        """
+        day, acc_type, acc_number, txn_type, amount = record
+        date = datetime.datetime.combine(datetime.date.fromordinal(day), datetime.time())
+        account_num = f"{chr(acc_type)}{str(acc_number).zfill(5)}"
+        return Transaction.from_minor_units(date, account_num, chr(txn_type), amount)
+
+    @staticmethod
+    def from_text(text_file: Path, binary_file: Path) -> int:
+        """
+        Преобразовать текстовый файл транзакций в двоичный.
+        Возвращает количество записей.
+        """
+        count = 0
+        with open(text_file, "r", encoding="UTF-8") as src, open(binary_file, "wb") as dst:
+            dst.write(_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, _RECORD.size))
+            chunk: list[bytes] = []
+            for line in src:
+                line = line.rstrip("\r\n")
+                if not line:
+                    continue
+                chunk.append(BinaryTransactionStore.pack(Transaction.load(line)))
+                if len(chunk) >= _WRITE_CHUNK:
+                    dst.write(b"".join(chunk))
+                    count += len(chunk)
+                    chunk = []
+            dst.write(b"".join(chunk))
+            count += len(chunk)
+        return count
+
+    @staticmethod
+    def to_text(binary_file: Path, text_file: Path) -> int:
+        """
+        Преобразовать двоичный файл транзакций в текстовый формат TRANSACTIONS.DAT.
+        Возвращает количество записей.
+        """
+        with BinaryTransactionStore(binary_file) as store, open(text_file, "w", encoding="UTF-8") as dst:
+            for record in store:
+                dst.write(f"{BinaryTransactionStore.to_transaction(record).dump()}\n")
+            return len(store)
@@ -0,0 +1,109 @@
+# checkpoint.py
+
+"""
+Контрольная точка: снимок балансов по счетам на момент
+применения определенного количества транзакций
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Optional
+
+from transactions import read_last_record, is_record_boundary
+from money import to_minor, format_minor
+from storage import atomic_write
+
+
+class Checkpoint:
+    """
+    Контрольная точка.
+    Хранит балансы всех счетов, количество примененных транзакций,
+    смещение (в байтах) конца последней примененной записи в файле транзакций
+    и саму эту запись для проверки, что файл не был перезаписан.
+    CRC32 файла транзакций до смещения позволяет загружать эту часть файла без повторной проверки записей.
+    """
+
+    def __init__(self, offset: int, count: int, last_record: str, balances: dict[str, int],
+                 crc: Optional[int] = None) -> None:
+        self.__offset = offset
+        self.__count = count
+        self.__last_record = last_record
+        self.__balances = balances
+        self.__crc = crc
+
+    @property
+    def offset(self) -> int:
+        """ Смещение в байтах конца последней примененной записи """
+        return self.__offset
+
+    @property
+    def count(self) -> int:
+        """ Количество примененных транзакций """
+        return self.__count
+
+    @property
+    def last_record(self) -> str:
+        """ Последняя примененная запись в том виде, в котором она хранится в файле """
+        return self.__last_record
+
+    @property
+    def balances(self) -> dict[str, int]:
+        """ Балансы по счетам в копейках """
+        return self.__balances
+
+    @property
+    def crc(self) -> Optional[int]:
+        """ CRC32 файла транзакций до смещения, None - не подсчитана (файл прежней версии) """
+        return self.__crc
+
+    def matches(self, transactions_file: Path) -> bool:
+        """
+        Проверка, что контрольная точка соответствует файлу транзакций:
+        файл не короче смещения и запись перед смещением совпадает с сохраненной.
+        """
+        if self.__count == 0:
+            return self.__offset == 0
+        if not os.path.isfile(transactions_file) or os.path.getsize(transactions_file) < self.__offset:
+            return False
+        if not is_record_boundary(transactions_file, self.__offset):
+            return False
+        return read_last_record(transactions_file, self.__offset) == self.__last_record
+
+    def save(self, file_name: Path) -> None:
+        """
+        Сохранение контрольной точки в файл.
+        Файл заменяется целиком, чтобы не оставить на диске половину снимка.
+        """
+        header = f"{self.__offset:15}{self.__count:15}"
+        if self.__crc is not None:
+            header += f"{self.__crc:10}"
+        lines = [header, self.__last_record]
+        lines.extend(f"{account_num}{format_minor(balance):>15}" for account_num, balance in self.__balances.items())
+        with atomic_write(file_name) as f:
+            f.write("".join(f"{line}\n" for line in lines).encode("UTF-8"))
+
+    @staticmethod
+    def load(file_name: Path) -> Optional[Checkpoint]:
+        """
+        Загрузка контрольной точки из файла.
+        Если файла нет - возвращает None.
+        """
+        if not os.path.isfile(file_name):
+            return None
+
+        with open(file_name, "r", encoding="UTF-8") as f:
+            lines = f.read().splitlines()
+
+        if len(lines) < 2:
+            raise ValueError(f"Некорректный формат файла контрольной точки: {file_name}")
+
+        offset = int(lines[0][:15])
+        count = int(lines[0][15:30])
+        crc = int(lines[0][30:40]) if len(lines[0]) > 30 else None
+        last_record = lines[1]
+        balances: dict[str, int] = {}
+        for line in lines[2:]:
+            balances[line[:6]] = to_minor(line[6:])
+
+        return Checkpoint(offset, count, last_record, balances, crc)
@@ -0,0 +1,146 @@
+# client.py
+
+"""
+Тонкий клиент сервера системы управления банковскими счетами.
+Использует только стандартную библиотеку, чтобы запуск занимал миллисекунды:
+не загружаются click, rich и данные приложения.
+
+Протокол: запрос и ответ - одна строка JSON, завершенная переводом строки.
+    запрос: {"command": "deposit", "account": "S00001", "amount": "100.00"}
+    ответ:  {"ok": true, "result": ...} или {"ok": false, "error": "..."}
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import socket
+import sys
+from pathlib import Path
+from typing import Any, Optional
+
+from metrics import format_summary
+
+# Сокет сервера по умолчанию (Unix domain socket)
+DEFAULT_SOCKET_PATH = Path("data/bank.sock")
+
+# Адрес TCP сервера по умолчанию: только локальные подключения
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8707
+
+# Ожидание ответа сервера, секунд
+DEFAULT_TIMEOUT = 30.0
+
+
+class BankClient:
+    """
+    Подключение к серверу. Одно подключение обслуживает любое количество запросов.
+    """
+
+    def __init__(self, socket_path: Optional[Path] = None, host: Optional[str] = None,
+                 port: int = DEFAULT_PORT, timeout: float = DEFAULT_TIMEOUT) -> None:
+        if host is not None:
+            self.__socket = socket.create_connection((host, port), timeout=timeout)
+        else:
+            self.__socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.__socket.settimeout(timeout)
+            self.__socket.connect(str(socket_path if socket_path is not None else DEFAULT_SOCKET_PATH))
+        self.__reader = self.__socket.makefile("rb")
+
+    def __enter__(self) -> BankClient:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def request(self, command: str, **params: Any) -> Any:
+        """
+        Выполнить команду на сервере.
+        Возвращает результат команды, ошибка сервера - ValueError.
+        """
+        message = dict(params, command=command)
+        self.__socket.sendall(json.dumps(message, ensure_ascii=False).encode("UTF-8") + b"\n")
+        line = self.__reader.readline()
+        if not line:
+            raise ConnectionError("Сервер закрыл подключение.")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise ValueError(response.get("error", "Неизвестная ошибка сервера."))
+        return response.get("result")
+
+    def close(self) -> None:
+        """
+        Закрыть подключение
+        """
+        self.__reader.close()
+        self.__socket.close()
+
+
+def format_account(account: dict[str, Any]) -> str:
+    """
+    Информация по счету в том же виде, что и Account.display
+    """
+    lines = [f"Номер счета: {account['account']}",
+             f"Клиент: {account['customer_name']}",
+             f"Баланс: {account['balance']}"]
+    if account.get("min_limit") is not None:
+        lines.append(f"Минимальный лимит: {account['min_limit']}")
+    if account.get("max_limit") is not None:
+        lines.append(f"Максимальный лимит: {account['max_limit']}")
+    return "\n".join(lines)
+
+
+def format_transaction(txn: dict[str, Any]) -> str:
+    """
+    Транзакция в виде строки: дата, счет, тип, сумма
+    """
+    return f"{txn['date']} {txn['account']} {txn['type']} {txn['amount']:>15}"
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Клиент командной строки. Возвращает код завершения процесса.
+    """
+    parser = argparse.ArgumentParser(prog="main.py remote", description="Запросы к серверу банковских счетов.")
+    parser.add_argument("--socket", type=Path, default=None, help="Unix сокет сервера")
+    parser.add_argument("--host", default=None, help="TCP адрес сервера")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP порт сервера")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("deposit", "withdraw"):
+        command = commands.add_parser(name)
+        command.add_argument("account")
+        command.add_argument("amount")
+    commands.add_parser("get-account").add_argument("account")
+    limits = commands.add_parser("set-limits")
+    limits.add_argument("account")
+    limits.add_argument("min_limit")
+    limits.add_argument("max_limit")
+    commands.add_parser("history").add_argument("account")
+    commands.add_parser("stats")
+    commands.add_parser("ping")
+
+    args = parser.parse_args(argv)
+    params = {key: value for key, value in vars(args).items()
+              if key not in ("socket", "host", "port", "command")}
+    try:
+        with BankClient(args.socket, args.host, args.port) as client:
+            result = client.request(args.command, **params)
+    except (OSError, ValueError) as error:
+        print(f"Ошибка: {error}", file=sys.stderr)
+        return 1
+
+    if args.command == "history":
+        for txn in result:
+            print(format_transaction(txn))
+    elif args.command == "stats":
+        for line in format_summary(result):
+            print(line)
+    elif isinstance(result, dict):
+        print(format_account(result))
+    else:
+        print(result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,332 @@
+# columnar.py
+
+"""
+Колоночное хранилище транзакций и векторизованная загрузка TRANSACTIONS.DAT.
+Требует установленного пакета numpy.
+"""
+from __future__ import annotations
+
+import datetime
+from pathlib import Path
+from typing import Any
+
+from transactions import Transaction, TransactionList, TXN_TYPE_DEPOSIT, TXN_TYPE_WITHDRAW
+from accounts import ACC_TYPE_SAVING, ACC_TYPE_CURRENT
+from money import MINOR_UNITS, to_minor
+
+try:
+    import numpy as np
+except ImportError:  # numpy - необязательная зависимость
+    np = None
+
+# Позиции полей в записи транзакции
+DATE_START, DATE_END = 0, 8
+ACCOUNT_START, ACCOUNT_END = 8, 14
+TXN_TYPE_POS = 14
+AMOUNT_START = 15
+
+_NEWLINE = ord("\n")
+_CARRIAGE_RETURN = ord("\r")
+_SPACE = ord(" ")
+_ZERO = ord("0")
+_DOT = ord(".")
+
+# Наибольшее количество цифр суммы, разбираемой векторно: сумма в копейках помещается в int64
+_MAX_AMOUNT_DIGITS = 16
+
+
+class TransactionColumns:
+    """
+    Транзакции в виде колонок numpy:
+        dates - даты (datetime64[D])
+        accounts - номера счетов (S6)
+        txn_types - типы транзакций (S1)
+        amounts_minor - суммы в копейках (int64)
+    """
+
+    def __init__(self, dates: Any, accounts: Any, txn_types: Any, amounts_minor: Any) -> None:
+        self.__dates = dates
+        self.__accounts = accounts
+        self.__txn_types = txn_types
+        self.__amounts = amounts_minor
+
+    def __len__(self) -> int:
+        return len(self.__amounts)
+
+    @property
+    def dates(self) -> Any:
+        """ Даты транзакций """
+        return self.__dates
+
+    @property
+    def accounts(self) -> Any:
+        """ Номера счетов """
+        return self.__accounts
+
+    @property
+    def txn_types(self) -> Any:
+        """ Типы транзакций """
+        return self.__txn_types
+
+    @property
+    def amounts(self) -> Any:
+        """ Суммы транзакций """
+        return self.__amounts / MINOR_UNITS
+
+    @property
+    def amounts_minor(self) -> Any:
+        """ Суммы транзакций в копейках """
+        return self.__amounts
+
+    def signed_amounts(self) -> Any:
+        """
+        Суммы в копейках со знаком: депозит - положительная, снятие - отрицательная
+        """
+        return np.where(self.__txn_types == TXN_TYPE_DEPOSIT.encode(), self.__amounts, -self.__amounts)
+
+    def search(self, account_num: str) -> TransactionColumns:
+        """
+        Транзакции по номеру счета
+        """
+        mask = self.__accounts == account_num.encode()
+        return TransactionColumns(self.__dates[mask], self.__accounts[mask],
+                                  self.__txn_types[mask], self.__amounts[mask])
+
+    def totals(self) -> dict[str, int]:
+        """
+        Изменение баланса по каждому счету за всю историю в копейках
+        """
+        accounts, inverse = np.unique(self.__accounts, return_inverse=True)
+        sums = np.zeros(len(accounts), dtype=np.int64)
+        np.add.at(sums, inverse, self.signed_amounts())
+        return {account.decode(): int(total) for account, total in zip(accounts.tolist(), sums.tolist())}
+
+    def balances(self, initial: dict[str, int], limits: dict[str, tuple[int, int]]) -> dict[str, int]:
+        """
+        Переигровка истории по счетам без цикла по транзакциям.
+        initial - начальные балансы в копейках, limits - (минимальный, максимальный) лимиты в копейках.
+        Баланс после каждой транзакции проверяется на лимиты, как в Account.deposit/withdraw.
+        Возвращает итоговые балансы в копейках по всем счетам из initial.
+        """
+        result = dict(initial)
+        if len(self) == 0:
+            return result
+
+        accounts, inverse = np.unique(self.__accounts, return_inverse=True)
+        account_nums = [account.decode() for account in accounts.tolist()]
+        unknown = [account_num for account_num in account_nums if account_num not in initial]
+        if unknown:
+            raise ValueError(f"Счет с номером #{unknown[0]} не найден.")
+
+        # транзакции каждого счета подряд, с сохранением исходного порядка
+        order = np.argsort(inverse, kind="stable")
+        groups = inverse[order]
+        counts = np.bincount(groups, minlength=len(accounts))
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+        signed = self.signed_amounts()[order]
+        running = np.cumsum(signed)
+        running -= np.repeat(running[starts] - signed[starts], counts)
+        running += np.repeat(np.array([initial[num] for num in account_nums], dtype=np.int64), counts)
+
+        min_limits = np.repeat(np.array([limits[num][0] for num in account_nums], dtype=np.int64), counts)
+        max_limits = np.repeat(np.array([limits[num][1] for num in account_nums], dtype=np.int64), counts)
+        bad = (running < min_limits) | (running > max_limits)
+        if bad.any():
+            first = order[np.flatnonzero(bad)].min()
+            account_num = self.__accounts[first].decode()
+            raise ValueError(f"Нарушен лимит по счету #{account_num} в транзакции {first + 1}")
+
+        ends = starts + counts - 1
+        for account_num, balance in zip(account_nums, running[ends].tolist()):
+            result[account_num] = balance
+        return result
+
+    def to_transaction_list(self) -> TransactionList:
+        """
+        Преобразовать в реестр объектов Transaction
+        """
+        items = TransactionList()
+        for date, account, txn_type, amount in zip(self.__dates.tolist(), self.__accounts.tolist(),
+                                                   self.__txn_types.tolist(), self.__amounts.tolist()):
+            items.append(Transaction.from_minor_units(datetime.datetime.combine(date, datetime.time()),
+                                                      account.decode(), txn_type.decode(), amount))
+        return items
+
+    @staticmethod
+    def load(file_name: Path, offset: int = 0) -> TransactionColumns:
+        """
+        Загрузка транзакций из файла в колонки, начиная со смещения offset (в байтах).
+        Все записи проверяются пакетно, при ошибке сообщается номер первой некорректной строки.
+        """
+        if np is None:
+            raise ImportError("Для колоночной загрузки транзакций требуется пакет numpy.")
+
+        data = np.fromfile(file_name, dtype=np.uint8, offset=offset)
+        records = _split_records(data)
+        if records.shape[0] == 0:
+            return TransactionColumns(np.empty(0, dtype="datetime64[D]"), np.empty(0, dtype="S6"),
+                                      np.empty(0, dtype="S1"), np.empty(0, dtype=np.int64))
+
+        dates = _parse_dates(records[:, DATE_START:DATE_END])
+        accounts = _parse_accounts(records[:, ACCOUNT_START:ACCOUNT_END])
+        txn_types = _parse_txn_types(records[:, TXN_TYPE_POS])
+        amounts = _parse_amounts(records[:, AMOUNT_START:])
+        return TransactionColumns(dates, accounts, txn_types, amounts)
+
+
+def _split_records(data: Any) -> Any:
+    """
+    Разбить содержимое файла на записи.
+    Возвращает матрицу байт: строка матрицы - запись, дополненная справа пробелами.
+    """
+    ends = np.flatnonzero(data == _NEWLINE)
+    if len(data) > 0 and data[-1] != _NEWLINE:
+        ends = np.append(ends, len(data))
+    if len(ends) == 0:
+        return np.empty((0, AMOUNT_START + 1), dtype=np.uint8)
+    starts = np.concatenate(([0], ends[:-1] + 1)).astype(np.int64)
+    lengths = ends - starts
+
+    # \r в конце строки не входит в запись
+    has_cr = np.zeros(len(ends), dtype=bool)
+    nonempty = lengths > 0
+    has_cr[nonempty] = data[ends[nonempty] - 1] == _CARRIAGE_RETURN
+    lengths = lengths - has_cr
+
+    # пустые строки пропускаются
+    nonempty = lengths > 0
+    starts, lengths = starts[nonempty], lengths[nonempty]
+    if len(starts) == 0:
+        return np.empty((0, AMOUNT_START + 1), dtype=np.uint8)
+
+    too_short = np.flatnonzero(lengths <= AMOUNT_START)
+    if len(too_short) > 0:
+        raise ValueError(f"Некорректная длина записи в строке {too_short[0] + 1}")
+
+    width = int(lengths.max())
+    stride = width + 1
+    if (lengths.min() == width and len(data) >= len(starts) * stride
+            and np.array_equal(starts, np.arange(len(starts)) * stride)):
+        # все записи одинаковой длины: матрица без копирования
+        return data[:len(starts) * stride].reshape(len(starts), stride)[:, :width]
+
+    records = np.full((len(starts), width), _SPACE, dtype=np.uint8)
+    for pos in range(width):
+        present = lengths > pos
+        records[present, pos] = data[starts[present] + pos]
+    return records
+
+
+def _first_bad_line(mask: Any) -> int:
+    return int(np.flatnonzero(mask)[0]) + 1
+
+
+def _parse_dates(columns: Any) -> Any:
+    digits = columns.astype(np.int32) - _ZERO
+    bad = ((digits < 0) | (digits > 9)).any(axis=1)
+    if bad.any():
+        raise ValueError(f"Некорректная дата в строке {_first_bad_line(bad)}")
+
+    year = digits[:, 0] * 1000 + digits[:, 1] * 100 + digits[:, 2] * 10 + digits[:, 3]
+    month = digits[:, 4] * 10 + digits[:, 5]
+    day = digits[:, 6] * 10 + digits[:, 7]
+
+    bad = (year < 1) | (month < 1) | (month > 12) | (day < 1)
+    if bad.any():
+        raise ValueError(f"Некорректная дата в строке {_first_bad_line(bad)}")
+
+    months = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+    dates = months.astype("datetime64[D]") + (day - 1)
+
+    # день за пределами месяца переходит в следующий месяц
+    bad = dates.astype("datetime64[M]") != months
+    if bad.any():
+        raise ValueError(f"Некорректная дата в строке {_first_bad_line(bad)}")
+    return dates
+
+
+def _parse_accounts(columns: Any) -> Any:
+    acc_type = columns[:, 0]
+    bad = (acc_type != ord(ACC_TYPE_SAVING)) & (acc_type != ord(ACC_TYPE_CURRENT))
+    if bad.any():
+        raise ValueError(f"Первый символ счета должен содержать буквы S или C, строка {_first_bad_line(bad)}")
+
+    digits = columns[:, 1:]
+    bad = ((digits < _ZERO) | (digits > _ZERO + 9)).any(axis=1)
+    if bad.any():
+        raise ValueError(f"Номер счета должен содержать только цифры, строка {_first_bad_line(bad)}")
+
+    return np.ascontiguousarray(columns).view("S6").ravel()
+
+
+def _parse_txn_types(column: Any) -> Any:
+    bad = (column != ord(TXN_TYPE_DEPOSIT)) & (column != ord(TXN_TYPE_WITHDRAW))
+    if bad.any():
+        raise ValueError(f"Неизвестный тип транзакции в строке {_first_bad_line(bad)}")
+    return np.ascontiguousarray(column).view("S1")
+
+
+def _parse_amounts(columns: Any) -> Any:
+    """
+    Суммы в копейках, разобранные из цифр записи без промежуточного float.
+    Простые суммы (цифры, не более одной точки и двух знаков после нее) разбираются векторно,
+    остальные - построчно, как в Transaction.load.
+    """
+    amounts_minor = _parse_aligned_amounts(columns)
+    if amounts_minor is None:
+        amounts_minor = _parse_simple_amounts(columns)
+
+    bad = ~(amounts_minor > 0)
+    if bad.any():
+        raise ValueError(f"Сумма должна быть положительной, строка {_first_bad_line(bad)}")
+    return amounts_minor
+
+
+def _parse_aligned_amounts(columns: Any) -> Any:
+    """
+    Суммы, выровненные по правому краю с двумя знаками после точки (формат Transaction.dump):
+    место цифры задает ее разряд. Если хотя бы одна сумма в другом формате - None.
+    """
+    width = columns.shape[1]
+    units_width = width - 3
+    if units_width < 1 or units_width > _MAX_AMOUNT_DIGITS or len(columns) == 0:
+        return None
+    units = columns[:, :units_width]
+    cents = columns[:, units_width + 1:].astype(np.int64) - _ZERO
+    filled = units != _SPACE
+    if not ((columns[:, units_width] == _DOT).all() and ((cents >= 0) & (cents <= 9)).all()
+            and filled[:, -1].all() and (filled[:, 1:] >= filled[:, :-1]).all()):
+        return None
+    digits = (units.astype(np.int64) - _ZERO) * filled
+    if not ((digits >= 0) & (digits <= 9)).all():
+        return None
+    place_values = np.power(np.int64(10), np.arange(units_width - 1, -1, -1, dtype=np.int64))
+    return (digits @ place_values) * MINOR_UNITS + cents[:, 0] * 10 + cents[:, 1]
+
+
+def _parse_simple_amounts(columns: Any) -> Any:
+    digits = (columns >= _ZERO) & (columns <= _ZERO + 9)
+    is_dot = columns == _DOT
+    has_dot = is_dot.any(axis=1)
+    filled = columns != _SPACE
+    # количество цифр правее каждой позиции - степень десяти для цифры в этой позиции
+    digits_right = np.cumsum(digits[:, ::-1], axis=1)[:, ::-1] - digits
+    fraction = np.where(has_dot, digits_right[np.arange(len(columns)), is_dot.argmax(axis=1)], 0)
+    # заполненные позиции идут подряд, без пробелов внутри суммы
+    runs = filled[:, 0].astype(np.int64) + (filled[:, 1:] & ~filled[:, :-1]).sum(axis=1)
+    simple = ((digits | is_dot | ~filled).all(axis=1) & (is_dot.sum(axis=1) <= 1) & (runs == 1)
+              & digits.any(axis=1) & (fraction <= 2) & (digits.sum(axis=1) <= _MAX_AMOUNT_DIGITS))
+
+    powers = np.power(np.int64(10), np.where(simple[:, None] & digits, digits_right, 0))
+    values = (np.where(digits, columns - _ZERO, 0).astype(np.int64) * powers).sum(axis=1)
+    amounts_minor = values * np.power(np.int64(10), 2 - np.minimum(fraction, 2))
+
+    if not simple.all():
+        text = np.ascontiguousarray(columns).view(f"S{columns.shape[1]}").ravel()
+        for idx in np.flatnonzero(~simple).tolist():
+            try:
+                amounts_minor[idx] = to_minor(text[idx].decode("UTF-8"))
+            except (ValueError, OverflowError):
+                raise ValueError(f"Некорректная сумма в строке {idx + 1}")
+    return amounts_minor
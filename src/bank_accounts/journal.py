@@ -0,0 +1,311 @@
+# journal.py
+
+"""
+Журнал транзакций: дозапись новых транзакций в конец файла
+"""
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import BinaryIO, Iterable, Optional
+
+from transactions import Transaction, TXN_RECORD_WIDTH
+
+# Синхронизация с диском (fsync) после каждых N записей.
+# 1 - после каждой записи, 0 - не синхронизировать по количеству
+DEFAULT_SYNC_EVERY = 1
+
+# Синхронизация с диском не реже, чем раз в T миллисекунд (в том числе без новых записей - по таймеру).
+# 0 - не синхронизировать по времени
+DEFAULT_SYNC_INTERVAL_MS = 0
+
+# Наибольшее количество транзакций, сбрасываемых на диск одной группой
+DEFAULT_GROUP_COMMIT_MAX_BATCH = 10000
+
+# Сколько байт читать с конца файла при поиске незавершенной записи
+_REPAIR_LOOKBEHIND = 256
+
+
+class TransactionJournal:
+    """
+    Журнал транзакций.
+    Каждая новая транзакция дописывается в конец файла транзакций,
+    полная перезапись файла выполняется только при уплотнении (compact).
+    При синхронизации по времени записи, оставшиеся несинхронизированными после последней дозаписи,
+    сбрасывает на диск фоновый таймер.
+    """
+
+    def __init__(self, file_name: Path,
+                 sync_every: int = DEFAULT_SYNC_EVERY,
+                 sync_interval_ms: int = DEFAULT_SYNC_INTERVAL_MS) -> None:
+        if sync_every < 0:
+            raise ValueError("Количество записей между синхронизациями не может быть отрицательным.")
+        if sync_interval_ms < 0:
+            raise ValueError("Интервал синхронизации не может быть отрицательным.")
+
+        self.__file_name = file_name
+        self.__sync_every = sync_every
+        self.__sync_interval = sync_interval_ms / 1000
+        self.__file: Optional[BinaryIO] = None
+        self.__pending = 0
+        self.__last_sync = time.monotonic()
+        # файл журнала используется вызывающими потоками и таймером синхронизации
+        self.__lock = threading.RLock()
+        self.__timer: Optional[threading.Timer] = None
+
+    @property
+    def file_name(self) -> Path:
+        """ Файл журнала """
+        return self.__file_name
+
+    @property
+    def pending(self) -> int:
+        """ Количество записей, еще не синхронизированных с диском """
+        return self.__pending
+
+    def append(self, txn: Transaction) -> None:
+        """
+        Дописать транзакцию в конец журнала
+        """
+        self.append_many([txn])
+
+    def append_many(self, txns: Iterable[Transaction]) -> None:
+        """
+        Дописать несколько транзакций в конец журнала одной операцией записи
+        """
+        with self.__lock:
+            if self.write_many(txns) > 0:
+                self._sync_by_policy()
+
+    def write_many(self, txns: Iterable[Transaction]) -> int:
+        """
+        Дописать транзакции одной операцией записи без синхронизации с диском по политике журнала:
+        вызывающий сам синхронизирует журнал (sync). Возвращает количество записанных транзакций.
+        """
+        lines = [f"{txn.dump()}\n" for txn in txns]
+        if len(lines) == 0:
+            return 0
+
+        with self.__lock:
+            f = self._open()
+            f.write("".join(lines).encode("UTF-8"))
+            f.flush()
+            self.__pending += len(lines)
+        return len(lines)
+
+    def sync(self) -> None:
+        """
+        Принудительно сбросить записанные данные на диск
+        """
+        with self.__lock:
+            if self.__file is not None:
+                self.__file.flush()
+                os.fsync(self.__file.fileno())
+            self.__pending = 0
+            self.__last_sync = time.monotonic()
+
+    def close(self) -> None:
+        """
+        Синхронизировать и закрыть файл журнала
+        """
+        with self.__lock:
+            if self.__timer is not None:
+                self.__timer.cancel()
+                self.__timer = None
+            if self.__file is None:
+                return
+            self.sync()
+            self.__file.close()
+            self.__file = None
+
+    def repair(self) -> int:
+        """
+        Отрезать незавершенную последнюю запись, оставшуюся после сбоя во время дозаписи.
+        Запись считается незавершенной, если после нее нет перевода строки и она не разбирается.
+        Если предыдущая запись записана в формате Transaction.dump, незавершенной считается и
+        более короткая запись: сумма выравнивается по правому краю, поэтому обрезанная сумма
+        может разобраться как число.
+        Возвращает количество отрезанных байт.
+        """
+        if self.__file is not None:
+            return 0
+        record_start = self._torn_record_start()
+        if record_start is None:
+            return 0
+        size = os.path.getsize(self.__file_name)
+        with open(self.__file_name, "r+b") as f:
+            f.truncate(record_start)
+            f.flush()
+            os.fsync(f.fileno())
+        return size - record_start
+
+    def needs_repair(self) -> bool:
+        """
+        В конце файла есть незавершенная запись (см. repair). Файл не изменяется.
+        """
+        return self.__file is None and self._torn_record_start() is not None
+
+    def _torn_record_start(self) -> Optional[int]:
+        """
+        Смещение незавершенной последней записи или None
+        """
+        if not os.path.isfile(self.__file_name):
+            return None
+        size = os.path.getsize(self.__file_name)
+        if size == 0:
+            return None
+
+        with open(self.__file_name, "rb") as f:
+            start = max(0, size - _REPAIR_LOOKBEHIND)
+            f.seek(start)
+            data = f.read()
+        if data.endswith(b"\n"):
+            return None
+        newline = data.rfind(b"\n")
+        if newline < 0 and start > 0:
+            return None
+        previous = data[data.rfind(b"\n", 0, newline) + 1:newline].rstrip(b"\r") if newline >= 0 else b""
+        try:
+            tail = data[newline + 1:].decode("UTF-8").rstrip("\r")
+            if len(tail) >= TXN_RECORD_WIDTH or len(previous) < TXN_RECORD_WIDTH:
+                Transaction.load(tail)
+                return None
+        except ValueError:
+            pass
+        return start + newline + 1
+
+    def _open(self) -> BinaryIO:
+        if self.__file is not None:
+            return self.__file
+
+        # Последняя строка файла может быть без перевода строки,
+        # иначе новая запись "склеится" с ней
+        needs_newline = False
+        if os.path.isfile(self.__file_name) and os.path.getsize(self.__file_name) > 0:
+            with open(self.__file_name, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+
+        self.__file = open(self.__file_name, "ab")
+        if needs_newline:
+            self.__file.write(b"\n")
+        return self.__file
+
+    def _sync_by_policy(self) -> None:
+        if self.__sync_every > 0 and self.__pending >= self.__sync_every:
+            self.sync()
+            return
+        if self.__sync_interval <= 0:
+            return
+        elapsed = time.monotonic() - self.__last_sync
+        if elapsed >= self.__sync_interval:
+            self.sync()
+        elif self.__timer is None:
+            # следующей записи может не быть - оставшиеся записи сбросит таймер
+            self.__timer = threading.Timer(self.__sync_interval - elapsed, self._sync_on_timer)
+            self.__timer.daemon = True
+            self.__timer.start()
+
+    def _sync_on_timer(self) -> None:
+        with self.__lock:
+            if self.__timer is not threading.current_thread():
+                # журнал закрыт, таймер отменен
+                return
+            self.__timer = None
+            if self.__pending > 0:
+                self.sync()
+
+
+class GroupCommitter:
+    """
+    Групповая фиксация транзакций журнала.
+    Вызывающие потоки ставят транзакции в очередь, отдельный поток записи
+    забирает из очереди все накопившиеся транзакции, дописывает их одной операцией
+    и синхронизирует журнал с диском один раз на всю группу.
+    Каждый вызывающий поток ждет, пока его транзакции не окажутся на диске.
+    """
+
+    def __init__(self, journal: TransactionJournal, max_batch: int = DEFAULT_GROUP_COMMIT_MAX_BATCH) -> None:
+        if max_batch <= 0:
+            raise ValueError("Размер группы должен быть положительным.")
+        self.__journal = journal
+        self.__max_batch = max_batch
+        self.__queue: queue.SimpleQueue[Optional[tuple[list[Transaction], Future]]] = queue.SimpleQueue()
+        self.__thread: Optional[threading.Thread] = None
+        self.__lock = threading.Lock()
+        self.__groups = 0
+
+    @property
+    def groups(self) -> int:
+        """ Количество групп, сброшенных на диск """
+        return self.__groups
+
+    def submit(self, txns: Iterable[Transaction]) -> Future:
+        """
+        Поставить транзакции в очередь на запись.
+        Результат (Future) завершается, когда транзакции синхронизированы с диском.
+        Порядок записи совпадает с порядком вызовов submit.
+        """
+        future: Future = Future()
+        with self.__lock:
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+                self.__thread.start()
+            self.__queue.put((list(txns), future))
+        return future
+
+    def commit(self, txns: Iterable[Transaction]) -> None:
+        """
+        Записать транзакции и дождаться синхронизации с диском
+        """
+        self.submit(txns).result()
+
+    def flush(self) -> None:
+        """
+        Дождаться записи всех транзакций, поставленных в очередь
+        """
+        if self.__thread is not None:
+            self.commit([])
+
+    def close(self) -> None:
+        """
+        Записать оставшиеся транзакции и остановить поток записи
+        """
+        with self.__lock:
+            thread, self.__thread = self.__thread, None
+            if thread is not None:
+                self.__queue.put(None)
+        if thread is not None:
+            thread.join()
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            group = [self.__queue.get()]
+            count = 0
+            while group[-1] is not None and count < self.__max_batch:
+                count += len(group[-1][0])
+                try:
+                    group.append(self.__queue.get_nowait())
+                except queue.Empty:
+                    break
+            if group[-1] is None:
+                group.pop()
+                stop = True
+
+            try:
+                # одна синхронизация на группу, а не по политике журнала после записи.
+                # Группа только из ожидающих (flush) не синхронизируется: предыдущие группы уже на диске
+                if self.__journal.write_many(txn for txns, _ in group for txn in txns) > 0:
+                    self.__journal.sync()
+                self.__groups += 1
+            except Exception as error:
+                for _, future in group:
+                    future.set_exception(error)
+                continue
+            for _, future in group:
+                future.set_result(None)
@@ -0,0 +1,268 @@
+# locks.py
+
+"""
+Блокировки: счетов внутри процесса и файлов данных между процессами
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # fcntl есть только в Unix, без него файлы не блокируются
+    fcntl = None
+
+# Количество блокировок в таблице по умолчанию
+DEFAULT_LOCK_STRIPES = 64
+
+# Наибольшее время ожидания блокировки файлов данных, миллисекунд
+DEFAULT_LOCK_TIMEOUT_MS = 10000
+
+# Пауза между попытками захватить блокировку файла, секунд
+_LOCK_RETRY_INTERVAL = 0.005
+
+
+class StripedLock:
+    """
+    Таблица блокировок, разделенная на полосы по номеру счета.
+    Транзакции по счетам из разных полос проводятся параллельно,
+    по счетам из одной полосы - по очереди.
+    Несколько полос всегда захватываются в порядке возрастания номера, чтобы исключить взаимную блокировку.
+    """
+
+    def __init__(self, stripes: int = DEFAULT_LOCK_STRIPES) -> None:
+        if stripes <= 0:
+            raise ValueError("Количество блокировок должно быть положительным.")
+        self.__locks = [threading.Lock() for _ in range(stripes)]
+
+    def __len__(self) -> int:
+        return len(self.__locks)
+
+    def stripe(self, account_num: str) -> int:
+        """
+        Номер полосы счета
+        """
+        return hash(account_num) % len(self.__locks)
+
+    @contextmanager
+    def hold(self, account_nums: Iterable[str]) -> Iterator[None]:
+        """
+        Захватить блокировки указанных счетов
+        """
+        stripes = sorted({self.stripe(account_num) for account_num in account_nums})
+        with self._hold_stripes(stripes):
+            yield
+
+    @contextmanager
+    def hold_all(self) -> Iterator[None]:
+        """
+        Захватить все блокировки (снимок состояния всех счетов)
+        """
+        with self._hold_stripes(range(len(self.__locks))):
+            yield
+
+    @contextmanager
+    def _hold_stripes(self, stripes: Iterable[int]) -> Iterator[None]:
+        acquired: list[threading.Lock] = []
+        try:
+            for stripe in stripes:
+                lock = self.__locks[stripe]
+                lock.acquire()
+                acquired.append(lock)
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
+
+
+class FileLock:
+    """
+    Рекомендательная (advisory) блокировка файлов данных между процессами (fcntl.flock).
+    Читатели захватывают общую блокировку, писатели - исключительную.
+    Внутри процесса блокировка повторно входимая: файл блокируется при первом захвате
+    и освобождается, когда из блокировки выходит последний поток.
+    Вид блокировки файла не меняется на месте: писатель ждет, пока общую блокировку
+    не освободят все потоки процесса, и блокирует файл заново. Поток, который сам держит
+    общую блокировку, исключительную получить не может - ее нужно запрашивать сразу.
+    Метка (stamp) в файле блокировки меняется при каждом освобождении исключительной
+    блокировки: по ней процесс узнает, что данные изменил другой процесс.
+    """
+
+    def __init__(self, lock_file: Path, timeout_ms: int = DEFAULT_LOCK_TIMEOUT_MS) -> None:
+        if timeout_ms < 0:
+            raise ValueError("Время ожидания блокировки не может быть отрицательным.")
+        self.__lock_file = Path(lock_file)
+        self.__timeout = timeout_ms / 1000
+        self.__file: Optional[BinaryIO] = None
+        self.__depth = 0
+        # глубина захвата по потокам: повторный захват потоком, который уже держит блокировку
+        self.__holders: dict[int, int] = {}
+        self.__exclusive = False
+        # поток блокирует файл вне мьютекса, остальные ждут
+        self.__locking = False
+        # количество потоков, ожидающих исключительную блокировку: новые читатели их пропускают
+        self.__waiting_writers = 0
+        self.__mutex = threading.Lock()
+        self.__changed = threading.Condition(self.__mutex)
+
+    @property
+    def lock_file(self) -> Path:
+        """ Файл блокировки """
+        return self.__lock_file
+
+    def acquire(self, exclusive: bool, after_lock: Optional[Callable[[], None]] = None) -> bool:
+        """
+        Захватить блокировку.
+        after_lock() вызывается сразу после блокировки файла, до того как в блокировку войдут другие потоки.
+        Возвращает True, если файл был заблокирован этим вызовом (первый захват в процессе).
+        """
+        if fcntl is None:
+            return False
+        thread = threading.get_ident()
+        deadline = time.monotonic() + self.__timeout
+        with self.__changed:
+            own = self.__holders.get(thread, 0)
+            if exclusive and own > 0 and not self.__exclusive:
+                raise ValueError("Переход от общей блокировки файлов данных к исключительной не поддерживается.")
+            if exclusive:
+                self.__waiting_writers += 1
+            try:
+                while True:
+                    if self._can_join(exclusive, own):
+                        self._enter(thread)
+                        return False
+                    if self._can_lock(exclusive):
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise ValueError(f"Файлы данных заблокированы другим потоком: {self.__lock_file}")
+                    self.__changed.wait(remaining)
+            finally:
+                if exclusive:
+                    self.__waiting_writers -= 1
+            self.__locking = True
+            fd = self._get_file().fileno()
+
+        # ожидание файла - вне мьютекса: другие потоки могут освобождать блокировку
+        locked = False
+        try:
+            self._lock_file(fd, exclusive, deadline)
+            locked = True
+            if after_lock is not None:
+                after_lock()
+        except BaseException:
+            with self.__changed:
+                if locked:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                self.__locking = False
+                self.__changed.notify_all()
+            raise
+        with self.__changed:
+            self.__exclusive = exclusive
+            self.__locking = False
+            self._enter(thread)
+            self.__changed.notify_all()
+        return True
+
+    def release(self, before_unlock: Optional[Callable[[bool], None]] = None) -> bool:
+        """
+        Освободить блокировку.
+        before_unlock(exclusive) вызывается перед разблокировкой файла, пока блокировка еще удерживается.
+        Возвращает True, если файл разблокирован этим вызовом.
+        """
+        if fcntl is None:
+            return False
+        with self.__changed:
+            thread = threading.get_ident()
+            own = self.__holders.get(thread, 0)
+            if own > 1:
+                self.__holders[thread] = own - 1
+            elif own == 1:
+                del self.__holders[thread]
+            self.__depth -= 1
+            if self.__depth > 0:
+                return False
+            self.__holders.clear()
+            try:
+                if before_unlock is not None:
+                    before_unlock(self.__exclusive)
+            finally:
+                fcntl.flock(self._get_file().fileno(), fcntl.LOCK_UN)
+                self.__exclusive = False
+                self.__changed.notify_all()
+            return True
+
+    @property
+    def exclusive(self) -> bool:
+        """ Процесс держит исключительную блокировку """
+        return self.__exclusive
+
+    def read_stamp(self) -> str:
+        """
+        Метка последнего изменения данных
+        """
+        f = self._get_file()
+        f.seek(0)
+        return f.read().decode("UTF-8")
+
+    def write_stamp(self, stamp: str) -> None:
+        """
+        Записать метку изменения данных. Вызывается под исключительной блокировкой.
+        """
+        f = self._get_file()
+        f.seek(0)
+        f.truncate()
+        f.write(stamp.encode("UTF-8"))
+        f.flush()
+
+    def close(self) -> None:
+        """
+        Закрыть файл блокировки
+        """
+        with self.__mutex:
+            if self.__file is not None and self.__depth == 0 and not self.__locking:
+                self.__file.close()
+                self.__file = None
+
+    def _can_join(self, exclusive: bool, own: int) -> bool:
+        """
+        Войти в блокировку, которую процесс уже держит: в исключительную - всегда,
+        в общую - за читателем, если исключительную не ждет писатель (или поток уже держит блокировку)
+        """
+        if self.__depth == 0 or self.__locking:
+            return False
+        if self.__exclusive:
+            return True
+        return not exclusive and (own > 0 or self.__waiting_writers == 0)
+
+    def _can_lock(self, exclusive: bool) -> bool:
+        """
+        Заблокировать файл: процесс его не держит и никто не блокирует; читатель пропускает ждущих писателей
+        """
+        return not self.__locking and self.__depth == 0 and (exclusive or self.__waiting_writers == 0)
+
+    def _enter(self, thread: int) -> None:
+        self.__depth += 1
+        self.__holders[thread] = self.__holders.get(thread, 0) + 1
+
+    def _lock_file(self, fd: int, exclusive: bool, deadline: float) -> None:
+        operation = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+        while True:
+            try:
+                fcntl.flock(fd, operation | fcntl.LOCK_NB)
+                return
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise ValueError(f"Файлы данных заблокированы другим процессом: {self.__lock_file}")
+                time.sleep(_LOCK_RETRY_INTERVAL)
+
+    def _get_file(self) -> BinaryIO:
+        if self.__file is None:
+            fd = os.open(self.__lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+            self.__file = os.fdopen(fd, "r+b")
+        return self.__file
@@ -0,0 +1,130 @@
+# logging_setup.py
+
+"""
+Журналирование через очередь: команды только ставят записи в очередь (QueueHandler),
+а запись в файл и на консоль выполняет отдельный поток (QueueListener).
+Файл журнала открывается при первой записи и ротируется по размеру.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import time
+from pathlib import Path
+from typing import Any, Optional, Union
+
+# Файл журнала по умолчанию
+LOG_FILE_NAME = Path("bank.log")
+
+# Размер файла журнала, после которого он ротируется (bank.log -> bank.log.1 ...), байт
+LOG_MAX_BYTES = 10 * 2 ** 20
+
+# Количество старых файлов журнала, которые сохраняются при ротации
+LOG_BACKUP_COUNT = 5
+
+# Формат записи
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Структурированные поля записи (передаются через extra) в порядке вывода в файл журнала
+STRUCTURED_FIELDS = ("account", "amount", "latency_ms")
+
+# Обработчик очереди и поток записи, установленные configure_logging
+_installed: Optional[tuple[logging.Logger, logging.Handler, logging.handlers.QueueListener]] = None
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Формат записи с добавлением структурированных полей: ... | account=S00001 amount=100.00 latency_ms=0.412
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        fields = [f"{name}={getattr(record, name)}" for name in STRUCTURED_FIELDS
+                  if getattr(record, name, None) is not None]
+        if not fields:
+            return message
+        return f"{message} | {' '.join(fields)}"
+
+
+class LocalQueueHandler(logging.handlers.QueueHandler):
+    """
+    Постановка записи в очередь внутри процесса: запись не форматируется и не копируется
+    (QueueHandler.prepare готовит запись к передаче в другой процесс), форматирует поток записи.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def operation_fields(account: Optional[str] = None, amount: Optional[float] = None,
+                     start: Optional[float] = None) -> dict[str, Any]:
+    """
+    Структурированные поля записи об операции (для параметра extra).
+    start - время начала операции по time.perf_counter, от него считается задержка.
+    """
+    fields: dict[str, Any] = {"account": account}
+    if amount is not None:
+        fields["amount"] = f"{amount:.2f}"
+    if start is not None:
+        fields["latency_ms"] = f"{(time.perf_counter() - start) * 1000:.3f}"
+    return fields
+
+
+def configure_logging(logger: logging.Logger, log_file: Optional[Union[str, Path]] = LOG_FILE_NAME,
+                      max_bytes: int = LOG_MAX_BYTES, backup_count: int = LOG_BACKUP_COUNT,
+                      console_level: int = logging.INFO) -> None:
+    """
+    Направить записи logger в очередь и запустить поток записи:
+    в файл log_file (все уровни, со структурированными полями, с ротацией по размеру max_bytes)
+    и на консоль (от console_level). log_file None - без файла.
+    Повторный вызов заменяет прежнюю настройку.
+    """
+    if max_bytes < 0:
+        raise ValueError("Размер файла журнала не может быть отрицательным.")
+    if backup_count < 0:
+        raise ValueError("Количество старых файлов журнала не может быть отрицательным.")
+    shutdown_logging()
+
+    handlers: list[logging.Handler] = []
+    if log_file is not None:
+        # delay - файл открывается при первой записи, а не при настройке
+        file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count,
+                                                            encoding="UTF-8", delay=True)
+        file_handler.setLevel(logging.DEBUG)
+        file_handler.setFormatter(StructuredFormatter(LOG_FORMAT))
+        handlers.append(file_handler)
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(console_level)
+    console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    handlers.append(console_handler)
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = LocalQueueHandler(records)
+    listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(queue_handler)
+    listener.start()
+
+    global _installed
+    _installed = (logger, queue_handler, listener)
+
+
+def shutdown_logging() -> None:
+    """
+    Дописать записи из очереди, остановить поток записи и закрыть файл журнала.
+    """
+    global _installed
+    if _installed is None:
+        return
+    logger, queue_handler, listener = _installed
+    _installed = None
+    logger.removeHandler(queue_handler)
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+# записи, оставшиеся в очереди, дописываются и при выходе без закрытия контекста команды
+atexit.register(shutdown_logging)
@@ -5,14 +5,35 @@
 Интерфейс командной строки.
 """
 
+import sys
+
+if __name__ == "__main__" and sys.argv[1:2] == ["remote"]:
+    # тонкий клиент: запрос к запущенному серверу (команда serve)
+    # без загрузки click, rich и данных приложения
+    from client import main as client_main
+    sys.exit(client_main(sys.argv[2:]))
+
+import cProfile
 import click
+import datetime
 import logging
+import os
+import pstats
+import time
 
 from click import Path
 from rich.console import Console
-
-from application import bank_app
-from accounts import ACC_TYPE_SAVING, ACC_TYPE_CURRENT
+from rich.table import Table
+
+from application import bank_app, Application, ACCOUNTS_FILE_NAME, TRANSACTIONS_FILE_NAME, \
+    CHECKPOINT_FILE_NAME, INDEX_FILE_NAME, METRICS_FILE_NAME
+from metrics import metrics
+from logging_setup import configure_logging, shutdown_logging, operation_fields, \
+    LOG_FILE_NAME, LOG_MAX_BYTES, LOG_BACKUP_COUNT
+from client import DEFAULT_PORT, DEFAULT_SOCKET_PATH
+from accounts import AccountDict, ACC_TYPE_SAVING, ACC_TYPE_CURRENT
+from transactions import TransactionList
+from render import render, paginate, OUTPUT_FORMATS, FORMAT_TABLE
 
 ACCOUNT_TYPE = {
     ACC_TYPE_SAVING: "Saving",
@@ -21,6 +42,9 @@ ACCOUNT_TYPE = {
 
 console = Console()
 
+# Количество функций в сводке профиля (--profile), по суммарному времени
+PROFILE_TOP_FUNCTIONS = 20
+
 
 @click.command()
 @click.argument("account_type", type=click.Choice(list(ACCOUNT_TYPE.keys())), default=ACC_TYPE_SAVING)
@@ -31,8 +55,10 @@ def add_account(name: str, account_type: str, balance: float) -> None:
     Добавить новый счет.
     """
     try:
+        start = time.perf_counter()
         new_account = bank_app.add_new_account(name, account_type, balance)
-        logger.info(f"Создан новый счет #{new_account.account_number}")
+        logger.info(f"Создан новый счет #{new_account.account_number}",
+                    extra=operation_fields(new_account.account_number, balance, start))
         new_account.display()
     except ValueError as error:
         logger.error(f"Ошибка при создании счета: {error}")
@@ -47,8 +73,9 @@ def set_limits(account: str, min_limit: float, max_limit: float) -> None:
     Установить лимиты по счету.
     """
     try:
+        start = time.perf_counter()
         changed_account = bank_app.set_limits(account, min_limit, max_limit)
-        logger.info(f"Установлены лимиты по счету #:{account}")
+        logger.info(f"Установлены лимиты по счету #:{account}", extra=operation_fields(account, start=start))
         changed_account.display()
     except ValueError as error:
         logger.error(f"Ошибка при установке лимитов по счету #{account}: {error}")
@@ -61,13 +88,15 @@ def deposit(account: str, amount: float) -> None:
     """
     Внести сумму на счет.
     """
+    start = time.perf_counter()
     try:
         bank_app.deposit(account, amount)
-        logger.info(f"Внесен депозит на счет #:{account}")
+        logger.info(f"Внесен депозит на счет #:{account}", extra=operation_fields(account, amount, start))
         found_account = bank_app.get_account(account)
         found_account.display()
     except ValueError as error:
-        logger.error(f"Ошибка при внесении средств на счет #{account}: {error}")
+        logger.error(f"Ошибка при внесении средств на счет #{account}: {error}",
+                     extra=operation_fields(account, amount, start))
 
 
 @click.command()
@@ -77,13 +106,30 @@ def withdraw(account: str, amount: float) -> None:
     """
     Снять сумму со счета.
     """
+    start = time.perf_counter()
     try:
         bank_app.withdraw(account, amount)
-        logger.info(f"Списана сумма со счета #:{account}")
+        logger.info(f"Списана сумма со счета #:{account}", extra=operation_fields(account, amount, start))
         found_account = bank_app.get_account(account)
         found_account.display()
     except ValueError as error:
-        logger.error(f"Ошибка при списании средств со счета #{account}: {error}")
+        logger.error(f"Ошибка при списании средств со счета #{account}: {error}",
+                     extra=operation_fields(account, amount, start))
+
+
+@click.command()
+@click.argument("file", type=click.File("r", encoding="UTF-8"), required=1)
+def post_batch(file) -> None:
+    """
+    Провести пакет транзакций из файла в формате TRANSACTIONS.DAT (- для stdin).
+    Пакет проводится целиком или не проводится совсем.
+    """
+    try:
+        start = time.perf_counter()
+        count = bank_app.apply_batch(TransactionList.load_lines(file))
+        logger.info(f"Проведен пакет транзакций: {count}", extra=operation_fields(start=start))
+    except ValueError as error:
+        logger.error(f"Ошибка при проведении пакета транзакций: {error}")
 
 
 @click.command()
@@ -125,6 +171,35 @@ def export_accounts(filename: Path) -> None:
         logger.error(f"Ошибка при выгрузке транзакций: {error}")
 
 
+@click.command()
+@click.argument("filename", type=click.Path(exists=False), required=1)
+def export_binary(filename: Path) -> None:
+    """
+    Выгрузить историю транзакций в двоичный файл.
+    """
+    try:
+        count = bank_app.export_binary(filename)
+        logger.info(f"История транзакций ({count}) выгружена в двоичный файл: {filename}")
+    except ValueError as error:
+        logger.error(f"Ошибка при выгрузке транзакций: {error}")
+
+
+@click.command()
+@click.argument("binary_file", type=click.Path(exists=True), required=1)
+@click.argument("filename", type=click.Path(exists=False), required=1)
+def convert_binary(binary_file: Path, filename: Path) -> None:
+    """
+    Преобразовать двоичный файл транзакций в текстовый формат.
+    """
+    # модули, нужные одной команде, загружаются в ней: остальные команды запускаются быстрее
+    from binary_store import BinaryTransactionStore
+    try:
+        count = BinaryTransactionStore.to_text(binary_file, filename)
+        logger.info(f"Двоичный файл {binary_file} ({count}) преобразован в текстовый файл: {filename}")
+    except ValueError as error:
+        logger.error(f"Ошибка при преобразовании двоичного файла: {error}")
+
+
 @click.command()
 @click.argument("accounts_file", type=click.Path(exists=True), required=1)
 @click.argument("transactions_file", type=click.Path(exists=True), required=1)
@@ -141,68 +216,191 @@ def import_data(accounts_file: Path, transactions_file: Path) -> None:
 
 
 @click.command()
-def all_accounts() -> None:
+def compact() -> None:
+    """
+    Уплотнить журнал транзакций (полная перезапись файла).
+    """
+    try:
+        bank_app.compact()
+        logger.info("Журнал транзакций уплотнен")
+    except ValueError as error:
+        logger.error(f"Ошибка при уплотнении журнала: {error}")
+
+
+@click.command()
+def checkpoint() -> None:
+    """
+    Записать контрольную точку с текущими балансами по счетам.
+    """
+    try:
+        saved = bank_app.checkpoint()
+        logger.info(f"Контрольная точка записана. Учтено транзакций: {saved.count}")
+    except ValueError as error:
+        logger.error(f"Ошибка при записи контрольной точки: {error}")
+
+
+@click.command()
+@click.option("--socket", "socket_path", type=click.Path(), default=None, help="Unix сокет")
+@click.option("--host", type=str, default=None, help="Слушать TCP на адресе вместо Unix сокета")
+@click.option("--port", type=int, default=DEFAULT_PORT, help="TCP порт")
+def serve(socket_path: Path, host: str, port: int) -> None:
+    """
+    Запустить сервер: приложение остается в памяти, запросы принимаются по сокету.
+    Клиент: main.py remote <команда> ...
+    """
+    from server import serve as run_server
+    app = Application(ACCOUNTS_FILE_NAME, TRANSACTIONS_FILE_NAME,
+                      checkpoint_file=CHECKPOINT_FILE_NAME,
+                      index_file=INDEX_FILE_NAME,
+                      group_commit=True)
+    address = f"{host}:{port}" if host is not None else (socket_path or DEFAULT_SOCKET_PATH)
+    logger.info(f"Сервер запущен: {address}")
+    try:
+        run_server(app, socket_path, host, port)
+    except (OSError, ValueError) as error:
+        logger.error(f"Ошибка сервера: {error}")
+    logger.info("Сервер остановлен")
+
+
+def output_options(command):
+    """
+    Параметры вывода больших списков: страница, размер страницы, формат
+    """
+    command = click.option("--format", "output_format", type=click.Choice(OUTPUT_FORMATS), default=FORMAT_TABLE,
+                           help="Формат вывода: таблица, простой текст (через табуляцию) или CSV")(command)
+    command = click.option("--page-size", type=click.IntRange(min=0), default=0,
+                           help="Строк в одной таблице; таблицы выводятся по мере чтения (0 - одна таблица)")(command)
+    command = click.option("--limit", type=click.IntRange(min=0), default=None,
+                           help="Вывести не более N строк")(command)
+    command = click.option("--offset", type=click.IntRange(min=0), default=0,
+                           help="Пропустить первые N строк")(command)
+    return command
+
+
+@click.command()
+@output_options
+def all_accounts(offset: int, limit: int, page_size: int, output_format: str) -> None:
     """
     Отобразить все счета в виде списка.
     """
-    table = bank_app.get_all_accounts()
-    console.print(table)
+    try:
+        rows = paginate(AccountDict.table_rows(bank_app.iter_accounts()), offset, limit)
+        render(output_format, console, AccountDict.create_table, rows, page_size)
+    except ValueError as error:
+        logger.error(f"Ошибка: {error}")
 
 
 @click.command()
 @click.argument("account", type=str, required=0)
-def all_transactions(account: str) -> None:
+@click.option("--from", "date_from", type=click.DateTime(formats=["%Y-%m-%d"]), default=None,
+              help="Транзакции начиная с даты (ГГГГ-ММ-ДД)")
+@click.option("--to", "date_to", type=click.DateTime(formats=["%Y-%m-%d"]), default=None,
+              help="Транзакции по дату включительно (ГГГГ-ММ-ДД)")
+@output_options
+def all_transactions(account: str, date_from: datetime.datetime, date_to: datetime.datetime,
+                     offset: int, limit: int, page_size: int, output_format: str) -> None:
     """
     Отобразить историю транзакций по счету.
     Если счет не указан - отобразить все транзакции в виде списка.
+    Строки выводятся по мере чтения истории.
     """
     try:
         if account is not None:
             found_account = bank_app.get_account(account)
-            found_account.display()
-        table = bank_app.get_all_transactions(account)
-        console.print(table)
+            if output_format == FORMAT_TABLE:
+                found_account.display()
+        start = date_from.date() if date_from is not None else None
+        end = date_to.date() if date_to is not None else None
+        transactions = bank_app.iter_transactions(account, start, end)
+        rows = paginate(TransactionList.table_rows(transactions), offset, limit)
+        render(output_format, console, TransactionList.create_table, rows, page_size)
     except ValueError as error:
         logger.error(f"Ошибка: {error}")
 
 
-@click.group
-def cli_commands() -> None:
-    pass
+@click.command()
+@click.option("--reset", is_flag=True, help="Удалить накопленные метрики")
+def stats(reset: bool) -> None:
+    """
+    Отобразить метрики, накопленные командами с параметром --metrics.
+    """
+    from metrics import Metrics, SUMMARY_PERCENTILES
+    if reset:
+        if os.path.exists(METRICS_FILE_NAME):
+            os.remove(METRICS_FILE_NAME)
+        logger.info("Метрики удалены")
+        return
+
+    summary = Metrics.load(METRICS_FILE_NAME).summary()
+    if not summary:
+        logger.info("Метрик нет. Запустите команды с параметром --metrics: main.py --metrics <команда>")
+        return
+    table = Table(show_header=True, header_style="bold blue")
+    table.add_column("Метрика")
+    for header in ["Кол-во", "Среднее, мс", *(f"p{percent}, мс" for percent in SUMMARY_PERCENTILES), "Макс., мс"]:
+        table.add_column(header, justify="right")
+    for row in summary:
+        if "mean_ms" not in row:
+            table.add_row(row["name"], str(row["count"]))
+            continue
+        values = [row["mean_ms"], *(row[f"p{percent}_ms"] for percent in SUMMARY_PERCENTILES), row["max_ms"]]
+        table.add_row(row["name"], str(row["count"]), *(f"{value:.3f}" for value in values))
+    console.print(table)
+
+
+@click.group()
+@click.option("--profile", "profile_file", type=click.Path(), default=None,
+              help="Профилировать команду (cProfile) и сохранить статистику pstats в файл")
+@click.option("--metrics", "collect_metrics", is_flag=True,
+              help=f"Собирать метрики и добавить их к накопленным в {METRICS_FILE_NAME} (команда stats)")
+@click.option("--log-file", type=click.Path(dir_okay=False), default=str(LOG_FILE_NAME), envvar="BANK_LOG_FILE",
+              show_default=True, help="Файл журнала (пустая строка - без файла)")
+@click.option("--log-max-bytes", type=click.IntRange(min=0), default=LOG_MAX_BYTES, envvar="BANK_LOG_MAX_BYTES",
+              show_default=True, help="Размер файла журнала для ротации, байт (0 - без ротации)")
+@click.option("--log-backups", type=click.IntRange(min=0), default=LOG_BACKUP_COUNT, envvar="BANK_LOG_BACKUPS",
+              show_default=True, help="Количество старых файлов журнала")
+@click.pass_context
+def cli_commands(ctx: click.Context, profile_file: str, collect_metrics: bool,
+                 log_file: str, log_max_bytes: int, log_backups: int) -> None:
+    # журнал настраивается при запуске команды, а не при импорте модуля;
+    # остановка журнала - последней, после записей других обработчиков закрытия
+    configure_logging(logger, log_file or None, log_max_bytes, log_backups)
+    ctx.call_on_close(shutdown_logging)
+    if collect_metrics:
+        metrics.enable()
+        ctx.call_on_close(lambda: metrics.save(METRICS_FILE_NAME))
+    if profile_file is not None:
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        def save_profile() -> None:
+            profiler.disable()
+            profiler.dump_stats(profile_file)
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+            logger.info(f"Профиль сохранен: {profile_file}")
+        ctx.call_on_close(save_profile)
 
 
 cli_commands.add_command(add_account)
 cli_commands.add_command(set_limits)
 cli_commands.add_command(deposit)
 cli_commands.add_command(withdraw)
+cli_commands.add_command(post_batch)
 cli_commands.add_command(details)
 cli_commands.add_command(export_transactions)
 cli_commands.add_command(export_accounts)
+cli_commands.add_command(export_binary)
+cli_commands.add_command(convert_binary)
 cli_commands.add_command(import_data)
+cli_commands.add_command(compact)
+cli_commands.add_command(checkpoint)
+cli_commands.add_command(serve)
 cli_commands.add_command(all_accounts)
 cli_commands.add_command(all_transactions)
+cli_commands.add_command(stats)
 
-
-# create logger
+# Журнал команд: обработчики устанавливает cli_commands (configure_logging)
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-
-# create file handler which logs even debug messages
-fh = logging.FileHandler('bank.log', encoding="UTF-8")
-fh.setLevel(logging.DEBUG)
-
-# create console handler with a higher log level
-ch = logging.StreamHandler()
-ch.setLevel(logging.INFO)
-
-# create formatter and add it to the handlers
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-fh.setFormatter(formatter)
-ch.setFormatter(formatter)
-
-# add the handlers to the logger
-logger.addHandler(fh)
-logger.addHandler(ch)
 
 if __name__ == "__main__":
     cli_commands()
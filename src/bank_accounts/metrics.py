@@ -0,0 +1,299 @@
+# metrics.py
+
+"""
+Метрики приложения: счетчики и гистограммы задержек.
+Сбор включается явно (Metrics.enable); выключенный сбор стоит одной проверки флага на вызов.
+Модуль использует только стандартную библиотеку: его загружает и тонкий клиент.
+"""
+from __future__ import annotations
+
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+from storage import atomic_write
+
+# Границы интервалов гистограммы в микросекундах: 10 интервалов на порядок, от 1 мкс до 100 с.
+# Процентиль оценивается верхней границей интервала - с точностью около 26%
+HISTOGRAM_BOUNDS_US = [10 ** (idx / 10) for idx in range(81)]
+
+# Процентили в сводке
+SUMMARY_PERCENTILES = (50, 90, 99)
+
+# Версия формата файла метрик
+METRICS_VERSION = 1
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Histogram:
+    """
+    Гистограмма задержек с логарифмическими интервалами.
+    Гистограммы разных процессов складываются без потери точности.
+    """
+
+    def __init__(self) -> None:
+        self.__counts = [0] * (len(HISTOGRAM_BOUNDS_US) + 1)
+        self.__count = 0
+        self.__total = 0.0
+        self.__max = 0.0
+
+    @property
+    def count(self) -> int:
+        """ Количество замеров """
+        return self.__count
+
+    @property
+    def total(self) -> float:
+        """ Суммарное время, секунд """
+        return self.__total
+
+    @property
+    def max(self) -> float:
+        """ Наибольшее время, секунд """
+        return self.__max
+
+    def observe(self, seconds: float) -> None:
+        """
+        Добавить замер
+        """
+        self.__counts[bisect.bisect_left(HISTOGRAM_BOUNDS_US, seconds * 1e6)] += 1
+        self.__count += 1
+        self.__total += seconds
+        if seconds > self.__max:
+            self.__max = seconds
+
+    def percentile(self, percent: float) -> float:
+        """
+        Оценка процентиля, секунд: верхняя граница интервала, в который попадает замер
+        """
+        if self.__count == 0:
+            return 0.0
+        rank = max(1, round(self.__count * percent / 100))
+        seen = 0
+        for idx, count in enumerate(self.__counts):
+            seen += count
+            if seen >= rank:
+                if idx == len(HISTOGRAM_BOUNDS_US):
+                    return self.__max
+                return min(HISTOGRAM_BOUNDS_US[idx] / 1e6, self.__max)
+        return self.__max
+
+    def merge(self, other: Histogram) -> None:
+        """
+        Добавить замеры другой гистограммы
+        """
+        for idx, count in enumerate(other.__counts):
+            self.__counts[idx] += count
+        self.__count += other.__count
+        self.__total += other.__total
+        self.__max = max(self.__max, other.__max)
+
+    def dump(self) -> dict[str, Any]:
+        """
+        Гистограмма в виде словаря для сохранения в JSON. Хранятся только непустые интервалы.
+        """
+        return {
+            "count": self.__count,
+            "total": self.__total,
+            "max": self.__max,
+            "buckets": {str(idx): count for idx, count in enumerate(self.__counts) if count},
+        }
+
+    @staticmethod
+    def load(data: dict[str, Any]) -> Histogram:
+        """
+        Гистограмма из словаря, сохраненного методом dump
+        """
+        histogram = Histogram()
+        for idx, count in data["buckets"].items():
+            histogram.__counts[int(idx)] = count
+        histogram.__count = data["count"]
+        histogram.__total = data["total"]
+        histogram.__max = data["max"]
+        return histogram
+
+
+class Metrics:
+    """
+    Реестр метрик: счетчики и гистограммы задержек по именам.
+    Потокобезопасен.
+    """
+
+    def __init__(self) -> None:
+        self.__enabled = False
+        self.__counters: dict[str, int] = {}
+        self.__histograms: dict[str, Histogram] = {}
+        self.__lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """ Сбор метрик включен """
+        return self.__enabled
+
+    def enable(self) -> None:
+        """ Включить сбор метрик """
+        self.__enabled = True
+
+    def disable(self) -> None:
+        """ Выключить сбор метрик """
+        self.__enabled = False
+
+    def reset(self) -> None:
+        """ Удалить собранные метрики """
+        with self.__lock:
+            self.__counters = {}
+            self.__histograms = {}
+
+    def increment(self, name: str, value: int = 1) -> None:
+        """
+        Увеличить счетчик
+        """
+        if not self.__enabled:
+            return
+        with self.__lock:
+            self.__counters[name] = self.__counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float) -> None:
+        """
+        Добавить замер времени в гистограмму
+        """
+        if not self.__enabled:
+            return
+        with self.__lock:
+            histogram = self.__histograms.get(name)
+            if histogram is None:
+                histogram = self.__histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """
+        Замерить время выполнения блока
+        """
+        if not self.__enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def counter(self, name: str) -> int:
+        """ Значение счетчика """
+        return self.__counters.get(name, 0)
+
+    def histogram(self, name: str) -> Optional[Histogram]:
+        """ Гистограмма задержек, None - замеров не было """
+        return self.__histograms.get(name)
+
+    def summary(self) -> list[dict[str, Any]]:
+        """
+        Сводка: для каждой метрики - количество, среднее, процентили и максимум (для гистограмм) в миллисекундах
+        """
+        with self.__lock:
+            rows: list[dict[str, Any]] = [{"name": name, "count": value}
+                                          for name, value in self.__counters.items()]
+            for name, histogram in self.__histograms.items():
+                row: dict[str, Any] = {
+                    "name": name,
+                    "count": histogram.count,
+                    "mean_ms": histogram.total / histogram.count * 1000,
+                }
+                for percent in SUMMARY_PERCENTILES:
+                    row[f"p{percent}_ms"] = histogram.percentile(percent) * 1000
+                row["max_ms"] = histogram.max * 1000
+                rows.append(row)
+        return sorted(rows, key=lambda item: item["name"])
+
+    def merge(self, other: Metrics) -> None:
+        """
+        Добавить метрики другого реестра
+        """
+        with self.__lock:
+            for name, value in other.__counters.items():
+                self.__counters[name] = self.__counters.get(name, 0) + value
+            for name, histogram in other.__histograms.items():
+                if name not in self.__histograms:
+                    self.__histograms[name] = Histogram()
+                self.__histograms[name].merge(histogram)
+
+    def dump(self) -> dict[str, Any]:
+        """
+        Метрики в виде словаря для сохранения в JSON
+        """
+        with self.__lock:
+            return {
+                "version": METRICS_VERSION,
+                "counters": dict(self.__counters),
+                "histograms": {name: histogram.dump() for name, histogram in self.__histograms.items()},
+            }
+
+    def save(self, file_name: Path) -> None:
+        """
+        Добавить метрики к накопленным в файле (метрики нескольких запусков складываются).
+        """
+        accumulated = Metrics.load(file_name)
+        accumulated.merge(self)
+        with atomic_write(file_name) as f:
+            f.write(json.dumps(accumulated.dump(), ensure_ascii=False).encode("UTF-8"))
+
+    @staticmethod
+    def load(file_name: Path) -> Metrics:
+        """
+        Метрики из файла. Если файла нет или он другой версии - пустой реестр.
+        """
+        loaded = Metrics()
+        if not os.path.isfile(file_name):
+            return loaded
+        with open(file_name, encoding="UTF-8") as f:
+            data = json.load(f)
+        if data.get("version") != METRICS_VERSION:
+            return loaded
+        loaded.__counters = dict(data["counters"])
+        loaded.__histograms = {name: Histogram.load(histogram) for name, histogram in data["histograms"].items()}
+        return loaded
+
+
+def format_summary(summary: list[dict[str, Any]]) -> list[str]:
+    """
+    Сводка метрик в виде строк текста
+    """
+    percentiles = "".join(f"{'p' + str(percent):>10}" for percent in SUMMARY_PERCENTILES)
+    lines = [f"{'Метрика':<32}{'кол-во':>10}{'среднее':>10}{percentiles}{'макс':>10}  (мс)"]
+    for row in summary:
+        if "mean_ms" not in row:
+            lines.append(f"{row['name']:<32}{row['count']:>10}")
+            continue
+        values = "".join(f"{row[f'p{percent}_ms']:>10.3f}" for percent in SUMMARY_PERCENTILES)
+        lines.append(f"{row['name']:<32}{row['count']:>10}{row['mean_ms']:>10.3f}{values}{row['max_ms']:>10.3f}")
+    return lines
+
+
+# Метрики процесса
+metrics = Metrics()
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """
+    Декоратор: замерять время выполнения функции в гистограмму name, если сбор метрик включен
+    """
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metrics.observe(name, time.perf_counter() - start)
+        return wrapper  # type: ignore[return-value]
+    return decorator
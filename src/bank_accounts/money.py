@@ -0,0 +1,50 @@
+# money.py
+
+"""
+Денежные суммы в копейках.
+Балансы, лимиты и суммы транзакций хранятся целыми числами,
+чтобы переигровка длинной истории не накапливала ошибку округления.
+"""
+from __future__ import annotations
+
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN
+from typing import Union
+
+# Количество копеек в рубле
+MINOR_UNITS = 100
+
+_MINOR_QUANTUM = Decimal(1)
+
+
+def to_minor(value: Union[float, int, str]) -> int:
+    """
+    Сумма в копейках.
+    Строка разбирается как десятичное число без промежуточного float,
+    float - по своей десятичной записи (repr), поэтому 1.015 и "1.015" дают одну сумму.
+    """
+    if isinstance(value, int):
+        return value * MINOR_UNITS
+    text = value.strip() if isinstance(value, str) else repr(value)
+    try:
+        amount = Decimal(text)
+    except InvalidOperation:
+        raise ValueError(f"Некорректная сумма: {value}")
+    if not amount.is_finite():
+        raise ValueError(f"Некорректная сумма: {value}")
+    return int((amount * MINOR_UNITS).quantize(_MINOR_QUANTUM, rounding=ROUND_HALF_EVEN))
+
+
+def from_minor(minor: int) -> float:
+    """
+    Сумма в рублях из суммы в копейках
+    """
+    return minor / MINOR_UNITS
+
+
+def format_minor(minor: int) -> str:
+    """
+    Сумма в копейках в виде строки с двумя знаками после точки, например -12.05
+    """
+    sign = "-" if minor < 0 else ""
+    units, cents = divmod(abs(minor), MINOR_UNITS)
+    return f"{sign}{units}.{cents:02d}"
@@ -0,0 +1,99 @@
+# parallel_replay.py
+
+"""
+Параллельная переигровка истории транзакций по нескольким процессам.
+Баланс счета зависит только от транзакций этого счета, поэтому счета делятся
+на группы по номеру, и каждая группа переигрывается в отдельном процессе.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from accounts import AccountDict
+from transactions import Transaction, TXN_TYPE_DEPOSIT, STREAM_CHUNK_SIZE
+
+# Позиция номера счета в записи транзакции
+_ACCOUNT_START, _ACCOUNT_END = 8, 14
+
+# Результат обработки группы: балансы в копейках, количество записей,
+# первая ошибка (номер строки, сообщение)
+ShardResult = tuple[dict[str, int], int, Optional[tuple[int, str]]]
+
+
+def shard_of(account_num: str, shards: int) -> int:
+    """
+    Номер группы счета. Счета S и C с одинаковым номером попадают в одну группу.
+    """
+    try:
+        return int(account_num[1:]) % shards
+    except ValueError:
+        return 0
+
+
+def replay_shard(transactions_file: Path, offset: int, shard: int, shards: int,
+                 accounts: AccountDict) -> ShardResult:
+    """
+    Переиграть транзакции группы счетов начиная со смещения offset (в байтах).
+    accounts - счета группы с начальными балансами.
+    Записи чужих групп пропускаются без разбора.
+    Обработка останавливается на первой ошибке.
+    """
+    line_no = 0
+    count = 0
+    with open(transactions_file, "rb") as f:
+        f.seek(offset)
+        while True:
+            chunk = f.readlines(STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            for raw_line in chunk:
+                line_no += 1
+                record = raw_line.rstrip(b"\r\n")
+                if not record:
+                    continue
+                count += 1
+                if shard_of(record[_ACCOUNT_START:_ACCOUNT_END].decode("UTF-8", "replace"), shards) != shard:
+                    continue
+                try:
+                    txn = Transaction.load(record.decode("UTF-8"))
+                except ValueError as error:
+                    return {}, count, (line_no, f"Строка {line_no}: {error}")
+                try:
+                    account = accounts[txn.account]
+                    if txn.txn_type == TXN_TYPE_DEPOSIT:
+                        account.deposit_minor(txn.amount_minor)
+                    else:
+                        account.withdraw_minor(txn.amount_minor)
+                except ValueError as error:
+                    return {}, count, (line_no, str(error))
+
+    return {account_num: account.balance_minor for account_num, account in accounts.items()}, count, None
+
+
+def replay_parallel(transactions_file: Path, offset: int, accounts: AccountDict, workers: int) -> int:
+    """
+    Переиграть транзакции файла начиная со смещения offset в workers процессах
+    и записать итоговые балансы в accounts.
+    Ошибка возвращается та же, что и при последовательной переигровке:
+    по самой ранней некорректной строке файла.
+    Возвращает количество записей.
+    """
+    groups = [AccountDict() for _ in range(workers)]
+    for account_num, account in accounts.items():
+        groups[shard_of(account_num, workers)][account_num] = account
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(replay_shard, transactions_file, offset, shard, workers, group)
+                   for shard, group in enumerate(groups)]
+        results = [future.result() for future in futures]
+
+    errors = [error for _, _, error in results if error is not None]
+    if errors:
+        raise ValueError(min(errors)[1])
+
+    for balances, _, _ in results:
+        for account_num, balance in balances.items():
+            accounts[account_num].set_balance_minor(balance)
+    return results[0][1]
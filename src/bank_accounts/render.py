@@ -0,0 +1,117 @@
+# render.py
+
+"""
+Вывод больших списков (счетов, транзакций) по мере формирования строк:
+постранично таблицами rich, простым текстом или CSV для передачи другим программам.
+"""
+from __future__ import annotations
+
+import csv
+import itertools
+from typing import Callable, Iterable, Iterator, Optional, TextIO
+
+from rich.console import Console
+from rich.table import Table
+
+from metrics import timed
+
+# Формат вывода: таблица rich, простой текст (колонки через табуляцию), CSV
+FORMAT_TABLE = "table"
+FORMAT_PLAIN = "plain"
+FORMAT_CSV = "csv"
+OUTPUT_FORMATS = (FORMAT_TABLE, FORMAT_PLAIN, FORMAT_CSV)
+
+# Количество строк, которые простой и CSV вывод записывают за одну операцию
+WRITE_BATCH_ROWS = 1000
+
+# Строка таблицы
+Row = tuple[str, ...]
+
+
+def paginate(rows: Iterable[Row], offset: int = 0, limit: Optional[int] = None) -> Iterator[Row]:
+    """
+    Строки начиная с номера offset (с нуля), не более limit строк.
+    Строки до offset пропускаются без сохранения в памяти.
+    """
+    if offset < 0:
+        raise ValueError("Смещение не может быть отрицательным.")
+    if limit is not None and limit < 0:
+        raise ValueError("Количество строк не может быть отрицательным.")
+    return itertools.islice(rows, offset, None if limit is None else offset + limit)
+
+
+def render_table(console: Console, create_table: Callable[[], Table], rows: Iterable[Row],
+                 page_size: int = 0) -> int:
+    """
+    Вывести строки таблицами rich.
+    page_size - количество строк в одной таблице: каждая страница выводится,
+    как только набрана, и не задерживается в памяти. 0 - одна таблица со всеми строками.
+    Возвращает количество строк.
+    """
+    if page_size < 0:
+        raise ValueError("Размер страницы не может быть отрицательным.")
+    count = 0
+    table = create_table()
+    for row in rows:
+        table.add_row(*row)
+        count += 1
+        if page_size and count % page_size == 0:
+            console.print(table)
+            table = create_table()
+    if count == 0 or not page_size or count % page_size:
+        console.print(table)
+    return count
+
+
+def render_plain(out: TextIO, headers: list[str], rows: Iterable[Row]) -> int:
+    """
+    Вывести строки простым текстом: колонки через табуляцию, без оформления rich.
+    Возвращает количество строк.
+    """
+    out.write("\t".join(headers) + "\n")
+    count = 0
+    for batch in _batches(rows):
+        out.write("".join("\t".join(row) + "\n" for row in batch))
+        count += len(batch)
+    return count
+
+
+def render_csv(out: TextIO, headers: list[str], rows: Iterable[Row]) -> int:
+    """
+    Вывести строки в формате CSV.
+    Возвращает количество строк.
+    """
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(headers)
+    count = 0
+    for batch in _batches(rows):
+        writer.writerows(batch)
+        count += len(batch)
+    return count
+
+
+@timed("render")
+def render(output_format: str, console: Console, create_table: Callable[[], Table], rows: Iterable[Row],
+           page_size: int = 0) -> int:
+    """
+    Вывести строки в указанном формате.
+    Простой и CSV вывод пишутся в файл консоли (console.file) в обход rich.
+    Возвращает количество строк.
+    """
+    if output_format == FORMAT_TABLE:
+        return render_table(console, create_table, rows, page_size)
+    headers = [str(column.header) for column in create_table().columns]
+    if output_format == FORMAT_PLAIN:
+        return render_plain(console.file, headers, rows)
+    if output_format == FORMAT_CSV:
+        return render_csv(console.file, headers, rows)
+    raise ValueError(f"Неизвестный формат вывода: {output_format}")
+
+
+def _batches(rows: Iterable[Row]) -> Iterator[list[Row]]:
+    iterator = iter(rows)
+    while True:
+        batch = list(itertools.islice(iterator, WRITE_BATCH_ROWS))
+        if not batch:
+            return
+        yield batch
@@ -0,0 +1,213 @@
+# server.py
+
+"""
+Сервер системы управления банковскими счетами.
+Держит приложение (Application) в памяти и принимает запросы по Unix сокету
+или по TCP на локальном адресе. Протокол описан в модуле client.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import signal
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from accounts import Account, DEFAULT_MIN_LIMIT_MINOR, DEFAULT_MAX_LIMIT_MINOR
+from application import Application
+from client import DEFAULT_SOCKET_PATH, DEFAULT_HOST, DEFAULT_PORT
+from metrics import metrics
+from money import to_minor, from_minor, format_minor
+from transactions import Transaction, format_date
+
+# Наибольшая длина строки запроса в байтах
+MAX_REQUEST_SIZE = 64 * 1024
+
+
+def parse_amount(value: Any) -> float:
+    """
+    Сумма из запроса: число или строка с десятичной точкой
+    """
+    return from_minor(to_minor(str(value)))
+
+
+def account_to_dict(account: Account) -> dict[str, Any]:
+    """
+    Счет в виде словаря для ответа сервера.
+    Лимиты по умолчанию не передаются.
+    """
+    return {
+        "account": account.account_number,
+        "customer_name": account.customer_name,
+        "balance": format_minor(account.balance_minor),
+        "min_limit": (format_minor(account.min_limit_minor)
+                      if account.min_limit_minor != DEFAULT_MIN_LIMIT_MINOR else None),
+        "max_limit": (format_minor(account.max_limit_minor)
+                      if account.max_limit_minor != DEFAULT_MAX_LIMIT_MINOR else None),
+    }
+
+
+def transaction_to_dict(txn: Transaction) -> dict[str, Any]:
+    """
+    Транзакция в виде словаря для ответа сервера
+    """
+    return {
+        "date": format_date(txn.date),
+        "account": txn.account,
+        "type": txn.txn_type,
+        "amount": format_minor(txn.amount_minor),
+    }
+
+
+class BankServer:
+    """
+    Обработка запросов к приложению.
+    Операции приложения выполняются в пуле потоков, чтобы запись журнала на диск
+    не останавливала цикл событий; Application потокобезопасен.
+    """
+
+    def __init__(self, app: Application) -> None:
+        self.__app = app
+        self.__commands: dict[str, Callable[[dict[str, Any]], Any]] = {
+            "deposit": self._deposit,
+            "withdraw": self._withdraw,
+            "get-account": self._get_account,
+            "set-limits": self._set_limits,
+            "history": self._history,
+            "stats": lambda request: metrics.summary(),
+            "ping": lambda request: "pong",
+        }
+
+    def handle(self, request: Any) -> dict[str, Any]:
+        """
+        Выполнить запрос и сформировать ответ.
+        Любая ошибка возвращается в ответе: подключение не закрывается без ответа.
+        """
+        try:
+            command = self.__commands.get(request.get("command", ""))
+            if command is None:
+                return {"ok": False, "error": f"Неизвестная команда: {request.get('command')}"}
+            return {"ok": True, "result": command(request)}
+        except (KeyError, TypeError, AttributeError) as error:
+            return {"ok": False, "error": f"Некорректный запрос: {error}"}
+        except ValueError as error:
+            return {"ok": False, "error": str(error)}
+        except Exception as error:
+            return {"ok": False, "error": f"Ошибка сервера: {error}"}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Обслуживание одного подключения: запросы выполняются по очереди
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # строка длиннее MAX_REQUEST_SIZE
+                    response: dict[str, Any] = {"ok": False, "error": "Слишком длинный запрос."}
+                    writer.write(self._encode(response))
+                    break
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("ожидается объект JSON")
+                except ValueError as error:
+                    response = {"ok": False, "error": f"Некорректный запрос: {error}"}
+                else:
+                    response = await loop.run_in_executor(None, self.handle, request)
+                writer.write(self._encode(response))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start_unix(self, socket_path: Path = DEFAULT_SOCKET_PATH) -> asyncio.AbstractServer:
+        """
+        Запустить прием подключений по Unix сокету.
+        Если сокет уже принимает подключения (запущен другой сервер) - ValueError.
+        """
+        if os.path.exists(socket_path):
+            try:
+                _, writer = await asyncio.open_unix_connection(str(socket_path))
+            except OSError:
+                # сокет, оставшийся от предыдущего запуска
+                os.remove(socket_path)
+            else:
+                writer.close()
+                await writer.wait_closed()
+                raise ValueError(f"Сокет {socket_path} уже используется другим сервером.")
+        return await asyncio.start_unix_server(self.handle_connection, str(socket_path), limit=MAX_REQUEST_SIZE)
+
+    async def start_tcp(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+        """
+        Запустить прием подключений по TCP
+        """
+        return await asyncio.start_server(self.handle_connection, host, port, limit=MAX_REQUEST_SIZE)
+
+    @staticmethod
+    def _encode(response: dict[str, Any]) -> bytes:
+        return json.dumps(response, ensure_ascii=False).encode("UTF-8") + b"\n"
+
+    def _deposit(self, request: dict[str, Any]) -> dict[str, Any]:
+        self.__app.deposit(request["account"], parse_amount(request["amount"]))
+        return account_to_dict(self.__app.get_account(request["account"]))
+
+    def _withdraw(self, request: dict[str, Any]) -> dict[str, Any]:
+        self.__app.withdraw(request["account"], parse_amount(request["amount"]))
+        return account_to_dict(self.__app.get_account(request["account"]))
+
+    def _get_account(self, request: dict[str, Any]) -> dict[str, Any]:
+        return account_to_dict(self.__app.get_account(request["account"]))
+
+    def _set_limits(self, request: dict[str, Any]) -> dict[str, Any]:
+        account = self.__app.set_limits(request["account"],
+                                        parse_amount(request["min_limit"]), parse_amount(request["max_limit"]))
+        return account_to_dict(account)
+
+    def _history(self, request: dict[str, Any]) -> list[dict[str, Any]]:
+        account_num = request["account"]
+        self.__app.get_account(account_num)
+        return [transaction_to_dict(txn) for txn in self.__app.get_transactions(account_num)]
+
+
+def serve(app: Application, socket_path: Optional[Path] = None,
+          host: Optional[str] = None, port: int = DEFAULT_PORT) -> None:
+    """
+    Запустить сервер и обслуживать запросы до сигнала SIGINT (Ctrl+C) или SIGTERM.
+    Если задан host - сервер слушает TCP, иначе Unix сокет.
+    """
+    unix_path = socket_path if socket_path is not None else DEFAULT_SOCKET_PATH
+
+    async def run() -> None:
+        bank_server = BankServer(app)
+        if host is not None:
+            server = await bank_server.start_tcp(host, port)
+        else:
+            server = await bank_server.start_unix(unix_path)
+
+        try:
+            stopped = asyncio.Event()
+            loop = asyncio.get_running_loop()
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                loop.add_signal_handler(signum, stopped.set)
+            async with server:
+                await stopped.wait()
+        finally:
+            # сокет удаляется, только если его создал этот сервер
+            if host is None and os.path.exists(unix_path):
+                os.remove(unix_path)
+
+    # балансы рассчитываются до приема первого подключения
+    app.preload()
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        app.close()
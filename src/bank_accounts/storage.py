@@ -0,0 +1,189 @@
+# storage.py
+
+"""
+Надежная запись файлов данных:
+атомарная замена файла целиком и журнал предзаписи для изменений на месте.
+"""
+from __future__ import annotations
+
+import os
+import struct
+import tempfile
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator
+
+# Заголовок журнала предзаписи: сигнатура и версия формата
+WAL_MAGIC = b"BWAL"
+WAL_VERSION = 1
+_WAL_HEADER = struct.Struct("<4sH")
+
+# Изменение: смещение в файле данных и длина записываемых байт
+_WAL_ENTRY = struct.Struct("<QI")
+
+# Признак завершенного журнала: сигнатура и CRC32 всего, что записано до него
+WAL_COMMIT = b"COMT"
+_WAL_TRAILER = struct.Struct("<4sI")
+
+# Изменение файла: смещение и новые байты
+Change = tuple[int, bytes]
+
+# Размер порции (в байтах) при подсчете контрольной суммы файла
+CRC_CHUNK_SIZE = 1024 * 1024
+
+
+@contextmanager
+def atomic_write(file_name: Path) -> Iterator[BinaryIO]:
+    """
+    Запись файла целиком через временный файл.
+    Данные синхронизируются с диском, после чего временный файл заменяет исходный.
+    При сбое во время записи на диске остается прежняя версия файла.
+    Имя временного файла уникально: одновременные записи одного файла не портят друг друга,
+    файл заменяет последняя завершенная запись.
+    """
+    directory, name = os.path.split(os.path.abspath(file_name))
+    fd, tmp_file_name = tempfile.mkstemp(prefix=f"{name}.", suffix=".tmp", dir=directory)
+    try:
+        with open(fd, "wb") as f:
+            if os.path.exists(file_name):
+                # mkstemp создает файл только с правами владельца - сохраняем права прежнего файла
+                os.chmod(tmp_file_name, os.stat(file_name).st_mode & 0o7777)
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file_name, file_name)
+    except BaseException:
+        if os.path.exists(tmp_file_name):
+            os.remove(tmp_file_name)
+        raise
+    fsync_directory(file_name)
+
+
+def fsync_directory(file_name: Path) -> None:
+    """
+    Синхронизировать с диском каталог файла, чтобы переименование или удаление файла пережило сбой
+    """
+    if not hasattr(os, "O_DIRECTORY"):
+        # Windows не поддерживает синхронизацию каталогов
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(file_name)), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def file_crc32(file_name: Path, end: int, start: int = 0, crc: int = 0) -> int:
+    """
+    CRC32 байт файла до смещения end.
+    start и crc - смещение и CRC32 уже подсчитанного начала файла: подсчет продолжается с start
+    без повторного чтения начала.
+    """
+    if start >= end:
+        return crc
+    with open(file_name, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = f.read(min(CRC_CHUNK_SIZE, remaining))
+            if not chunk:
+                raise ValueError(f"Файл короче ожидаемого: {file_name}")
+            crc = zlib.crc32(chunk, crc)
+            remaining -= len(chunk)
+    return crc
+
+
+class WriteAheadLog:
+    """
+    Журнал предзаписи для изменения файла данных на месте.
+    Изменения сначала записываются и синхронизируются в файле <файл данных>.wal,
+    затем применяются к файлу данных, после чего журнал удаляется.
+    Если сбой произошел во время применения, при восстановлении (recover)
+    завершенный журнал применяется повторно, незавершенный - отбрасывается.
+    """
+
+    def __init__(self, data_file: Path) -> None:
+        self.__data_file = Path(data_file)
+        self.__wal_file = Path(f"{data_file}.wal")
+
+    @property
+    def wal_file(self) -> Path:
+        """ Файл журнала предзаписи """
+        return self.__wal_file
+
+    def write(self, changes: Iterable[Change]) -> None:
+        """
+        Записать изменения в файл данных через журнал предзаписи
+        """
+        changes = list(changes)
+        if len(changes) == 0:
+            return
+        self._log(changes)
+        self._apply(changes)
+        self._clear()
+
+    def recover(self) -> int:
+        """
+        Применить завершенный журнал, оставшийся после сбоя.
+        Возвращает количество примененных изменений.
+        """
+        if not os.path.isfile(self.__wal_file):
+            return 0
+        changes = self._read()
+        if changes:
+            self._apply(changes)
+        self._clear()
+        return len(changes)
+
+    def _log(self, changes: list[Change]) -> None:
+        parts = [_WAL_HEADER.pack(WAL_MAGIC, WAL_VERSION)]
+        for offset, data in changes:
+            parts.append(_WAL_ENTRY.pack(offset, len(data)))
+            parts.append(data)
+        body = b"".join(parts)
+        with open(self.__wal_file, "wb") as f:
+            f.write(body)
+            f.write(_WAL_TRAILER.pack(WAL_COMMIT, zlib.crc32(body)))
+            f.flush()
+            os.fsync(f.fileno())
+        fsync_directory(self.__wal_file)
+
+    def _read(self) -> list[Change]:
+        """
+        Изменения из завершенного журнала.
+        Для незавершенного или поврежденного журнала - пустой список.
+        """
+        with open(self.__wal_file, "rb") as f:
+            data = f.read()
+
+        if len(data) < _WAL_HEADER.size + _WAL_TRAILER.size:
+            return []
+        body, trailer = data[:-_WAL_TRAILER.size], data[-_WAL_TRAILER.size:]
+        commit, crc = _WAL_TRAILER.unpack(trailer)
+        if commit != WAL_COMMIT or crc != zlib.crc32(body):
+            return []
+        magic, version = _WAL_HEADER.unpack_from(body, 0)
+        if magic != WAL_MAGIC or version != WAL_VERSION:
+            return []
+
+        changes: list[Change] = []
+        pos = _WAL_HEADER.size
+        while pos < len(body):
+            offset, length = _WAL_ENTRY.unpack_from(body, pos)
+            pos += _WAL_ENTRY.size
+            changes.append((offset, body[pos:pos + length]))
+            pos += length
+        return changes
+
+    def _apply(self, changes: list[Change]) -> None:
+        with open(self.__data_file, "r+b") as f:
+            for offset, data in changes:
+                f.seek(offset)
+                f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _clear(self) -> None:
+        os.remove(self.__wal_file)
+        fsync_directory(self.__wal_file)
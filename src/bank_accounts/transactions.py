@@ -5,93 +5,420 @@
 """
 
 from __future__ import annotations
+import bisect
 import datetime
+import functools
+import sys
+import zlib
 from pathlib import Path
+from typing import Iterable, Iterator, Optional
 
 from rich.table import Table
-from accounts import ACC_TYPE_SAVING, ACC_TYPE_CURRENT
+from accounts import validate_account_number, validate_account_numbers
+from money import to_minor, from_minor, format_minor
+from storage import atomic_write
 
 # Формат даты, используемый для сохранения и загрузки транзакций
 # Пример 20120713
 DATE_FORMAT = "%Y%m%d"
 
+# Размер кэшей разбора и форматирования дат.
+# Различных дат в истории - тысячи, а транзакций - миллионы
+DATE_CACHE_SIZE = 65536
+
 # Допустимые типы транзакций
 TXN_TYPE_DEPOSIT = "D"
 TXN_TYPE_WITHDRAW = "W"
 
+# Наименьшая длина записи, которую пишет Transaction.dump:
+# дата (8), счет (6), тип транзакции (1) и сумма, выровненная по правому краю (15)
+TXN_RECORD_WIDTH = 30
+
+# Размер порции (в байтах) при потоковом чтении файла транзакций
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Сколько байт читать с конца при поиске последней записи перед смещением
+_LAST_RECORD_LOOKBEHIND = 256
+
+# Допустимые типы транзакций для пакетной проверки
+_TXN_TYPES = frozenset((TXN_TYPE_DEPOSIT, TXN_TYPE_WITHDRAW))
+
+
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date(text: str) -> datetime.date:
+    """
+    Дата из строки в формате файла транзакций (DATE_FORMAT).
+    Результат разбора кэшируется: strptime выполняется один раз для каждой различной даты.
+    """
+    return datetime.datetime.strptime(text, DATE_FORMAT).date()
+
+
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def format_date(date: datetime.date) -> str:
+    """
+    Дата в формате файла транзакций (DATE_FORMAT), с кэшем по дате
+    """
+    return date.strftime(DATE_FORMAT)
+
+
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def _format_display_date(date: datetime.date) -> str:
+    return date.isoformat()
+
+
+class DateIndex:
+    """
+    Позиции транзакций с номерами дней (date.toordinal()) для поиска по диапазону дат бинарным поиском.
+    Позиции добавляются в порядке списка транзакций. Пока дни не убывают (файл обычно упорядочен по датам),
+    поиск идет прямо по ним; иначе при первом поиске строится и запоминается копия, упорядоченная по дням.
+    """
+
+    __slots__ = ("days", "positions", "__ordered", "__sorted_copy")
+
+    def __init__(self) -> None:
+        self.days: list[int] = []
+        self.positions: list[int] = []
+        self.__ordered = True
+        self.__sorted_copy: Optional[tuple[list[int], list[int]]] = None
+
+    def add(self, day: int, pos: int) -> None:
+        """
+        Добавить позицию транзакции
+        """
+        if self.days and day < self.days[-1]:
+            self.__ordered = False
+        self.days.append(day)
+        self.positions.append(pos)
+        self.__sorted_copy = None
+
+    def between(self, start_day: Optional[int], end_day: Optional[int]) -> list[int]:
+        """
+        Позиции транзакций с номером дня от start_day до end_day включительно, в порядке списка.
+        None - граница не задана.
+        """
+        days, positions = self._sorted()
+        lo = 0 if start_day is None else bisect.bisect_left(days, start_day)
+        hi = len(days) if end_day is None else bisect.bisect_right(days, end_day)
+        found = positions[lo:hi]
+        if not self.__ordered:
+            found.sort()
+        return found
+
+    def _sorted(self) -> tuple[list[int], list[int]]:
+        if self.__ordered:
+            return self.days, self.positions
+        if self.__sorted_copy is None:
+            pairs = sorted(zip(self.days, self.positions))
+            self.__sorted_copy = [day for day, _ in pairs], [pos for _, pos in pairs]
+        return self.__sorted_copy
+
 
 class TransactionList(list["Transaction"]):
     """
-    Реестр транзакций в виде списка
+    Реестр транзакций в виде списка.
+    Поддерживает индекс: номер счета -> позиции транзакций в списке,
+    диапазон дат транзакций по каждому счету
+    и индекс дат (общий и по каждому счету) для выборки транзакций за период.
+    Индекс обновляется при добавлении в конец списка
+    и перестраивается при любых других изменениях.
+    Индекс дат строится при первой выборке за период, чтобы не замедлять загрузку истории.
     """
 
+    def __init__(self, *args) -> None:
+        super().__init__(*args)
+        self.__index: dict[str, list[int]] = {}
+        self.__date_ranges: dict[str, tuple[datetime.date, datetime.date]] = {}
+        # индекс дат: None - по всем счетам, иначе по номеру счета
+        self.__date_index: Optional[dict[Optional[str], DateIndex]] = None
+        self._rebuild_index()
+
+    def append(self, txn: Transaction) -> None:
+        super().append(txn)
+        self._index_transaction(len(self) - 1, txn)
+
+    def extend(self, items) -> None:
+        start = len(self)
+        super().extend(items)
+        for pos in range(start, len(self)):
+            self._index_transaction(pos, self[pos])
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def insert(self, idx, txn) -> None:
+        super().insert(idx, txn)
+        self._rebuild_index()
+
+    def __setitem__(self, key, value) -> None:
+        super().__setitem__(key, value)
+        self._rebuild_index()
+
+    def __delitem__(self, key) -> None:
+        super().__delitem__(key)
+        self._rebuild_index()
+
+    def pop(self, idx=-1) -> Transaction:
+        txn = super().pop(idx)
+        self._rebuild_index()
+        return txn
+
+    def remove(self, txn) -> None:
+        super().remove(txn)
+        self._rebuild_index()
+
+    def clear(self) -> None:
+        super().clear()
+        self._rebuild_index()
+
+    def sort(self, *args, **kwargs) -> None:
+        super().sort(*args, **kwargs)
+        self._rebuild_index()
+
+    def reverse(self) -> None:
+        super().reverse()
+        self._rebuild_index()
+
     def search(self, account_num: str) -> list["Transaction"]:
         """
         Поиск транзакций по номеру счета
         """
-        matching_items: list["Transaction"] = []
-        for txn in self:
-            if account_num == txn.account:
-                matching_items.append(txn)
-        return matching_items
+        return [self[pos] for pos in self.__index.get(account_num, [])]
+
+    def positions(self, account_num: str) -> list[int]:
+        """
+        Позиции транзакций по номеру счета в списке
+        """
+        return list(self.__index.get(account_num, []))
+
+    def between(self, start: Optional[datetime.date], end: Optional[datetime.date],
+                account: Optional[str] = None) -> list["Transaction"]:
+        """
+        Транзакции с датой от start до end включительно (по счету account, если он указан).
+        None - граница периода не задана. Поиск по индексу дат, без перебора всего списка.
+        """
+        if self.__date_index is None:
+            self._build_date_index()
+        date_index = self.__date_index.get(account)
+        if date_index is None:
+            return []
+        start_day = None if start is None else start.toordinal()
+        end_day = None if end is None else end.toordinal()
+        return [self[pos] for pos in date_index.between(start_day, end_day)]
+
+    def date_range(self, account_num: str) -> Optional[tuple[datetime.date, datetime.date]]:
+        """
+        Даты первой и последней транзакции по счету.
+        None, если транзакций по счету нет.
+        """
+        return self.__date_ranges.get(account_num)
+
+    def _index_transaction(self, pos: int, txn: Transaction) -> None:
+        self.__index.setdefault(txn.account, []).append(pos)
+        if self.__date_index is not None:
+            self._index_date(pos, txn)
+        date_range = self.__date_ranges.get(txn.account)
+        if date_range is None:
+            self.__date_ranges[txn.account] = (txn.date, txn.date)
+        elif txn.date < date_range[0] or txn.date > date_range[1]:
+            self.__date_ranges[txn.account] = (min(date_range[0], txn.date), max(date_range[1], txn.date))
+
+    def _index_date(self, pos: int, txn: Transaction) -> None:
+        day = txn.date.toordinal()
+        self.__date_index[None].add(day, pos)
+        account_index = self.__date_index.get(txn.account)
+        if account_index is None:
+            account_index = self.__date_index[txn.account] = DateIndex()
+        account_index.add(day, pos)
+
+    def _build_date_index(self) -> None:
+        self.__date_index = {None: DateIndex()}
+        for pos, txn in enumerate(self):
+            self._index_date(pos, txn)
+
+    def _rebuild_index(self) -> None:
+        self.__index = {}
+        self.__date_index = None
+        self.__date_ranges = {}
+        for pos, txn in enumerate(self):
+            self._index_transaction(pos, txn)
 
     def save(self, file_name: Path) -> None:
         """
         Сохранение списка транзакций в указанный файл.
-        Если файл уже существует, он будет перезаписан.
+        Если файл уже существует, он будет заменен целиком (через временный файл).
         """
-        with open(file_name, "w", encoding="UTF-8") as f:
+        with atomic_write(file_name) as f:
             for txn in self:
-                f.write(f"{txn.dump()}\n")
+                f.write(f"{txn.dump()}\n".encode("UTF-8"))
 
     @staticmethod
-    def load(file_name: Path) -> TransactionList:
+    def load(file_name: Path, offset: int = 0, trusted_prefix: Optional[tuple[int, int]] = None) -> TransactionList:
         """
         Загрузка списка транзакций из файла.
+        offset - смещение в байтах, с которого нужно начать чтение.
+        trusted_prefix - размер (в байтах) и CRC32 начала файла, уже проверенного приложением
+        (контрольная точка): если начало файла не изменилось, его записи не проверяются повторно.
         Возвращает новый реестр транзакций.
         """
-        items = TransactionList()
-        with open(file_name, "r", encoding="UTF-8") as f:
-            txn_lines = f.read().splitlines()
-            for txn_line in txn_lines:
-                txn = Transaction.load(txn_line)
-                items.append(txn)
+        with open(file_name, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+
+        trusted_size = 0
+        if trusted_prefix is not None and offset == 0:
+            size, crc = trusted_prefix
+            if 0 < size <= len(data) and data[size - 1:size] == b"\n" and zlib.crc32(memoryview(data)[:size]) == crc:
+                trusted_size = size
+
+        view = memoryview(data)
+        trusted_lines = str(view[:trusted_size], "UTF-8").splitlines()
+        items = TransactionList(_load_batch(trusted_lines, trusted=True))
+        items.extend(_load_batch(str(view[trusted_size:], "UTF-8").splitlines(), len(trusted_lines) + 1))
         return items
 
+    @staticmethod
+    def iter_file(file_name: Path, offset: int = 0, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Transaction]:
+        """
+        Потоковое чтение транзакций из файла начиная со смещения offset (в байтах).
+        Файл читается порциями примерно по chunk_size байт,
+        в памяти одновременно находится только одна порция строк.
+        """
+        line_no = 1
+        with open(file_name, "rb") as f:
+            f.seek(offset)
+            while True:
+                chunk = f.readlines(chunk_size)
+                if not chunk:
+                    break
+                yield from _load_batch([raw_line.decode("UTF-8") for raw_line in chunk], line_no)
+                line_no += len(chunk)
+
+    @staticmethod
+    def load_lines(txn_lines: Iterable[str]) -> TransactionList:
+        """
+        Загрузка списка транзакций из строк в формате файла транзакций.
+        Пустые строки пропускаются.
+        Возвращает новый реестр транзакций.
+        """
+        return TransactionList(_load_batch(list(txn_lines)))
+
     def to_table_view(self, account_num: str) -> Table:
         """
         Список всех транзакций в виде таблицы
         """
+        if account_num is None:
+            transactions = self
+        else:
+            transactions = self.search(account_num)
+
+        table = self.create_table()
+        for row in self.table_rows(transactions):
+            table.add_row(*row)
+        return table
 
+    @staticmethod
+    def create_table() -> Table:
+        """
+        Пустая таблица транзакций с заголовками колонок
+        """
         table = Table(show_header=True, header_style="bold green")
         table.add_column("Дата", style="dim", width=10)
         table.add_column("Счет #", style="dim", width=6)
         table.add_column("Депозит", min_width=15, justify="right")
         table.add_column("Списание", min_width=15, justify="right")
+        return table
 
-        if account_num is None:
-            transactions = self
-        else:
-            transactions = self.search(account_num)
-
+    @staticmethod
+    def table_rows(transactions: Iterable[Transaction]) -> Iterator[tuple[str, ...]]:
+        """
+        Строки таблицы транзакций. Формируются по одной, по мере чтения транзакций.
+        """
         for txn in transactions:
 
-            date = txn.date.strftime("%Y-%m-%d")
+            date = _format_display_date(txn.date)
             acc_num = txn.account
 
             if txn.txn_type == TXN_TYPE_DEPOSIT:
-                depo = f"{txn.amount:.2f}"
+                depo = format_minor(txn.amount_minor)
             else:
                 depo = ""
 
             if txn.txn_type == TXN_TYPE_WITHDRAW:
-                withdraw = f"{txn.amount:.2f}"
+                withdraw = format_minor(txn.amount_minor)
             else:
                 withdraw = ""
 
-            table.add_row(date, acc_num, depo, withdraw)
+            yield date, acc_num, depo, withdraw
 
-        return table
+
+def read_last_record(file_name: Path, offset: int) -> str:
+    """
+    Прочитать последнюю запись файла транзакций, заканчивающуюся на смещении offset
+    """
+    if offset == 0:
+        return ""
+    start = max(0, offset - _LAST_RECORD_LOOKBEHIND)
+    with open(file_name, "rb") as f:
+        f.seek(start)
+        data = f.read(offset - start)
+    return data.rstrip(b"\r\n").rsplit(b"\n", 1)[-1].decode("UTF-8").rstrip("\r")
+
+
+def is_record_boundary(file_name: Path, offset: int) -> bool:
+    """
+    Проверка, что смещение offset в файле транзакций указывает на границу записей
+    """
+    if offset == 0:
+        return True
+    with open(file_name, "rb") as f:
+        f.seek(offset - 1)
+        boundary = f.read(2)
+    return boundary[:1] == b"\n" or boundary[1:2] in (b"", b"\r", b"\n")
+
+
+def _load_batch(txn_lines: list[str], first_line_no: int = 1, trusted: bool = False) -> list[Transaction]:
+    """
+    Транзакции из строк файла транзакций (пустые строки пропускаются).
+    Строки разбираются без проверки по одной, затем проверяются пакетом: различные номера счетов,
+    типы транзакций и знак сумм. trusted - строки из проверенного файла, пакетная проверка не нужна.
+    Если пакет некорректен, строки проверяются по одной, чтобы сообщить номер первой ошибочной строки.
+    """
+    items: list[Transaction] = []
+    accounts: set[str] = set()
+    txn_types: set[str] = set()
+    positive = True
+    parse = Transaction._parse
+    create = Transaction._create_unchecked
+    try:
+        for txn_line in txn_lines:
+            txn_line = txn_line.rstrip("\r\n")
+            if not txn_line:
+                continue
+            date, account, txn_type, amount = parse(txn_line)
+            accounts.add(account)
+            txn_types.add(txn_type)
+            if amount <= 0:
+                positive = False
+            items.append(create(date, account, txn_type, amount))
+        if trusted:
+            return items
+        if positive and txn_types <= _TXN_TYPES:
+            validate_account_numbers(accounts)
+            return items
+    except ValueError:
+        pass
+
+    items = []
+    for line_no, txn_line in enumerate(txn_lines, first_line_no):
+        txn_line = txn_line.rstrip("\r\n")
+        if not txn_line:
+            continue
+        try:
+            items.append(Transaction.load(txn_line))
+        except ValueError as error:
+            raise ValueError(f"Строка {line_no}: {error}")
+    return items
 
 
 class Transaction:
@@ -99,16 +426,31 @@ class Transaction:
     Транзакция по счету
     """
 
+    # без __dict__ у каждого экземпляра: в истории могут быть десятки миллионов транзакций
+    __slots__ = ("__date", "__account", "__txn_type", "__amount")
+
     def __init__(self, date: datetime.datetime, account: str, txn_type: str, amount: float) -> None:
+        self._init(date, account, txn_type, to_minor(amount))
+
+    def _init(self, date: datetime.datetime, account: str, txn_type: str, amount_minor: int) -> None:
 
         self._validate_account(account)
         self._validate_txn_type(txn_type)
-        self._validate_amount(amount)
+        self._validate_amount(amount_minor)
 
         self.__date = date.date()
         self.__account = account
         self.__txn_type = txn_type
-        self.__amount = amount
+        self.__amount = amount_minor
+
+    @staticmethod
+    def from_minor_units(date: datetime.datetime, account: str, txn_type: str, amount_minor: int) -> Transaction:
+        """
+        Создание транзакции с суммой в копейках
+        """
+        txn = Transaction.__new__(Transaction)
+        txn._init(date, account, txn_type, amount_minor)
+        return txn
 
     @property
     def date(self) -> datetime.date:
@@ -142,24 +484,51 @@ class Transaction:
         """
         Сумма транзакции
         """
+        return from_minor(self.__amount)
+
+    @property
+    def amount_minor(self) -> int:
+        """
+        Сумма транзакции в копейках
+        """
         return self.__amount
 
     def dump(self) -> str:
         """
         Выгрузка транзакции в формате, пригодном для сохранения в файл
         """
-        return f"{self.__date.strftime(DATE_FORMAT)}{self.__account}{self.__txn_type}{self.__amount:15}"
+        return f"{format_date(self.__date)}{self.__account}{self.__txn_type}{format_minor(self.__amount):>15}"
 
     @staticmethod
     def load(line: str) -> Transaction:
         """
         Загрузка/создание транзакции из строки, прочитанной из файла
         """
-        date = datetime.datetime.strptime(line[:8], DATE_FORMAT)
-        account = line[8:14]
-        txn_type = line[14:15]
-        amount = float(line[15:])
-        return Transaction(date, account, txn_type, amount)
+        date, account, txn_type, amount = Transaction._parse(line)
+        Transaction._validate_account(account)
+        Transaction._validate_txn_type(txn_type)
+        Transaction._validate_amount(amount)
+        return Transaction._create_unchecked(date, account, txn_type, amount)
+
+    @staticmethod
+    def _parse(line: str) -> tuple[datetime.date, str, str, int]:
+        """
+        Поля записи файла транзакций без проверки бизнес-правил: дата, счет, тип транзакции, сумма в копейках
+        """
+        # номер счета повторяется во многих транзакциях - храним одну строку на счет
+        return parse_date(line[:8]), sys.intern(line[8:14]), line[14:15], to_minor(line[15:])
+
+    @staticmethod
+    def _create_unchecked(date: datetime.date, account: str, txn_type: str, amount_minor: int) -> Transaction:
+        """
+        Создание транзакции из уже проверенных полей
+        """
+        txn = Transaction.__new__(Transaction)
+        txn.__date = date
+        txn.__account = account
+        txn.__txn_type = txn_type
+        txn.__amount = amount_minor
+        return txn
 
     # Валидация бизнес-правил и инварианты
 
@@ -171,16 +540,9 @@ class Transaction:
 
     @staticmethod
     def _validate_account(account: str) -> None:
-        # TODO: Move it to account class ?
-        if len(account) != 6:
-            raise ValueError("Номер счета должен содержать 6 символов.")
-        for idx, sym in enumerate(account):
-            if idx == 0 and sym != ACC_TYPE_SAVING and sym != ACC_TYPE_CURRENT:
-                raise ValueError("Первый символ счета должен содержать буквы S или C")
-            if idx > 0 and not sym.isdigit():
-                raise ValueError("Номер счета должен содержать только цифры.")
+        validate_account_number(account)
 
     @staticmethod
-    def _validate_amount(amount: float):
+    def _validate_amount(amount: int):
         if amount <= 0:
             raise ValueError("Сумма должна быть положительной.")
@@ -0,0 +1,77 @@
+# account_index_tests.py
+
+"""
+Тест кейсы для индекса файла транзакций по номерам счетов
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import TestCase
+
+from bank_accounts.account_index import AccountIndex
+
+
+class TestAccountIndex(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.transactions_file = Path(self.tmp_dir.name) / "transactions_tst.dat"
+        self.index_file = Path(self.tmp_dir.name) / "transactions_tst.idx"
+        self.transactions_file.write_text(
+            "20120713C00005W 200.00\n20120713S00002W 150.79\n20120714C00005D 10.00", encoding="UTF-8")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_build_index(self):
+        """
+        Построить индекс и прочитать историю одного счета
+        """
+        index = AccountIndex.build(self.transactions_file)
+
+        self.assertEqual(index.offsets("C00005"), [0, 46])
+        self.assertEqual(index.offsets("S00002"), [23])
+
+        found = index.read_transactions(self.transactions_file, "C00005")
+        self.assertEqual(len(found), 2)
+        self.assertEqual(found[1].amount, 10)
+
+    def test_update_index(self):
+        """
+        Дочитать в индекс записи, добавленные в конец файла
+        """
+        index = AccountIndex.build(self.transactions_file)
+        with open(self.transactions_file, "a", encoding="UTF-8") as f:
+            f.write("\n20120715S00002D 760.00\n")
+
+        self.assertTrue(index.matches(self.transactions_file))
+        self.assertEqual(index.update(self.transactions_file), 1)
+        self.assertEqual(index.offsets("S00002"), [23, 68])
+        self.assertEqual(index.read_transactions(self.transactions_file, "S00002")[1].amount, 760)
+
+    def test_save_load_index(self):
+        """
+        Сохранить и загрузить индекс
+        """
+        AccountIndex.build(self.transactions_file).save(self.index_file)
+
+        loaded = AccountIndex.load(self.index_file)
+        self.assertEqual(loaded.size, 67)
+        self.assertEqual(loaded.offsets("C00005"), [0, 46])
+        self.assertTrue(loaded.matches(self.transactions_file))
+
+    def test_not_matches_rewritten_file(self):
+        """
+        Индекс недействителен после перезаписи файла
+        """
+        index = AccountIndex.build(self.transactions_file)
+        self.transactions_file.write_text(
+            "20120713C00005W          200.0\n20120713S00002W         150.79\n20120714C00005D           10.0\n",
+            encoding="UTF-8")
+
+        self.assertFalse(index.matches(self.transactions_file))
+
+
+# Executing the tests in the above test case class
+if __name__ == "__main__":
+    unittest.main()
@@ -4,12 +4,14 @@
 Тест кейсы для объектов банковских счетов и реестра счетов
 """
 
+import pickle
 import unittest
 import os
 from pathlib import Path
-from unittest import expectedFailure, TestCase
+from unittest import expectedFailure, TestCase, mock
 
-from bank_accounts.accounts import CurrentAccount, SavingAccount, AccountDict, DEFAULT_MIN_LIMIT, DEFAULT_MAX_LIMIT
+from bank_accounts.accounts import CurrentAccount, SavingAccount, AccountDict, DEFAULT_MIN_LIMIT, DEFAULT_MAX_LIMIT, \
+    validate_account_number, validate_account_numbers
 
 
 class TestAccount(TestCase):
@@ -66,12 +68,33 @@ class TestAccount(TestCase):
         """
         self.assertRaises(ValueError, CurrentAccount, "C0045", "Владимир Петров", 213.98)
 
+    def test_validate_account_number(self):
+        """
+        Проверка номера счета: сообщение об ошибке указывает причину
+        """
+        validate_account_number("S00001")
+        validate_account_number("C99999")
+        self.assertRaisesRegex(ValueError, "6 символов", validate_account_number, "S0001")
+        self.assertRaisesRegex(ValueError, "S или C", validate_account_number, "X00001")
+        self.assertRaisesRegex(ValueError, "только цифры", validate_account_number, "S0000A")
+        self.assertRaisesRegex(ValueError, "только цифры", validate_account_number, "S0000\u0663")
+
+        validate_account_numbers(["S00001", "C00002", "S00001"])
+        self.assertRaisesRegex(ValueError, "S или C", validate_account_numbers, ["S00001", "W00002"])
+
     def test_invalid_customer_name(self):
         """
         Некорректное имя клиента
         """
         self.assertRaises(ValueError, CurrentAccount, "С12345", "    ", 213.98)
 
+    def test_account_without_dict(self):
+        """
+        Счета хранятся в слотах, без __dict__ у экземпляра
+        """
+        self.assertFalse(hasattr(SavingAccount("S12345", "Иван Стулов", 1), "__dict__"))
+        self.assertFalse(hasattr(CurrentAccount("C12345", "Иван Стулов", 1), "__dict__"))
+
     def test_set_balance(self):
         """
         Корректировка баланса
@@ -103,6 +126,38 @@ class TestAccount(TestCase):
         acc.withdraw(50)
         self.assertEqual(acc.balance, 130 - 50)
 
+    def test_no_rounding_error(self):
+        """
+        Многократные операции не накапливают ошибку округления
+        """
+        acc = CurrentAccount("C12345", "Иван Стулов", 0)
+        for _ in range(1000):
+            acc.deposit(0.1)
+        self.assertEqual(acc.balance_minor, 10000)
+        self.assertEqual(acc.balance, 100)
+
+        acc.set_limits(100, 200)
+        acc.withdraw(0)
+        self.assertRaises(ValueError, acc.withdraw, 0.01)
+
+    def test_load_minor_units(self):
+        """
+        Баланс и лимиты загружаются в копейках, без промежуточного float
+        """
+        line = SavingAccount.from_minor_units("S12345", "Галина Табуреткина", 12356).dump()
+        self.assertEqual(line[35:50].strip(), "123.56")
+
+        acc = CurrentAccount("C12345", "Андрей Первый", 0)
+        acc.set_limits_minor(2045, 200017)
+        line = CurrentAccount.from_minor_units("C12345", "Андрей Первый", 12356).dump()[:50] + acc.dump()[50:]
+        with mock.patch("bank_accounts.accounts.from_minor", side_effect=AssertionError("float")):
+            loaded = CurrentAccount.load(line)
+            self.assertIsInstance(loaded, CurrentAccount)
+            self.assertEqual(loaded.balance_minor, 12356)
+            self.assertEqual(loaded.min_limit_minor, 2045)
+            self.assertEqual(loaded.max_limit_minor, 200017)
+        self.assertRaises(ValueError, CurrentAccount.from_minor_units, "C12345", "Андрей Первый", 200000000)
+
     def test_invalid_withdraw(self):
         """
         Превышение суммы снятия
@@ -224,6 +279,89 @@ class TestAccountList(TestCase):
         c_num = self.accounts.get_next_free_account_number("C")
         self.assertEqual(c_num, "C00342")
 
+    def test_reserve_account_numbers(self):
+        """
+        Номера выделяются блоком и не выдаются повторно
+        """
+        self.accounts.append(SavingAccount("S00007", "Иван Петров", 123.45))
+
+        self.assertEqual(self.accounts.reserve_account_numbers("S", 3), ["S00008", "S00009", "S00010"])
+        self.assertEqual(self.accounts.get_next_free_account_number("S"), "S00011")
+        self.assertEqual(self.accounts.get_next_free_account_number("C"), "C00001")
+        self.assertRaises(ValueError, self.accounts.reserve_account_numbers, "X", 1)
+        self.assertRaises(ValueError, self.accounts.reserve_account_numbers, "S", 100000)
+        self.assertEqual(self.accounts.get_next_free_account_number("S"), "S00011")
+
+    def test_next_account_number_after_load(self):
+        """
+        Наибольший номер восстанавливается при загрузке и копировании реестра
+        """
+        self.accounts.append(CurrentAccount("C00341", "Петр Иванов", 1320.56))
+        filename = Path("accounts_tst.dat")
+        self.accounts.save(filename)
+
+        loaded = AccountDict.load(filename)
+        self.assertEqual(loaded.get_next_free_account_number("C"), "C00342")
+        self.assertEqual(pickle.loads(pickle.dumps(loaded)).get_next_free_account_number("C"), "C00342")
+
+    def test_save_changes_in_place(self):
+        """
+        Изменение лимитов перезаписывает запись счета на месте, новый счет дописывается в конец
+        """
+        filename = Path("accounts_tst.dat")
+        filename.write_text(f"{SavingAccount('S00001', 'Иван Петров', 123.45).dump()}\n"
+                            f"{CurrentAccount('C00002', 'Петр Иванов', 1320.56).dump()}", encoding="UTF-8")
+        loaded = AccountDict.load(filename)
+
+        # запись без лимитов короче - первый раз файл перезаписывается целиком
+        loaded["S00001"].set_limits(10, 2000)
+        loaded.save_changes(filename, ["S00001"])
+        size = os.path.getsize(filename)
+
+        loaded["S00001"].set_limits(20, 3000)
+        loaded.save_changes(filename, ["S00001"])
+        self.assertEqual(os.path.getsize(filename), size)
+
+        loaded.append(SavingAccount("S00003", "Анна Сидорова", 10))
+        loaded.save_changes(filename, ["S00003"])
+
+        reloaded = AccountDict.load(filename)
+        self.assertEqual(list(reloaded.keys()), ["S00001", "C00002", "S00003"])
+        self.assertEqual(reloaded["S00001"].min_limit, 20)
+        self.assertEqual(reloaded["S00001"].max_limit, 3000)
+        self.assertEqual(reloaded["C00002"].balance, 1320.56)
+
+    def test_save_changes_appends_after_last_line(self):
+        """
+        Новый счет дописывается с новой строки, если файл не заканчивается переводом строки
+        """
+        filename = Path("accounts_tst.dat")
+        filename.write_text(CurrentAccount("C00002", "Петр Иванов", 1320.56).dump(), encoding="UTF-8")
+        loaded = AccountDict.load(filename)
+        loaded.append(CurrentAccount("C00003", "Анна Сидорова", 10))
+        loaded.save_changes(filename, ["C00003"])
+
+        lines = filename.read_text(encoding="UTF-8").splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(AccountDict.load(filename)["C00003"].balance, 10)
+
+    def test_save_changes_after_external_change(self):
+        """
+        Если файл изменен извне, он перезаписывается целиком
+        """
+        filename = Path("accounts_tst.dat")
+        self.accounts.append(SavingAccount("S00001", "Иван Петров", 123.45))
+        self.accounts.save(filename)
+        with open(filename, "a", encoding="UTF-8") as f:
+            f.write(f"{CurrentAccount('C00009', 'Петр Иванов', 1320.56).dump()}\n")
+
+        self.accounts["S00001"].set_limits(10, 2000)
+        self.accounts.save_changes(filename, ["S00001"])
+
+        reloaded = AccountDict.load(filename)
+        self.assertEqual(list(reloaded.keys()), ["S00001"])
+        self.assertEqual(reloaded["S00001"].max_limit, 2000)
+
     def test_save_account_with_limits(self):
         """
         Сохранить и загрузить счета с установленными лимитами
@@ -4,10 +4,26 @@
 Тест кейсы основных бизнес сценариев.
 """
 
+import datetime
+import shutil
+import tempfile
+import threading
+import time
 import unittest
-from unittest import TestCase
+import zlib
+from pathlib import Path
+from unittest import TestCase, mock
 
-from bank_accounts.application import bank_app
+from bank_accounts import application, columnar
+from bank_accounts.application import bank_app, Application
+from bank_accounts.accounts import AccountDict
+from bank_accounts.checkpoint import Checkpoint
+from bank_accounts.locks import FileLock
+from bank_accounts.storage import WriteAheadLog
+from bank_accounts.transactions import TransactionList
+
+# Тестовые данные
+TEST_DATA_DIR = Path(__file__).parent / "data"
 
 
 class TestApplication(TestCase):
@@ -16,6 +32,518 @@ class TestApplication(TestCase):
         self.assertTrue(len(accounts_table.rows) > 0)
 
 
+class TestApplicationLazyLoad(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.accounts_file = Path(self.tmp_dir.name) / "ACCOUNTS.DAT"
+        self.transactions_file = Path(self.tmp_dir.name) / "TRANSACTIONS.DAT"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_create_without_loading(self):
+        """
+        Создание приложения не читает файлы данных
+        """
+        app = Application(self.accounts_file, self.transactions_file)
+        self.assertRaises(FileNotFoundError, app.get_all_accounts)
+
+    def test_export_accounts_without_transactions(self):
+        """
+        Выгрузка счетов не требует загрузки истории транзакций
+        """
+        shutil.copy(TEST_DATA_DIR / "ACCOUNTS.DAT", self.accounts_file)
+        exported = Path(self.tmp_dir.name) / "EXPORT.DAT"
+
+        app = Application(self.accounts_file, self.transactions_file)
+        app.save_accounts(exported)
+
+        self.assertEqual(len(exported.read_text(encoding="UTF-8").splitlines()), 4)
+        self.assertFalse(self.transactions_file.exists())
+
+
+class TestApplicationJournal(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.accounts_file = Path(self.tmp_dir.name) / "ACCOUNTS.DAT"
+        self.transactions_file = Path(self.tmp_dir.name) / "TRANSACTIONS.DAT"
+        shutil.copy(TEST_DATA_DIR / "ACCOUNTS.DAT", self.accounts_file)
+        shutil.copy(TEST_DATA_DIR / "TRANSACTIONS.DAT", self.transactions_file)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_deposit_appends_to_journal(self):
+        """
+        Депозит дописывается в конец файла транзакций, остальные строки не меняются
+        """
+        original = self.transactions_file.read_text(encoding="UTF-8")
+
+        app = Application(self.accounts_file, self.transactions_file)
+        app.deposit("S00001", 100)
+        app.withdraw("S00001", 50)
+        app.close()
+
+        content = self.transactions_file.read_text(encoding="UTF-8")
+        self.assertTrue(content.startswith(original))
+        self.assertEqual(len(content.splitlines()), len(original.splitlines()) + 2)
+
+        reloaded = Application(self.accounts_file, self.transactions_file)
+        self.assertEqual(reloaded.get_account("S00001").balance, app.get_account("S00001").balance)
+
+    def test_iter_transactions(self):
+        """
+        История читается из файла потоково, вместе с еще не синхронизированными записями журнала
+        """
+        app = Application(self.accounts_file, self.transactions_file, sync_every=0)
+        app.deposit("S00001", 100)
+        self.assertEqual(len(list(app.iter_transactions(None))), 8)
+        self.assertEqual([txn.amount for txn in app.iter_transactions("S00001")], [120, 330, 100])
+        self.assertEqual(len(app.iter_accounts()), 4)
+        in_period = app.iter_transactions("S00001", datetime.date(2012, 7, 14), datetime.date(2012, 7, 14))
+        self.assertEqual([txn.amount for txn in in_period], [330])
+
+    def test_compact(self):
+        """
+        Уплотнение журнала перезаписывает файл транзакций целиком
+        """
+        app = Application(self.accounts_file, self.transactions_file, sync_every=0)
+        app.deposit("C00005", 10)
+        app.compact()
+
+        lines = self.transactions_file.read_text(encoding="UTF-8").splitlines()
+        self.assertEqual(len(lines), 8)
+        self.assertTrue(all(len(line) == 30 for line in lines))
+
+
+class TestApplicationBatch(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.accounts_file = Path(self.tmp_dir.name) / "ACCOUNTS.DAT"
+        self.transactions_file = Path(self.tmp_dir.name) / "TRANSACTIONS.DAT"
+        shutil.copy(TEST_DATA_DIR / "ACCOUNTS.DAT", self.accounts_file)
+        shutil.copy(TEST_DATA_DIR / "TRANSACTIONS.DAT", self.transactions_file)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_apply_batch(self):
+        """
+        Пакет транзакций проводится и сохраняется целиком
+        """
+        batch = TransactionList.load_lines([
+            "20120716S00001D 100.00",
+            "20120716C00008W 26.37",
+            "20120716S00001W 85.15",
+        ])
+        app = Application(self.accounts_file, self.transactions_file)
+        self.assertEqual(app.apply_batch(batch), 3)
+        self.assertEqual(app.get_account("S00001").balance, 695)
+        self.assertEqual(app.get_account("C00008").balance, 3300)
+
+        reloaded = Application(self.accounts_file, self.transactions_file)
+        self.assertEqual(reloaded.get_account("S00001").balance, 695)
+        self.assertEqual(len(self.transactions_file.read_text(encoding="UTF-8").splitlines()), 10)
+
+    def test_add_accounts(self):
+        """
+        Счета создаются блоком и сохраняются одной записью реестра
+        """
+        app = Application(self.accounts_file, self.transactions_file)
+        created = app.add_accounts([("Иван Петров", "S", 10), ("Петр Иванов", "C", 20), ("Анна Сидорова", "S", 30)])
+        self.assertEqual([acc.account_number for acc in created], ["S00003", "C00009", "S00004"])
+
+        reloaded = Application(self.accounts_file, self.transactions_file)
+        self.assertEqual(reloaded.get_account("S00004").customer_name, "Анна Сидорова")
+        self.assertRaises(ValueError, reloaded.add_accounts, [("Иван Петров", "S", 10), ("", "C", 20)])
+        self.assertRaises(ValueError, reloaded.get_account, "S00005")
+
+    def test_set_limits_in_place(self):
+        """
+        Повторная установка лимитов не меняет размер файла счетов
+        """
+        app = Application(self.accounts_file, self.transactions_file)
+        app.set_limits("S00001", 0, 1000000)
+        size = self.accounts_file.stat().st_size
+        app.set_limits("S00001", 100, 2000)
+        self.assertEqual(self.accounts_file.stat().st_size, size)
+
+        reloaded = Application(self.accounts_file, self.transactions_file)
+        self.assertEqual(reloaded.get_account("S00001").max_limit, 2000)
+        self.assertEqual(reloaded.get_account("C00008").balance, 3326.37)
+
+    def test_recover_on_start(self):
+        """
+        При первом захвате блокировки файлов применяется журнал предзаписи счетов
+        и отрезается недописанная транзакция. Конструктор файлы не меняет.
+        """
+        app = Application(self.accounts_file, self.transactions_file)
+        app.set_limits("S00001", 0, 1000000)
+        accounts = AccountDict.load(self.accounts_file)
+        accounts["S00001"].set_limits(100, 2000)
+        record = accounts["S00001"].dump().ljust(80).encode("UTF-8")
+        wal = WriteAheadLog(self.accounts_file)
+        wal._log([(self.accounts_file.read_bytes().index(b"S00001"), record)])
+        with open(self.transactions_file, "a", encoding="UTF-8") as f:
+            f.write("\n2012071")
+
+        size = self.transactions_file.stat().st_size
+        recovered = Application(self.accounts_file, self.transactions_file)
+        self.assertTrue(wal.wal_file.exists())
+        self.assertEqual(self.transactions_file.stat().st_size, size)
+        self.assertEqual(recovered.get_account("S00001").max_limit, 2000)
+        self.assertFalse(wal.wal_file.exists())
+        self.assertLess(self.transactions_file.stat().st_size, size)
+        self.assertEqual(recovered.get_account("S00001").balance, 680.15)
+
+    def test_parallel_replay(self):
+        """
+        Балансы, переигранные в нескольких процессах, совпадают с последовательной переигровкой
+        """
+        min_bytes = application.PARALLEL_REPLAY_MIN_BYTES
+        application.PARALLEL_REPLAY_MIN_BYTES = 0
+        try:
+            app = Application(self.accounts_file, self.transactions_file, replay_workers=2)
+            self.assertEqual(app.get_account("S00001").balance, 680.15)
+            self.assertEqual(app.get_account("C00005").balance, -144.62)
+        finally:
+            application.PARALLEL_REPLAY_MIN_BYTES = min_bytes
+
+        batch = TransactionList.load_lines(["20120716S00001D 100.00"])
+        self.assertEqual(app.apply_batch(batch), 1)
+        self.assertEqual(Application(self.accounts_file, self.transactions_file,
+                                     replay_workers=1).get_account("S00001").balance, 780.15)
+
+    @unittest.skipIf(columnar.np is None, "numpy не установлен")
+    def test_columnar_replay(self):
+        """
+        Балансы, переигранные векторно, совпадают с последовательной переигровкой,
+        а ошибку в истории сообщает переигровка по записям
+        """
+        min_bytes = application.COLUMNAR_REPLAY_MIN_BYTES
+        application.COLUMNAR_REPLAY_MIN_BYTES = 0
+        try:
+            app = Application(self.accounts_file, self.transactions_file, replay_workers=1)
+            self.assertEqual(app.get_account("S00001").balance, 680.15)
+            self.assertEqual(app.get_account("C00005").balance, -144.62)
+
+            with open(self.transactions_file, "a") as f:
+                f.write("20120716S00001W 1000000.00\n")
+            with self.assertRaises(ValueError) as columnar_error:
+                Application(self.accounts_file, self.transactions_file, replay_workers=1).get_account("S00001")
+        finally:
+            application.COLUMNAR_REPLAY_MIN_BYTES = min_bytes
+        with self.assertRaises(ValueError) as sequential_error:
+            Application(self.accounts_file, self.transactions_file, replay_workers=1).get_account("S00001")
+        self.assertEqual(str(columnar_error.exception), str(sequential_error.exception))
+
+    def test_group_commit(self):
+        """
+        Параллельные депозиты в режиме групповой фиксации сохраняются все
+        """
+        app = Application(self.accounts_file, self.transactions_file, group_commit=True)
+        app.get_all_accounts()
+
+        def post() -> None:
+            for _ in range(25):
+                app.deposit("S00002", 1)
+
+        threads = [threading.Thread(target=post) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(app.get_account("S00002").balance, 5909.68)
+        app.close()
+
+        reloaded = Application(self.accounts_file, self.transactions_file)
+        self.assertEqual(reloaded.get_account("S00002").balance, 5909.68)
+
+    def test_publish_keeps_sync_policy(self):
+        """
+        Освобождение блокировки файлов не синхронизирует журнал с диском:
+        синхронизация - по политике журнала (здесь раз в 100 записей)
+        """
+        app = Application(self.accounts_file, self.transactions_file, sync_every=100)
+        app.get_all_accounts()
+        with mock.patch("os.fsync") as fsync:
+            for _ in range(100):
+                app.deposit("S00002", 1)
+        self.assertEqual(fsync.call_count, 1)
+        self.assertEqual(Application(self.accounts_file, self.transactions_file).get_account("S00002").balance, 5909.68)
+        app.close()
+
+    def test_group_commit_request_fsync(self):
+        """
+        В режиме групповой фиксации каждый депозит синхронизируется с диском один раз
+        """
+        app = Application(self.accounts_file, self.transactions_file, group_commit=True)
+        app.get_all_accounts()
+        with mock.patch("os.fsync") as fsync:
+            app.deposit("S00002", 1)
+        self.assertEqual(fsync.call_count, 1)
+        app.close()
+
+    def test_compact_with_queued_deposit(self):
+        """
+        Уплотнение во время депозита в режиме групповой фиксации не теряет транзакцию из очереди
+        """
+        app = Application(self.accounts_file, self.transactions_file, group_commit=True)
+        self.assertEqual(app.get_account("S00001").balance, 680.15)
+
+        # поток групповой фиксации ждет, пока уплотнение не начнется
+        release = threading.Event()
+        write_many = application.TransactionJournal.write_many
+
+        def slow_write_many(journal, txns):
+            release.wait(5)
+            return write_many(journal, txns)
+
+        with mock.patch.object(application.TransactionJournal, "write_many", slow_write_many):
+            deposit = threading.Thread(target=app.deposit, args=("S00001", 100))
+            deposit.start()
+            while app.get_account("S00001").balance != 780.15:
+                time.sleep(0.001)
+            compact = threading.Thread(target=app.compact)
+            compact.start()
+            time.sleep(0.05)
+            release.set()
+            deposit.join()
+            compact.join()
+        app.close()
+
+        self.assertEqual(Application(self.accounts_file, self.transactions_file).get_account("S00001").balance, 780.15)
+
+    def test_concurrent_transactions(self):
+        """
+        Параллельные транзакции по разным счетам с контрольными точками
+        дают те же балансы, что и последовательная переигровка журнала
+        """
+        checkpoint_file = Path(self.tmp_dir.name) / "CHECKPOINT.DAT"
+        app = Application(self.accounts_file, self.transactions_file,
+                          checkpoint_file=checkpoint_file, checkpoint_every=7, lock_stripes=2)
+
+        def post(account_num: str) -> None:
+            for _ in range(30):
+                app.deposit(account_num, 2)
+                app.withdraw(account_num, 1)
+
+        threads = [threading.Thread(target=post, args=(account_num,))
+                   for account_num in ("S00001", "S00002", "C00005", "C00008") for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        app.close()
+
+        self.assertEqual(app.get_account("S00001").balance, 740.15)
+        replayed = Application(self.accounts_file, self.transactions_file, replay_workers=1)
+        for account_num in ("S00001", "S00002", "C00005", "C00008"):
+            self.assertEqual(replayed.get_account(account_num).balance, app.get_account(account_num).balance)
+        from_checkpoint = Application(self.accounts_file, self.transactions_file, checkpoint_file=checkpoint_file)
+        self.assertEqual(from_checkpoint.get_account("C00005").balance, -84.62)
+
+    def test_apply_batch_all_or_nothing(self):
+        """
+        Пакет с нарушением лимита не проводится совсем
+        """
+        original = self.transactions_file.read_text(encoding="UTF-8")
+        app = Application(self.accounts_file, self.transactions_file)
+        app.set_limits("S00001", 0, 1000000)
+
+        batch = TransactionList.load_lines([
+            "20120716C00008D 100.00",
+            "20120716S00001W 600.00",
+            "20120716S00001W 100.00",
+        ])
+        self.assertRaises(ValueError, app.apply_batch, batch)
+        self.assertEqual(app.get_account("S00001").balance, 680.15)
+        self.assertEqual(app.get_account("C00008").balance, 3326.37)
+        self.assertEqual(self.transactions_file.read_text(encoding="UTF-8"), original)
+
+    def test_apply_batch_unknown_account(self):
+        """
+        Пакет с несуществующим счетом не проводится
+        """
+        app = Application(self.accounts_file, self.transactions_file)
+        batch = TransactionList.load_lines(["20120716C00008D 100.00", "20120716C99999D 100.00"])
+        self.assertRaises(ValueError, app.apply_batch, batch)
+        self.assertEqual(app.get_account("C00008").balance, 3326.37)
+
+
+class TestApplicationProcesses(TestCase):
+    """
+    Два приложения над одними файлами ведут себя как два процесса: каждое блокирует файлы отдельно
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.accounts_file = Path(self.tmp_dir.name) / "ACCOUNTS.DAT"
+        self.transactions_file = Path(self.tmp_dir.name) / "TRANSACTIONS.DAT"
+        shutil.copy(TEST_DATA_DIR / "ACCOUNTS.DAT", self.accounts_file)
+        shutil.copy(TEST_DATA_DIR / "TRANSACTIONS.DAT", self.transactions_file)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _create_app(self, **kwargs) -> Application:
+        return Application(self.accounts_file, self.transactions_file, **kwargs)
+
+    def test_refresh_appended_transactions(self):
+        """
+        Транзакции другого процесса учитываются в балансах до проверки лимитов
+        """
+        first, second = self._create_app(), self._create_app()
+        first.set_limits("S00001", 0, 1100)
+        self.assertEqual(second.get_account("S00001").balance, 680.15)
+
+        first.deposit("S00001", 300)
+        self.assertEqual(second.get_account("S00001").balance, 980.15)
+        # по устаревшему балансу 680.15 депозит прошел бы
+        self.assertRaises(ValueError, second.deposit, "S00001", 200)
+        second.withdraw("S00001", 80.15)
+        self.assertEqual(first.get_account("S00001").balance, 900)
+        self.assertEqual(len(first.get_transactions("S00001")), 4)
+
+    def test_refresh_after_rewrite(self):
+        """
+        После уплотнения журнала и добавления счета другим процессом данные загружаются заново
+        """
+        first, second = self._create_app(), self._create_app()
+        second.get_account("C00005")
+        first.deposit("C00005", 10)
+        first.compact()
+        first.add_new_account("Иван Петров", "S", 10)
+
+        self.assertEqual(second.get_account("C00005").balance, -134.62)
+        self.assertEqual(second.get_account("S00003").customer_name, "Иван Петров")
+        second.deposit("C00005", 4.62)
+        self.assertEqual(first.get_account("C00005").balance, -130)
+
+    def test_first_read_is_shared(self):
+        """
+        Первое чтение процесса не держит исключительную блокировку: читатели других процессов не ждут
+        """
+        first, second = self._create_app(lock_timeout_ms=20), self._create_app(lock_timeout_ms=20)
+        transactions = first.iter_transactions(None)
+        self.assertEqual(next(transactions).account, "C00005")
+        try:
+            self.assertEqual(second.get_account("S00001").balance, 680.15)
+            self.assertRaisesRegex(ValueError, "заблокированы", second.deposit, "S00001", 10)
+        finally:
+            transactions.close()
+        second.deposit("S00001", 10)
+
+    def test_lock_timeout(self):
+        """
+        Пока файлы заблокированы другим процессом, операция ждет ограниченное время
+        """
+        writer = FileLock(Path(f"{self.transactions_file}.lock"))
+        app = self._create_app(lock_timeout_ms=20)
+        writer.acquire(exclusive=True)
+        try:
+            self.assertRaisesRegex(ValueError, "заблокированы", app.deposit, "S00001", 10)
+        finally:
+            writer.release()
+        app.deposit("S00001", 10)
+        self.assertEqual(app.get_account("S00001").balance, 690.15)
+
+
+class TestApplicationCheckpoint(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.accounts_file = Path(self.tmp_dir.name) / "ACCOUNTS.DAT"
+        self.transactions_file = Path(self.tmp_dir.name) / "TRANSACTIONS.DAT"
+        self.checkpoint_file = Path(self.tmp_dir.name) / "CHECKPOINT.DAT"
+        shutil.copy(TEST_DATA_DIR / "ACCOUNTS.DAT", self.accounts_file)
+        shutil.copy(TEST_DATA_DIR / "TRANSACTIONS.DAT", self.transactions_file)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _create_app(self, checkpoint_every: int = 0) -> Application:
+        return Application(self.accounts_file, self.transactions_file,
+                           checkpoint_file=self.checkpoint_file, checkpoint_every=checkpoint_every)
+
+    def test_replay_tail_after_checkpoint(self):
+        """
+        При запуске применяются только транзакции после контрольной точки
+        """
+        app = self._create_app()
+        saved = app.checkpoint()
+        self.assertEqual(saved.count, 7)
+        app.deposit("S00001", 100)
+
+        # подменим баланс в контрольной точке: полная переигровка его бы не заметила
+        Checkpoint(saved.offset, saved.count, saved.last_record,
+                   dict(saved.balances, S00001=100000)).save(self.checkpoint_file)
+
+        reloaded = self._create_app()
+        self.assertEqual(reloaded.get_account("S00001").balance, 1100.0)
+        self.assertEqual(reloaded.get_account("C00008").balance, app.get_account("C00008").balance)
+
+    def test_ignore_stale_checkpoint(self):
+        """
+        Контрольная точка не используется, если файл транзакций был перезаписан
+        """
+        app = self._create_app()
+        saved = app.checkpoint()
+        Checkpoint(saved.offset, saved.count, saved.last_record,
+                   dict(saved.balances, S00001=100000)).save(self.checkpoint_file)
+        app.save_transactions(self.transactions_file)
+
+        reloaded = self._create_app()
+        self.assertEqual(reloaded.get_account("S00001").balance, app.get_account("S00001").balance)
+
+    def test_account_history_by_index(self):
+        """
+        История одного счета читается по индексу без загрузки всей истории
+        """
+        index_file = Path(self.tmp_dir.name) / "TRANSACTIONS.IDX"
+        app = Application(self.accounts_file, self.transactions_file,
+                          checkpoint_file=self.checkpoint_file, index_file=index_file)
+        app.deposit("S00001", 100)
+        app.checkpoint()
+        self.assertTrue(index_file.exists())
+        app.withdraw("S00001", 10)
+
+        reloaded = Application(self.accounts_file, self.transactions_file,
+                               checkpoint_file=self.checkpoint_file, index_file=index_file)
+        table = reloaded.get_all_transactions("S00001")
+        self.assertEqual(table.row_count, 4)
+
+    def test_checkpoint_crc(self):
+        """
+        Контрольная сумма начала файла транзакций дописывается от точки к точке
+        """
+        app = self._create_app()
+        app.checkpoint()
+        app.deposit("S00001", 100)
+        saved = app.checkpoint()
+        self.assertEqual(saved.crc, zlib.crc32(self.transactions_file.read_bytes()[:saved.offset]))
+
+        # после уплотнения журнала сумма считается заново
+        app.withdraw("S00001", 10)
+        app.compact()
+        saved = Checkpoint.load(self.checkpoint_file)
+        self.assertEqual(saved.crc, zlib.crc32(self.transactions_file.read_bytes()))
+
+        reloaded = self._create_app()
+        self.assertEqual(reloaded.get_account("S00001").balance, app.get_account("S00001").balance)
+        self.assertEqual(reloaded.get_all_transactions("S00001").row_count, 4)
+
+    def test_periodic_checkpoint(self):
+        """
+        Контрольная точка записывается автоматически каждые N транзакций
+        """
+        app = self._create_app(checkpoint_every=9)
+        app.deposit("S00001", 1)
+        self.assertFalse(self.checkpoint_file.exists())
+
+        app.deposit("S00001", 1)
+        self.assertEqual(Checkpoint.load(self.checkpoint_file).count, 9)
+
+
 # Executing the tests in the above test case class
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,74 @@
+# binary_store_tests.py
+
+"""
+Тест кейсы для двоичного хранилища транзакций
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import TestCase
+
+from bank_accounts.binary_store import BinaryTransactionStore
+from bank_accounts.transactions import TransactionList
+
+# Тестовые данные
+TEST_DATA_DIR = Path(__file__).parent / "data"
+
+
+class TestBinaryTransactionStore(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.binary_file = Path(self.tmp_dir.name) / "transactions_tst.bin"
+        self.text_file = Path(self.tmp_dir.name) / "transactions_tst.dat"
+        BinaryTransactionStore.from_text(TEST_DATA_DIR / "TRANSACTIONS.DAT", self.binary_file)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_convert_round_trip(self):
+        """
+        Текст -> двоичный формат -> текст без потери данных
+        """
+        count = BinaryTransactionStore.to_text(self.binary_file, self.text_file)
+        self.assertEqual(count, 7)
+
+        original = TransactionList.load(TEST_DATA_DIR / "TRANSACTIONS.DAT")
+        converted = TransactionList.load(self.text_file)
+        for txn, found in zip(original, converted):
+            self.assertEqual(txn.date, found.date)
+            self.assertEqual(txn.account, found.account)
+            self.assertEqual(txn.txn_type, found.txn_type)
+            self.assertEqual(txn.amount, found.amount)
+
+    def test_read_records(self):
+        """
+        Чтение записей без создания объектов транзакций
+        """
+        with BinaryTransactionStore(self.binary_file) as store:
+            self.assertEqual(len(store), 7)
+            day, acc_type, acc_number, txn_type, amount = store[3]
+            self.assertEqual((chr(acc_type), acc_number, chr(txn_type), amount), ("C", 8, "D", 168045))
+            self.assertEqual(store[-1], list(store)[6])
+            self.assertRaises(IndexError, store.__getitem__, 7)
+
+    def test_filter_and_totals(self):
+        """
+        Фильтр по счету и итоги по счетам в копейках
+        """
+        with BinaryTransactionStore(self.binary_file) as store:
+            self.assertEqual(len(list(store.filter("S00001"))), 2)
+            totals = store.totals()
+            self.assertEqual(totals["S00001"], -21000)
+            self.assertEqual(totals["S00002"], 60921)
+
+    def test_invalid_file(self):
+        """
+        Файл не в двоичном формате транзакций
+        """
+        self.assertRaises(ValueError, BinaryTransactionStore, TEST_DATA_DIR / "TRANSACTIONS.DAT")
+
+
+# Executing the tests in the above test case class
+if __name__ == "__main__":
+    unittest.main()
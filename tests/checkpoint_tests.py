@@ -0,0 +1,80 @@
+# checkpoint_tests.py
+
+"""
+Тест кейсы для контрольной точки балансов
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import TestCase
+
+from bank_accounts.checkpoint import Checkpoint
+from bank_accounts.transactions import read_last_record
+
+
+class TestCheckpoint(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.transactions_file = Path(self.tmp_dir.name) / "transactions_tst.dat"
+        self.checkpoint_file = Path(self.tmp_dir.name) / "checkpoint_tst.dat"
+        self.transactions_file.write_text(
+            "20120713C00005W 200.00\n20120713S00002W 150.79\n", encoding="UTF-8")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_save_load_checkpoint(self):
+        """
+        Сохранить и загрузить контрольную точку
+        """
+        checkpoint = Checkpoint(46, 2, "20120713S00002W 150.79", {"C00005": 53088, "S00002": 504968})
+        checkpoint.save(self.checkpoint_file)
+
+        loaded = Checkpoint.load(self.checkpoint_file)
+        self.assertEqual(loaded.offset, 46)
+        self.assertEqual(loaded.count, 2)
+        self.assertEqual(loaded.last_record, "20120713S00002W 150.79")
+        self.assertEqual(loaded.balances, {"C00005": 53088, "S00002": 504968})
+        self.assertIsNone(loaded.crc)
+
+        Checkpoint(46, 2, "20120713S00002W 150.79", {}, 4294967295).save(self.checkpoint_file)
+        self.assertEqual(Checkpoint.load(self.checkpoint_file).crc, 4294967295)
+
+    def test_load_missing_checkpoint(self):
+        """
+        Контрольной точки нет
+        """
+        self.assertIsNone(Checkpoint.load(self.checkpoint_file))
+
+    def test_read_last_record(self):
+        """
+        Последняя запись перед смещением
+        """
+        self.assertEqual(read_last_record(self.transactions_file, 46), "20120713S00002W 150.79")
+        self.assertEqual(read_last_record(self.transactions_file, 23), "20120713C00005W 200.00")
+
+    def test_matches_appended_file(self):
+        """
+        Контрольная точка действительна после дозаписи в конец файла
+        """
+        checkpoint = Checkpoint(46, 2, "20120713S00002W 150.79", {})
+        with open(self.transactions_file, "a", encoding="UTF-8") as f:
+            f.write("20120714C00005D 100.00\n")
+
+        self.assertTrue(checkpoint.matches(self.transactions_file))
+
+    def test_not_matches_rewritten_file(self):
+        """
+        Контрольная точка недействительна после перезаписи файла
+        """
+        checkpoint = Checkpoint(46, 2, "20120713S00002W 150.79", {})
+        self.transactions_file.write_text(
+            "20120713C00005W          200.0\n20120713S00002W          150.79\n", encoding="UTF-8")
+
+        self.assertFalse(checkpoint.matches(self.transactions_file))
+
+
+# Executing the tests in the above test case class
+if __name__ == "__main__":
+    unittest.main()
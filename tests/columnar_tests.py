@@ -0,0 +1,112 @@
+# columnar_tests.py
+
+"""
+Тест кейсы для колоночной загрузки транзакций
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import TestCase
+
+from bank_accounts.transactions import TransactionList
+from bank_accounts.columnar import TransactionColumns, np
+
+# Тестовые данные
+TEST_DATA_DIR = Path(__file__).parent / "data"
+
+
+@unittest.skipIf(np is None, "numpy не установлен")
+class TestTransactionColumns(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.filename = Path(self.tmp_dir.name) / "transactions_tst.dat"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_load_same_as_rows(self):
+        """
+        Колоночная загрузка дает те же транзакции, что и построчная
+        """
+        transactions_file = TEST_DATA_DIR / "TRANSACTIONS.DAT"
+        columns = TransactionColumns.load(transactions_file)
+        rows = TransactionList.load(transactions_file)
+
+        self.assertEqual(len(columns), len(rows))
+        for txn, loaded in zip(rows, columns.to_transaction_list()):
+            self.assertEqual(txn.date, loaded.date)
+            self.assertEqual(txn.account, loaded.account)
+            self.assertEqual(txn.txn_type, loaded.txn_type)
+            self.assertEqual(txn.amount, loaded.amount)
+
+    def test_load_fixed_width(self):
+        """
+        Записи одинаковой длины, сохраненные приложением
+        """
+        TransactionList.load(TEST_DATA_DIR / "TRANSACTIONS.DAT").save(self.filename)
+        columns = TransactionColumns.load(self.filename)
+
+        self.assertEqual(len(columns), 7)
+        self.assertEqual(columns.amounts[3], 1680.45)
+        self.assertEqual(len(columns.search("S00001")), 2)
+
+    def test_totals(self):
+        """
+        Изменение баланса по счетам
+        """
+        totals = TransactionColumns.load(TEST_DATA_DIR / "TRANSACTIONS.DAT").totals()
+        self.assertEqual(totals["S00001"], -21000)
+        self.assertEqual(totals["C00008"], 168045)
+
+    def test_balances(self):
+        """
+        Переигровка истории по счетам с проверкой лимитов
+        """
+        columns = TransactionColumns.load(TEST_DATA_DIR / "TRANSACTIONS.DAT")
+        initial = {"C00005": 73088, "C00008": 164592, "S00001": 89015, "S00002": 520047}
+        limits = {account_num: (-1000000, 100000000) for account_num in initial}
+
+        balances = columns.balances(initial, limits)
+        self.assertEqual(balances, {"C00005": -14462, "C00008": 332637, "S00001": 68015, "S00002": 580968})
+
+        # после второй транзакции по C00005 баланс уходит ниже нуля
+        limits["C00005"] = (0, 100000000)
+        self.assertRaises(ValueError, columns.balances, initial, limits)
+
+    def test_empty_file(self):
+        """
+        Пустой файл транзакций
+        """
+        self.filename.write_text("", encoding="UTF-8")
+        self.assertEqual(len(TransactionColumns.load(self.filename)), 0)
+
+    def test_exact_amounts(self):
+        """
+        Суммы разбираются без промежуточного float: и выровненные по правому краю, и записанные вручную
+        """
+        amounts = ["90071992547409.93", "0.07", "5", ".5", "12.345"]
+        lines = [f"20120713C00005D{amount:>17}" for amount in amounts]
+        for text in ("\n".join(lines), "\n".join(line.replace(" ", "") for line in lines)):
+            self.filename.write_text(text, encoding="UTF-8")
+            expected = [txn.amount_minor for txn in TransactionList.load(self.filename)]
+            self.assertEqual(expected, [9007199254740993, 7, 500, 50, 1234])
+            self.assertEqual(TransactionColumns.load(self.filename).amounts_minor.tolist(), expected)
+
+        lines = [f"20120713C00005D{amount:>17}" for amount in ["90071992547409.93", "1.00", "123.45"]]
+        self.filename.write_text("\n".join(lines), encoding="UTF-8")
+        self.assertEqual(TransactionColumns.load(self.filename).amounts_minor.tolist(), [9007199254740993, 100, 12345])
+
+    def test_invalid_records(self):
+        """
+        Некорректные записи: дата, счет, тип транзакции, сумма
+        """
+        for line in ["20120231C00005W 200.00", "20120713X00005W 200.00", "20120713C0A005W 200.00",
+                     "20120713C00005X 200.00", "20120713C00005W abc", "20120713C00005W -5.00"]:
+            self.filename.write_text(f"20120713C00005W 200.00\n{line}\n", encoding="UTF-8")
+            self.assertRaises(ValueError, TransactionColumns.load, self.filename)
+
+
+# Executing the tests in the above test case class
+if __name__ == "__main__":
+    unittest.main()
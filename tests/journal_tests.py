@@ -0,0 +1,204 @@
+# journal_tests.py
+
+"""
+Тест кейсы для журнала транзакций
+"""
+
+import datetime
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import TestCase, mock
+
+from bank_accounts.journal import TransactionJournal, GroupCommitter
+from bank_accounts.transactions import Transaction, TransactionList
+
+
+class TestTransactionJournal(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.filename = Path(self.tmp_dir.name) / "transactions_tst.dat"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_append_transactions(self):
+        """
+        Дописать транзакции в конец существующего файла
+        """
+        date = datetime.datetime.now()
+        transactions = TransactionList()
+        transactions.append(Transaction(date, "S12345", "D", 123.45))
+        transactions.save(self.filename)
+
+        journal = TransactionJournal(self.filename)
+        journal.append(Transaction(date, "S12345", "W", 23.45))
+        journal.append_many([Transaction(date, "C54312", "D", 3), Transaction(date, "C54312", "W", 1)])
+        journal.close()
+
+        loaded = TransactionList.load(self.filename)
+        self.assertEqual(len(loaded), 4)
+        self.assertEqual(loaded[1].amount, 23.45)
+        self.assertEqual(loaded[3].account, "C54312")
+
+    def test_append_without_trailing_newline(self):
+        """
+        Последняя строка файла без перевода строки
+        """
+        self.filename.write_text("20120713C00005W 200.00", encoding="UTF-8")
+
+        journal = TransactionJournal(self.filename)
+        journal.append(Transaction(datetime.datetime.now(), "C00005", "D", 10))
+        journal.close()
+
+        loaded = TransactionList.load(self.filename)
+        self.assertEqual(len(loaded), 2)
+        self.assertEqual(loaded[0].amount, 200)
+        self.assertEqual(loaded[1].amount, 10)
+
+    def test_sync_every_n_records(self):
+        """
+        Синхронизация с диском каждые N записей
+        """
+        date = datetime.datetime.now()
+        journal = TransactionJournal(self.filename, sync_every=3)
+
+        journal.append(Transaction(date, "S12345", "D", 1))
+        journal.append(Transaction(date, "S12345", "D", 2))
+        self.assertEqual(journal.pending, 2)
+
+        journal.append(Transaction(date, "S12345", "D", 3))
+        self.assertEqual(journal.pending, 0)
+        journal.close()
+
+    def test_sync_by_interval(self):
+        """
+        Синхронизация с диском только по времени
+        """
+        date = datetime.datetime.now()
+        journal = TransactionJournal(self.filename, sync_every=0, sync_interval_ms=60000)
+
+        journal.append(Transaction(date, "S12345", "D", 1))
+        journal.append(Transaction(date, "S12345", "D", 2))
+        self.assertEqual(journal.pending, 2)
+
+        journal.close()
+        self.assertEqual(journal.pending, 0)
+
+    def test_sync_interval_without_appends(self):
+        """
+        Записи, оставшиеся несинхронизированными после последней дозаписи, сбрасывает таймер
+        """
+        date = datetime.datetime.now()
+        journal = TransactionJournal(self.filename, sync_every=0, sync_interval_ms=50)
+        journal.sync()
+        journal.append(Transaction(date, "S12345", "D", 1))
+        self.assertEqual(journal.pending, 1)
+        deadline = time.monotonic() + 5
+        while journal.pending > 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(journal.pending, 0)
+        journal.close()
+
+    def test_repair_torn_record(self):
+        """
+        Недописанная последняя запись отрезается, целая запись без перевода строки остается
+        """
+        self.filename.write_text("20120713C00005W 200.00\n20120714S000", encoding="UTF-8")
+        journal = TransactionJournal(self.filename)
+        self.assertEqual(journal.repair(), 12)
+        self.assertEqual(self.filename.read_text(encoding="UTF-8"), "20120713C00005W 200.00\n")
+
+        self.filename.write_text("20120713C00005W 200.00", encoding="UTF-8")
+        self.assertEqual(journal.repair(), 0)
+        self.assertEqual(len(TransactionList.load(self.filename)), 1)
+
+    def test_repair_record_cut_in_amount(self):
+        """
+        Запись, обрезанная посреди суммы, отрезается, хотя ее начало разбирается как сумма.
+        Целая последняя запись без перевода строки остается
+        """
+        record = Transaction(datetime.datetime(2012, 7, 13), "C00005", "W", 12345.67).dump()
+        torn = record[:-3]
+        self.assertEqual(Transaction.load(torn).amount, 12345)
+        self.filename.write_text(f"{record}\n{torn}", encoding="UTF-8")
+        journal = TransactionJournal(self.filename)
+        self.assertEqual(journal.repair(), len(torn))
+        self.assertEqual(self.filename.read_text(encoding="UTF-8"), f"{record}\n")
+
+        self.filename.write_text(f"{record}\n{record}", encoding="UTF-8")
+        self.assertEqual(journal.repair(), 0)
+        self.assertEqual(len(TransactionList.load(self.filename)), 2)
+
+    def test_invalid_sync_policy(self):
+        """
+        Некорректные параметры синхронизации
+        """
+        self.assertRaises(ValueError, TransactionJournal, self.filename, -1)
+        self.assertRaises(ValueError, TransactionJournal, self.filename, 1, -10)
+
+
+class TestGroupCommitter(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.filename = Path(self.tmp_dir.name) / "transactions_tst.dat"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_commit_in_order(self):
+        """
+        Транзакции записываются в порядке постановки в очередь
+        """
+        date = datetime.datetime.now()
+        committer = GroupCommitter(TransactionJournal(self.filename))
+        futures = [committer.submit([Transaction(date, "S12345", "D", amount)]) for amount in range(1, 6)]
+        futures[-1].result()
+        committer.close()
+
+        self.assertTrue(all(future.done() for future in futures))
+        self.assertEqual([txn.amount for txn in TransactionList.load(self.filename)], [1, 2, 3, 4, 5])
+
+    def test_concurrent_commit(self):
+        """
+        Параллельные вызовы записываются общими группами
+        """
+        date = datetime.datetime.now()
+        committer = GroupCommitter(TransactionJournal(self.filename, sync_every=0))
+
+        def post(count: int) -> None:
+            for _ in range(count):
+                committer.commit([Transaction(date, "C54312", "D", 1)])
+
+        threads = [threading.Thread(target=post, args=(50,)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        committer.close()
+
+        self.assertEqual(len(TransactionList.load(self.filename)), 200)
+        self.assertLessEqual(committer.groups, 200)
+
+    def test_one_fsync_per_group(self):
+        """
+        Группа синхронизируется с диском один раз, даже если журнал синхронизируется после каждой записи
+        """
+        date = datetime.datetime.now()
+        committer = GroupCommitter(TransactionJournal(self.filename, sync_every=1))
+        committer.commit([Transaction(date, "S12345", "D", 1)])
+        with mock.patch("os.fsync") as fsync:
+            committer.commit([Transaction(date, "S12345", "D", amount) for amount in range(2, 12)])
+            self.assertEqual(fsync.call_count, 1)
+        committer.close()
+        self.assertEqual(len(TransactionList.load(self.filename)), 11)
+
+    def test_invalid_max_batch(self):
+        self.assertRaises(ValueError, GroupCommitter, TransactionJournal(self.filename), 0)
+
+
+# Executing the tests in the above test case class
+if __name__ == "__main__":
+    unittest.main()
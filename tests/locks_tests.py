@@ -0,0 +1,144 @@
+# locks_tests.py
+
+"""
+Тест кейсы блокировок счетов и файлов данных
+"""
+
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import TestCase
+
+from bank_accounts.locks import StripedLock, FileLock
+
+
+class TestStripedLock(TestCase):
+    def test_stripe(self):
+        locks = StripedLock(8)
+        self.assertEqual(len(locks), 8)
+        self.assertEqual(locks.stripe("S00001"), locks.stripe("S00001"))
+        self.assertTrue(0 <= locks.stripe("C00002") < 8)
+        self.assertRaises(ValueError, StripedLock, 0)
+
+    def test_hold_blocks_same_account(self):
+        """
+        Второй поток не захватит блокировку счета, пока ее держит первый
+        """
+        locks = StripedLock(4)
+        acquired = threading.Event()
+
+        def hold_in_thread() -> None:
+            with locks.hold(["S00001"]):
+                acquired.set()
+
+        with locks.hold(["S00001", "C00001"]):
+            thread = threading.Thread(target=hold_in_thread)
+            thread.start()
+            self.assertFalse(acquired.wait(0.05))
+        thread.join()
+        self.assertTrue(acquired.is_set())
+
+    def test_hold_all(self):
+        """
+        Все блокировки освобождаются, в том числе при ошибке
+        """
+        locks = StripedLock(4)
+        with self.assertRaises(RuntimeError):
+            with locks.hold_all():
+                raise RuntimeError("сбой")
+        with locks.hold(["S00001", "S00002", "S00003"]):
+            pass
+
+
+class TestFileLock(TestCase):
+    """
+    Разные объекты FileLock открывают файл блокировки отдельно и ведут себя как разные процессы
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.lock_file = Path(self.tmp_dir.name) / "DATA.lock"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_shared(self):
+        """
+        Общую блокировку держат несколько читателей, писатель ждет их и получает ошибку по таймауту
+        """
+        first, second, writer = FileLock(self.lock_file), FileLock(self.lock_file), FileLock(self.lock_file, 20)
+        self.assertTrue(first.acquire(exclusive=False))
+        self.assertTrue(second.acquire(exclusive=False))
+        self.assertRaises(ValueError, writer.acquire, True)
+        first.release()
+        second.release()
+        self.assertTrue(writer.acquire(exclusive=True))
+        writer.release()
+
+    def test_exclusive(self):
+        """
+        Исключительная блокировка повторно входима внутри процесса и закрыта для других процессов
+        """
+        lock, other = FileLock(self.lock_file), FileLock(self.lock_file, 20)
+        self.assertTrue(lock.acquire(exclusive=True))
+        self.assertFalse(lock.acquire(exclusive=False))
+        self.assertRaises(ValueError, other.acquire, False)
+
+        calls = []
+        self.assertFalse(lock.release(calls.append))
+        self.assertTrue(lock.release(calls.append))
+        self.assertEqual(calls, [True])
+        self.assertTrue(other.acquire(exclusive=False))
+        other.release()
+
+    def test_no_upgrade_in_place(self):
+        """
+        Поток, который держит общую блокировку, не может перейти к исключительной: блокировка остается общей
+        """
+        lock, other = FileLock(self.lock_file), FileLock(self.lock_file, 20)
+        self.assertTrue(lock.acquire(exclusive=False))
+        self.assertRaises(ValueError, lock.acquire, True)
+        self.assertFalse(lock.exclusive)
+        self.assertRaises(ValueError, other.acquire, True)
+        self.assertTrue(lock.release())
+        self.assertTrue(other.acquire(exclusive=True))
+        other.release()
+
+    def test_writer_waits_for_readers(self):
+        """
+        Писатель процесса ждет, пока общую блокировку не освободят другие потоки, и блокирует файл заново.
+        Пока писатель ждет файл другого процесса, мьютекс свободен: читатели процесса выходят из блокировки
+        """
+        lock, other = FileLock(self.lock_file), FileLock(self.lock_file)
+        self.assertTrue(lock.acquire(exclusive=False))
+        self.assertTrue(other.acquire(exclusive=False))
+        acquired = threading.Event()
+
+        def write() -> None:
+            lock.acquire(exclusive=True)
+            acquired.set()
+            lock.release()
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        self.assertFalse(acquired.wait(0.05))
+        # читатель процесса выходит, пока писатель ждет
+        self.assertTrue(lock.release())
+        self.assertFalse(acquired.wait(0.05))
+        other.release()
+        self.assertTrue(acquired.wait(5))
+        writer.join()
+        self.assertFalse(lock.exclusive)
+
+    def test_stamp(self):
+        lock = FileLock(self.lock_file)
+        self.assertEqual(lock.read_stamp(), "")
+        lock.write_stamp("abc:1")
+        lock.write_stamp("abc:2")
+        self.assertEqual(FileLock(self.lock_file).read_stamp(), "abc:2")
+        self.assertRaises(ValueError, FileLock, self.lock_file, -1)
+
+
+if __name__ == "__main__":
+    unittest.main()
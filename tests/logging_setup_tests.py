@@ -0,0 +1,75 @@
+# logging_setup_tests.py
+
+"""
+Тест кейсы журналирования через очередь
+"""
+
+import logging
+import logging.handlers
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import TestCase
+
+from bank_accounts.logging_setup import configure_logging, shutdown_logging, operation_fields, StructuredFormatter
+
+
+class TestLoggingSetup(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.log_file = Path(self.tmp_dir.name) / "bank.log"
+        self.logger = logging.getLogger("logging_setup_tests")
+        self.logger.propagate = False
+
+    def tearDown(self):
+        shutdown_logging()
+        self.tmp_dir.cleanup()
+
+    def queue_handlers(self):
+        return [handler for handler in self.logger.handlers if isinstance(handler, logging.handlers.QueueHandler)]
+
+    def test_structured_fields(self):
+        configure_logging(self.logger, self.log_file, console_level=logging.CRITICAL)
+        self.assertFalse(self.log_file.exists())
+        self.logger.info("Депозит", extra=operation_fields("S00001", 100, time.perf_counter()))
+        self.logger.debug("Без полей")
+        shutdown_logging()
+        self.assertEqual(self.queue_handlers(), [])
+
+        lines = self.log_file.read_text(encoding="UTF-8").splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn("INFO - Депозит | account=S00001 amount=100.00 latency_ms=", lines[0])
+        self.assertTrue(lines[1].endswith("DEBUG - Без полей"))
+
+    def test_rotation(self):
+        configure_logging(self.logger, self.log_file, max_bytes=200, backup_count=2, console_level=logging.CRITICAL)
+        for idx in range(20):
+            self.logger.info(f"Запись {idx}")
+        shutdown_logging()
+        files = sorted(path.name for path in Path(self.tmp_dir.name).iterdir())
+        self.assertEqual(files, ["bank.log", "bank.log.1", "bank.log.2"])
+        self.assertIn("Запись 19", self.log_file.read_text(encoding="UTF-8"))
+
+    def test_reconfigure(self):
+        configure_logging(self.logger, None, console_level=logging.CRITICAL)
+        configure_logging(self.logger, self.log_file, console_level=logging.CRITICAL)
+        self.assertEqual(len(self.queue_handlers()), 1)
+        self.logger.info("Запись")
+        shutdown_logging()
+        shutdown_logging()
+        self.assertEqual(len(self.log_file.read_text(encoding="UTF-8").splitlines()), 1)
+
+    def test_errors(self):
+        self.assertRaises(ValueError, configure_logging, self.logger, self.log_file, -1)
+        self.assertRaises(ValueError, configure_logging, self.logger, self.log_file, 0, -1)
+
+    def test_formatter(self):
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "Запись", None, None)
+        self.assertEqual(StructuredFormatter("%(message)s").format(record), "Запись")
+        record.account = "C00002"
+        self.assertEqual(StructuredFormatter("%(message)s").format(record), "Запись | account=C00002")
+
+
+if __name__ == "__main__":
+    unittest.main()
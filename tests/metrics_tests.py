@@ -0,0 +1,133 @@
+# metrics_tests.py
+
+"""
+Тест кейсы метрик: гистограммы задержек, счетчики, сохранение и сводка
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import TestCase
+
+from bank_accounts import application
+from bank_accounts.application import Application
+from bank_accounts.metrics import Histogram, Metrics, format_summary
+
+# Тестовые данные
+TEST_DATA_DIR = Path(__file__).parent / "data"
+
+
+class TestHistogram(TestCase):
+    def test_percentile(self):
+        histogram = Histogram()
+        self.assertEqual(histogram.percentile(50), 0.0)
+        for _ in range(90):
+            histogram.observe(0.001)
+        for _ in range(10):
+            histogram.observe(0.1)
+        self.assertEqual(histogram.count, 100)
+        self.assertAlmostEqual(histogram.total, 1.09)
+        self.assertEqual(histogram.max, 0.1)
+        self.assertAlmostEqual(histogram.percentile(50), 0.001)
+        self.assertAlmostEqual(histogram.percentile(90), 0.001)
+        self.assertAlmostEqual(histogram.percentile(99), 0.1)
+
+    def test_merge(self):
+        first, second = Histogram(), Histogram()
+        first.observe(0.001)
+        second.observe(0.5)
+        second.observe(1000)
+        first.merge(second)
+        self.assertEqual(first.count, 3)
+        self.assertEqual(first.max, 1000)
+        self.assertEqual(first.percentile(100), 1000)
+
+        loaded = Histogram.load(first.dump())
+        self.assertEqual(loaded.dump(), first.dump())
+
+
+class TestMetrics(TestCase):
+    def setUp(self):
+        self.metrics = Metrics()
+
+    def test_disabled(self):
+        self.metrics.increment("calls")
+        self.metrics.observe("latency", 0.001)
+        with self.metrics.timer("block"):
+            pass
+        self.assertEqual(self.metrics.counter("calls"), 0)
+        self.assertIsNone(self.metrics.histogram("latency"))
+        self.assertEqual(self.metrics.summary(), [])
+
+    def test_enabled(self):
+        self.metrics.enable()
+        self.metrics.increment("calls")
+        self.metrics.increment("calls", 2)
+        with self.metrics.timer("block"):
+            pass
+        self.assertEqual(self.metrics.counter("calls"), 3)
+        self.assertEqual(self.metrics.histogram("block").count, 1)
+
+        summary = self.metrics.summary()
+        self.assertEqual([row["name"] for row in summary], ["block", "calls"])
+        self.assertEqual(summary[1], {"name": "calls", "count": 3})
+        self.assertIn("p99_ms", summary[0])
+        self.assertEqual(len(format_summary(summary)), 3)
+
+        self.metrics.reset()
+        self.assertEqual(self.metrics.summary(), [])
+
+    def test_save(self):
+        self.metrics.enable()
+        self.metrics.increment("calls")
+        self.metrics.observe("latency", 0.002)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_name = Path(tmp_dir) / "METRICS.json"
+            self.assertEqual(Metrics.load(file_name).summary(), [])
+            self.metrics.save(file_name)
+            self.metrics.save(file_name)
+            loaded = Metrics.load(file_name)
+        self.assertEqual(loaded.counter("calls"), 2)
+        self.assertEqual(loaded.histogram("latency").count, 2)
+
+
+class TestApplicationMetrics(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.accounts_file = Path(self.tmp_dir.name) / "ACCOUNTS.DAT"
+        self.transactions_file = Path(self.tmp_dir.name) / "TRANSACTIONS.DAT"
+        shutil.copy(TEST_DATA_DIR / "ACCOUNTS.DAT", self.accounts_file)
+        shutil.copy(TEST_DATA_DIR / "TRANSACTIONS.DAT", self.transactions_file)
+        # метрики процесса, которые использует приложение
+        self.metrics = application.metrics
+        self.metrics.reset()
+
+    def tearDown(self):
+        self.metrics.disable()
+        self.metrics.reset()
+        self.tmp_dir.cleanup()
+
+    def test_instrumentation(self):
+        self.metrics.enable()
+        app = Application(self.accounts_file, self.transactions_file)
+        account_num = app.add_new_account("Test", "S", 100).account_number
+        app.deposit(account_num, 50)
+        self.assertRaises(ValueError, app.withdraw, account_num, 1_000_000)
+        app.close()
+
+        self.assertEqual(self.metrics.histogram("app.deposit").count, 1)
+        self.assertEqual(self.metrics.histogram("load.accounts").count, 1)
+        self.assertGreater(self.metrics.histogram("replay").count, 0)
+        self.assertGreater(self.metrics.counter("transactions.posted"), 0)
+        self.assertEqual(self.metrics.counter("transactions.rejected"), 1)
+
+    def test_disabled(self):
+        app = Application(self.accounts_file, self.transactions_file)
+        app.deposit(app.add_new_account("Test", "S", 100).account_number, 50)
+        app.close()
+        self.assertEqual(self.metrics.summary(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
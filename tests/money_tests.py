@@ -0,0 +1,70 @@
+# money_tests.py
+
+"""
+Тест кейсы для денежных сумм в копейках
+"""
+
+import unittest
+from unittest import TestCase
+
+from bank_accounts.money import to_minor, from_minor, format_minor
+
+
+class TestMoney(TestCase):
+
+    def test_to_minor(self):
+        """
+        Перевод сумм в копейки из строк, целых и дробных чисел
+        """
+        self.assertEqual(to_minor("  1680.45"), 168045)
+        self.assertEqual(to_minor("200"), 20000)
+        self.assertEqual(to_minor("-0.05"), -5)
+        self.assertEqual(to_minor(12), 1200)
+        self.assertEqual(to_minor(0.29), 29)
+        self.assertEqual(to_minor(-10000.00), -1000000)
+
+    def test_float_rounds_like_string(self):
+        """
+        Дробное число округляется так же, как строка с той же записью
+        """
+        self.assertEqual(to_minor(1.015), 102)
+        self.assertEqual(to_minor(1.015), to_minor("1.015"))
+        self.assertEqual(to_minor(0.125), to_minor("0.125"))
+        self.assertEqual(to_minor(1e-05), 0)
+
+    def test_invalid_amount(self):
+        """
+        Некорректная строка суммы
+        """
+        self.assertRaises(ValueError, to_minor, "12,50")
+        self.assertRaises(ValueError, to_minor, "nan")
+
+    def test_non_finite_float(self):
+        """
+        Бесконечность и nan вместо суммы - ValueError, а не OverflowError
+        """
+        self.assertRaises(ValueError, to_minor, float("inf"))
+        self.assertRaises(ValueError, to_minor, float("-inf"))
+        self.assertRaises(ValueError, to_minor, float("nan"))
+        self.assertRaises(ValueError, to_minor, float("1e400"))
+
+    def test_from_minor(self):
+        """
+        Перевод копеек в рубли
+        """
+        self.assertEqual(from_minor(168045), 1680.45)
+        self.assertEqual(from_minor(-5), -0.05)
+
+    def test_format_minor(self):
+        """
+        Строковое представление суммы
+        """
+        self.assertEqual(format_minor(168045), "1680.45")
+        self.assertEqual(format_minor(5), "0.05")
+        self.assertEqual(format_minor(-1205), "-12.05")
+        self.assertEqual(format_minor(0), "0.00")
+
+
+# Executing the tests in the above test case class
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+# parallel_replay_tests.py
+
+"""
+Тест кейсы параллельной переигровки истории транзакций
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import TestCase
+
+from bank_accounts.accounts import AccountDict
+from bank_accounts.parallel_replay import replay_parallel, replay_shard, shard_of
+
+# Тестовые данные
+TEST_DATA_DIR = Path(__file__).parent / "data"
+
+
+class TestParallelReplay(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.transactions_file = Path(self.tmp_dir.name) / "TRANSACTIONS.DAT"
+        shutil.copy(TEST_DATA_DIR / "TRANSACTIONS.DAT", self.transactions_file)
+        self.accounts = AccountDict.load(TEST_DATA_DIR / "ACCOUNTS.DAT")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_shard_of(self):
+        self.assertEqual(shard_of("S00005", 4), shard_of("C00005", 4))
+        self.assertEqual(shard_of("S00006", 4), 2)
+        self.assertEqual(shard_of("SABCDE", 4), 0)
+
+    def test_replay_parallel(self):
+        """
+        Балансы совпадают с последовательной переигровкой
+        """
+        count = replay_parallel(self.transactions_file, 0, self.accounts, 2)
+        self.assertEqual(count, 7)
+        self.assertEqual(self.accounts["S00001"].balance, 680.15)
+        self.assertEqual(self.accounts["S00002"].balance, 5809.68)
+        self.assertEqual(self.accounts["C00005"].balance, -144.62)
+        self.assertEqual(self.accounts["C00008"].balance, 3326.37)
+
+    def test_replay_shard(self):
+        """
+        Группа переигрывает только свои счета
+        """
+        group = AccountDict()
+        group["S00001"] = self.accounts["S00001"]
+        group["C00005"] = self.accounts["C00005"]
+        balances, count, error = replay_shard(self.transactions_file, 0, 1, 2, group)
+        self.assertIsNone(error)
+        self.assertEqual(count, 7)
+        self.assertEqual(balances, {"S00001": 68015, "C00005": -14462})
+
+    def test_earliest_error(self):
+        """
+        Из ошибок разных групп сообщается самая ранняя по файлу
+        """
+        self.accounts["C00008"].set_limits(0, 100)
+        self.accounts["C00005"].set_limits(0, 1000000)
+        with self.assertRaisesRegex(ValueError, "максимальной"):
+            replay_parallel(self.transactions_file, 0, self.accounts, 2)
+        self.assertEqual(self.accounts["S00001"].balance, 890.15)
+
+
+if __name__ == "__main__":
+    unittest.main()
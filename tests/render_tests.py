@@ -0,0 +1,68 @@
+# render_tests.py
+
+"""
+Тест кейсы постраничного и потокового вывода списков
+"""
+
+import io
+import unittest
+from unittest import TestCase
+
+from rich.console import Console
+
+from bank_accounts.render import paginate, render, render_table, FORMAT_CSV, FORMAT_PLAIN
+from bank_accounts.transactions import TransactionList
+
+# Тестовые строки истории транзакций
+TXN_LINES = [
+    "20120713C00005W 200.00",
+    "20120713S00001D 120.00",
+    "20120714S00001W 330.00",
+]
+
+
+class TestRender(TestCase):
+    def setUp(self):
+        self.rows = list(TransactionList.table_rows(TransactionList.load_lines(TXN_LINES)))
+        self.out = io.StringIO()
+        self.console = Console(file=self.out, width=100)
+
+    def test_paginate(self):
+        self.assertEqual(list(paginate(iter(self.rows), 1, 1)), [self.rows[1]])
+        self.assertEqual(list(paginate(iter(self.rows), 2)), [self.rows[2]])
+        self.assertEqual(list(paginate(iter(self.rows), 5, 1)), [])
+        self.assertRaises(ValueError, paginate, self.rows, -1)
+        self.assertRaises(ValueError, paginate, self.rows, 0, -1)
+
+    def test_plain(self):
+        count = render(FORMAT_PLAIN, self.console, TransactionList.create_table, iter(self.rows))
+        self.assertEqual(count, 3)
+        lines = self.out.getvalue().splitlines()
+        self.assertEqual(lines[0], "Дата\tСчет #\tДепозит\tСписание")
+        self.assertEqual(lines[2], "2012-07-13\tS00001\t120.00\t")
+
+    def test_csv(self):
+        render(FORMAT_CSV, self.console, TransactionList.create_table, iter(self.rows))
+        self.assertEqual(self.out.getvalue().splitlines(), [
+            "Дата,Счет #,Депозит,Списание",
+            "2012-07-13,C00005,,200.00",
+            "2012-07-13,S00001,120.00,",
+            "2012-07-14,S00001,,330.00",
+        ])
+
+    def test_table_pages(self):
+        """
+        Каждая страница выводится отдельной таблицей
+        """
+        count = render_table(self.console, TransactionList.create_table, iter(self.rows), page_size=2)
+        self.assertEqual(count, 3)
+        self.assertEqual(self.out.getvalue().count("Списание"), 2)
+
+        self.out.truncate(0)
+        render_table(self.console, TransactionList.create_table, iter([]), page_size=2)
+        self.assertEqual(self.out.getvalue().count("Списание"), 1)
+        self.assertRaises(ValueError, render, "html", self.console, TransactionList.create_table, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
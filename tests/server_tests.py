@@ -0,0 +1,137 @@
+# server_tests.py
+
+"""
+Тест кейсы сервера и тонкого клиента
+"""
+
+import asyncio
+import shutil
+import socket
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import IsolatedAsyncioTestCase, TestCase, mock
+
+from bank_accounts.application import Application
+from bank_accounts.client import BankClient
+from bank_accounts.server import BankServer
+
+# Тестовые данные
+TEST_DATA_DIR = Path(__file__).parent / "data"
+
+
+class TestBankServerHandle(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        accounts_file = Path(self.tmp_dir.name) / "ACCOUNTS.DAT"
+        transactions_file = Path(self.tmp_dir.name) / "TRANSACTIONS.DAT"
+        shutil.copy(TEST_DATA_DIR / "ACCOUNTS.DAT", accounts_file)
+        shutil.copy(TEST_DATA_DIR / "TRANSACTIONS.DAT", transactions_file)
+        self.server = BankServer(Application(accounts_file, transactions_file))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_deposit(self):
+        response = self.server.handle({"command": "deposit", "account": "S00001", "amount": "19.85"})
+        self.assertTrue(response["ok"])
+        self.assertEqual(response["result"]["balance"], "700.00")
+        self.assertIsNone(response["result"]["min_limit"])
+
+    def test_history(self):
+        response = self.server.handle({"command": "history", "account": "C00005"})
+        self.assertEqual([txn["amount"] for txn in response["result"]], ["200.00", "675.50"])
+        self.assertEqual(response["result"][0], {"date": "20120713", "account": "C00005", "type": "W", "amount": "200.00"})
+
+    def test_errors(self):
+        """
+        Ошибки возвращаются в ответе, сервер продолжает работу
+        """
+        self.assertFalse(self.server.handle({"command": "unknown"})["ok"])
+        self.assertFalse(self.server.handle({"command": "deposit", "account": "S00001"})["ok"])
+        response = self.server.handle({"command": "withdraw", "account": "S00001", "amount": "abc"})
+        self.assertEqual(response["error"], "Некорректная сумма: abc")
+        response = self.server.handle({"command": "set-limits", "account": "S00001", "min_limit": 0, "max_limit": 100})
+        self.assertEqual(response["result"]["max_limit"], "100.00")
+        self.assertFalse(self.server.handle({"command": "deposit", "account": "S00001", "amount": 1})["ok"])
+        self.assertFalse(self.server.handle([1])["ok"])
+        self.assertFalse(self.server.handle({"command": ["deposit"]})["ok"])
+
+    def test_unexpected_error(self):
+        """
+        Непредвиденная ошибка (диск, время ожидания блокировки) возвращается в ответе
+        """
+        with mock.patch.object(Application, "get_account", side_effect=OSError("Диск недоступен")):
+            response = self.server.handle({"command": "get-account", "account": "S00001"})
+        self.assertEqual(response, {"ok": False, "error": "Ошибка сервера: Диск недоступен"})
+
+
+class TestBankServerConnection(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        accounts_file = Path(self.tmp_dir.name) / "ACCOUNTS.DAT"
+        transactions_file = Path(self.tmp_dir.name) / "TRANSACTIONS.DAT"
+        shutil.copy(TEST_DATA_DIR / "ACCOUNTS.DAT", accounts_file)
+        shutil.copy(TEST_DATA_DIR / "TRANSACTIONS.DAT", transactions_file)
+        self.app = Application(accounts_file, transactions_file, group_commit=True)
+        self.socket_path = Path(self.tmp_dir.name) / "bank.sock"
+        self.server = await BankServer(self.app).start_unix(self.socket_path)
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.app.close()
+        self.tmp_dir.cleanup()
+
+    def _requests(self) -> list:
+        with BankClient(self.socket_path) as client:
+            return [client.request("ping"),
+                    client.request("deposit", account="C00008", amount="0.63"),
+                    client.request("get-account", account="C00008")]
+
+    async def test_client(self):
+        pong, deposited, account = await asyncio.to_thread(self._requests)
+        self.assertEqual(pong, "pong")
+        self.assertEqual(deposited["balance"], "3327.00")
+        self.assertEqual(account["customer_name"], "Lim Ah Seng")
+
+    async def test_client_error(self):
+        def request():
+            with BankClient(self.socket_path) as client:
+                client.request("get-account", account="S99999")
+
+        with self.assertRaisesRegex(ValueError, "S99999"):
+            await asyncio.to_thread(request)
+
+    async def test_invalid_json(self):
+        reader, writer = await asyncio.open_unix_connection(str(self.socket_path))
+        writer.write(b"not json\n")
+        await writer.drain()
+        self.assertIn(b'"ok": false', await reader.readline())
+        writer.close()
+        await writer.wait_closed()
+
+    async def test_socket_in_use(self):
+        """
+        Второй сервер не запускается на сокете работающего сервера, первый продолжает работу
+        """
+        with self.assertRaisesRegex(ValueError, "уже используется"):
+            await BankServer(self.app).start_unix(self.socket_path)
+        pong, _, _ = await asyncio.to_thread(self._requests)
+        self.assertEqual(pong, "pong")
+
+    async def test_stale_socket(self):
+        """
+        Сокет, оставшийся от остановленного сервера, заменяется
+        """
+        stale_path = Path(self.tmp_dir.name) / "stale.sock"
+        stale = socket.socket(socket.AF_UNIX)
+        stale.bind(str(stale_path))
+        stale.close()
+        server = await BankServer(self.app).start_unix(stale_path)
+        server.close()
+        await server.wait_closed()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+# storage_tests.py
+
+"""
+Тест кейсы надежной записи файлов
+"""
+
+import os
+import tempfile
+import unittest
+import zlib
+from pathlib import Path
+from unittest import TestCase
+
+from bank_accounts.storage import atomic_write, file_crc32, WriteAheadLog
+
+
+class TestAtomicWrite(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.filename = Path(self.tmp_dir.name) / "data_tst.dat"
+        self.filename.write_bytes(b"old")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_replace(self):
+        with atomic_write(self.filename) as f:
+            f.write(b"new")
+        self.assertEqual(self.filename.read_bytes(), b"new")
+        self.assertEqual(os.listdir(self.tmp_dir.name), [self.filename.name])
+
+    def test_concurrent_writes(self):
+        """
+        Одновременные записи одного файла идут через разные временные файлы,
+        файл заменяет последняя завершенная запись
+        """
+        with atomic_write(self.filename) as first:
+            first.write(b"first")
+            with atomic_write(self.filename) as second:
+                second.write(b"second")
+            self.assertEqual(self.filename.read_bytes(), b"second")
+        self.assertEqual(self.filename.read_bytes(), b"first")
+        self.assertEqual(os.listdir(self.tmp_dir.name), [self.filename.name])
+
+    def test_keep_old_file_on_error(self):
+        """
+        При ошибке во время записи остается прежний файл
+        """
+        with self.assertRaises(RuntimeError):
+            with atomic_write(self.filename) as f:
+                f.write(b"half")
+                raise RuntimeError("сбой")
+        self.assertEqual(self.filename.read_bytes(), b"old")
+        self.assertEqual(os.listdir(self.tmp_dir.name), [self.filename.name])
+
+
+class TestFileCrc(TestCase):
+    def test_file_crc32(self):
+        """
+        Контрольная сумма начала файла, в том числе продолженная с уже подсчитанной части
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = Path(tmp_dir) / "data_tst.dat"
+            data = bytes(range(256)) * 10
+            filename.write_bytes(data)
+            self.assertEqual(file_crc32(filename, 0), 0)
+            self.assertEqual(file_crc32(filename, 1000), zlib.crc32(data[:1000]))
+            self.assertEqual(file_crc32(filename, 2000, 1000, zlib.crc32(data[:1000])), zlib.crc32(data[:2000]))
+            self.assertRaises(ValueError, file_crc32, filename, len(data) + 1)
+
+
+class TestWriteAheadLog(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.filename = Path(self.tmp_dir.name) / "data_tst.dat"
+        self.filename.write_bytes(b"0123456789")
+        self.wal = WriteAheadLog(self.filename)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_write(self):
+        self.wal.write([(2, b"ab"), (10, b"XYZ")])
+        self.assertEqual(self.filename.read_bytes(), b"01ab456789XYZ")
+        self.assertFalse(self.wal.wal_file.exists())
+        self.assertEqual(self.wal.recover(), 0)
+
+    def test_recover_committed_log(self):
+        """
+        Завершенный журнал применяется повторно после сбоя
+        """
+        self.wal._log([(0, b"AB"), (8, b"YZ")])
+        self.assertEqual(self.filename.read_bytes(), b"0123456789")
+
+        self.assertEqual(WriteAheadLog(self.filename).recover(), 2)
+        self.assertEqual(self.filename.read_bytes(), b"AB234567YZ")
+        self.assertFalse(self.wal.wal_file.exists())
+
+    def test_discard_torn_log(self):
+        """
+        Незавершенный журнал отбрасывается, файл данных не меняется
+        """
+        self.wal._log([(0, b"AB")])
+        data = self.wal.wal_file.read_bytes()
+        self.wal.wal_file.write_bytes(data[:-3])
+
+        self.assertEqual(self.wal.recover(), 0)
+        self.assertEqual(self.filename.read_bytes(), b"0123456789")
+        self.assertFalse(self.wal.wal_file.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
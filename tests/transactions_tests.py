@@ -7,10 +7,11 @@
 import datetime
 import unittest
 import os
+import zlib
 from pathlib import Path
 from unittest import expectedFailure, TestCase
 
-from bank_accounts.transactions import Transaction, TransactionList
+from bank_accounts.transactions import Transaction, TransactionList, parse_date, format_date
 
 
 class TestTransaction(TestCase):
@@ -31,6 +32,38 @@ class TestTransaction(TestCase):
         self.assertEqual(txn.txn_type, txn_type)
         self.assertEqual(txn.amount, amount)
 
+    def test_transaction_without_dict(self):
+        """
+        Транзакция хранится в слотах, без __dict__ у экземпляра
+        """
+        txn = Transaction(datetime.datetime.now(), "S12345", "D", 123.56)
+        self.assertFalse(hasattr(txn, "__dict__"))
+        self.assertRaises(AttributeError, setattr, txn, "comment", "x")
+
+    def test_amount_in_minor_units(self):
+        """
+        Сумма транзакции хранится в копейках без ошибки округления
+        """
+        txn = Transaction.load("20120713C00005W 0.29")
+        self.assertEqual(txn.amount_minor, 29)
+        self.assertEqual(txn.amount, 0.29)
+        self.assertEqual(txn.dump(), "20120713C00005W           0.29")
+
+    def test_parse_format_date(self):
+        """
+        Разбор и форматирование дат с кэшем: повторная дата не разбирается заново
+        """
+        parse_date.cache_clear()
+        self.assertEqual(parse_date("20120713"), datetime.date(2012, 7, 13))
+        self.assertEqual(parse_date("20120713"), datetime.date(2012, 7, 13))
+        self.assertEqual(parse_date.cache_info().hits, 1)
+        self.assertRaises(ValueError, parse_date, "20121313")
+        self.assertEqual(format_date(datetime.date(2012, 7, 3)), "20120703")
+
+        txn = Transaction.load("20120713C00005W 200.00")
+        self.assertEqual(txn.date, datetime.date(2012, 7, 13))
+        self.assertEqual(next(TransactionList.table_rows([txn]))[0], "2012-07-13")
+
     def test_invalid_txn_type(self):
         """ Неправильный тип транзакции """
         account = "S12345"
@@ -91,6 +124,124 @@ class TestTransactionList(TestCase):
         txn_by_account = self.transactions.search(account)
         self.assertEqual(len(txn_by_account), 3)
 
+    def test_search_after_list_changes(self):
+        """
+        Индекс по счетам перестраивается при изменении списка
+        """
+        date = datetime.datetime.now()
+        self.transactions.append(Transaction(date, "S12345", "D", 123.45))
+        self.transactions.append(Transaction(date, "C54312", "D", 123.45))
+        self.transactions.insert(0, Transaction(date, "C54312", "W", 23.45))
+        del self.transactions[1]
+
+        self.assertEqual(len(self.transactions.search("S12345")), 0)
+        self.assertEqual(self.transactions.positions("C54312"), [0, 1])
+        self.assertEqual(self.transactions.search("C54312")[0].txn_type, "W")
+
+    def test_account_date_range(self):
+        """
+        Диапазон дат транзакций по счету
+        """
+        self.transactions.append(Transaction(datetime.datetime(2012, 7, 14), "S12345", "D", 10))
+        self.transactions.append(Transaction(datetime.datetime(2012, 7, 13), "S12345", "D", 10))
+        self.transactions.append(Transaction(datetime.datetime(2012, 7, 20), "S12345", "W", 10))
+
+        self.assertEqual(self.transactions.date_range("S12345"),
+                         (datetime.date(2012, 7, 13), datetime.date(2012, 7, 20)))
+        self.assertIsNone(self.transactions.date_range("C54312"))
+
+    def test_between(self):
+        """
+        Выборка транзакций за период по всем счетам и по одному счету
+        """
+        loaded = TransactionList.load_lines([
+            "20120713C00005W 200.00",
+            "20120714S00001D 120.00",
+            "20120714C00005D 10.00",
+            "20120716S00001W 30.00",
+        ])
+        july = lambda day: datetime.date(2012, 7, day)
+        self.assertEqual([txn.amount for txn in loaded.between(july(14), july(15))], [120, 10])
+        self.assertEqual([txn.amount for txn in loaded.between(july(14), None, "S00001")], [120, 30])
+        self.assertEqual(len(loaded.between(None, None)), 4)
+        self.assertEqual(loaded.between(july(17), None), [])
+        self.assertEqual(loaded.between(None, None, "S00002"), [])
+
+    def test_between_unordered(self):
+        """
+        Транзакции не по порядку дат: выборка в порядке списка
+        """
+        loaded = TransactionList.load_lines([
+            "20120715S00001D 1.00",
+            "20120713S00001D 2.00",
+            "20120714S00001D 3.00",
+        ])
+        july = lambda day: datetime.date(2012, 7, day)
+        self.assertEqual([txn.amount for txn in loaded.between(july(13), july(14))], [2, 3])
+        loaded.append(Transaction(datetime.datetime(2012, 7, 13), "S00001", "W", 1))
+        self.assertEqual([txn.amount for txn in loaded.between(july(13), july(13), "S00001")], [2, 1])
+        loaded.sort(key=lambda txn: txn.date)
+        self.assertEqual([txn.amount for txn in loaded.between(july(14), None)], [3, 1])
+
+    def test_load_lines(self):
+        """
+        Загрузить транзакции из строк, пустые строки пропускаются
+        """
+        loaded = TransactionList.load_lines(["20120713C00005W 200.00\n", "\n", "20120713S00002D 150.79"])
+        self.assertEqual(len(loaded), 2)
+        self.assertEqual(loaded[1].amount, 150.79)
+
+        with self.assertRaisesRegex(ValueError, "Строка 2"):
+            TransactionList.load_lines(["20120713C00005W 200.00", "20120713S00002X 150.79"])
+
+    def test_load_batch_errors(self):
+        """
+        Пакетная проверка при загрузке сообщает номер первой некорректной строки
+        """
+        lines = ["20120713C00005W 200.00", "", "20120713S00002D 150.79", "20120713S0000AD 1.00", "20120713X00002D 1"]
+        with self.assertRaisesRegex(ValueError, "Строка 4: .*только цифры"):
+            TransactionList.load_lines(lines)
+        with self.assertRaisesRegex(ValueError, "Строка 2: .*положительной"):
+            TransactionList.load_lines(["20120713C00005W 200.00", "20120713C00005W 0.00"])
+        with self.assertRaisesRegex(ValueError, "Строка 1"):
+            TransactionList.load_lines(["20121313C00005W 200.00"])
+
+    def test_load_trusted_prefix(self):
+        """
+        Начало файла с совпадающей контрольной суммой загружается без проверки записей
+        """
+        filename = Path("transactions_tst.dat")
+        # нулевая сумма - некорректная запись, которую пропустит только загрузка без проверки
+        prefix = b"20120713C00005W 200.00\n20120713S00002D 0.00\n"
+        filename.write_bytes(prefix + b"20120714S00002D 150.79\n")
+
+        loaded = TransactionList.load(filename, trusted_prefix=(len(prefix), zlib.crc32(prefix)))
+        self.assertEqual([txn.amount_minor for txn in loaded], [20000, 0, 15079])
+        self.assertEqual(len(loaded.search("S00002")), 2)
+
+        with self.assertRaisesRegex(ValueError, "Строка 2"):
+            TransactionList.load(filename, trusted_prefix=(len(prefix), zlib.crc32(prefix) ^ 1))
+        with self.assertRaisesRegex(ValueError, "Строка 2"):
+            TransactionList.load(filename, trusted_prefix=(len(prefix) - 1, zlib.crc32(prefix[:-1])))
+
+    def test_iter_file(self):
+        """
+        Потоковое чтение транзакций из файла небольшими порциями
+        """
+        date = datetime.datetime.now()
+        for idx in range(50):
+            self.transactions.append(Transaction(date, "S12345", "D", idx + 1))
+        filename = Path("transactions_tst.dat")
+        self.transactions.save(filename)
+
+        streamed = list(TransactionList.iter_file(filename, chunk_size=64))
+        self.assertEqual(len(streamed), 50)
+        self.assertEqual([txn.amount for txn in streamed], [txn.amount for txn in self.transactions])
+
+        tail = list(TransactionList.iter_file(filename, offset=31 * 48))
+        self.assertEqual(len(tail), 2)
+        self.assertEqual(tail[0].amount, 49)
+
     def test_save_transactions(self):
         """
         Сохранить реестр транзакций в файл